@@ -1,4 +1,14 @@
 # SPDX-FileCopyrightText: 2025-present Toshihiro Kamiya <kamiya@mbj.nifty.com>
 #
 # SPDX-License-Identifier: MIT
-from .main import main as main
+
+
+def main(argv=None):
+    import time
+
+    # Imported lazily so light entry points (e.g. decafe_timer.client) stay cheap;
+    # the start time is the import phase of --trace.
+    import_started = time.perf_counter()
+    from .main import main as _main
+
+    return _main(argv, import_started=import_started)
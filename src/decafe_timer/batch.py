@@ -0,0 +1,166 @@
+"""``decafe-timer status --batch``: render many state files in one process.
+
+Targets are state directories (a cache or profile directory holding
+``timer_state.json`` and its journal), directories of those, bare state JSON
+files, or ``-`` for newline-separated paths on stdin. Files are loaded by a
+thread pool in chunks and rendered with ``core.render_lines``, as a plain
+``decafe-timer --one-line`` (or ``--graph-only``) would at the same moment;
+rows are printed in input order as aligned text or JSON lines. A target
+that is missing or unreadable gets an error row (``error`` in JSON, a ``!``
+line in text) rather than a warning on stdout.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, TextIO
+
+from .core import (
+    LAYOUT_GRAPH_ONLY,
+    LAYOUT_ONE_LINE,
+    RenderOptions,
+    TimerState,
+    remaining_at,
+    render_lines,
+)
+from .state import BrokenState, StateSnapshot, load_snapshot_at
+
+STATE_FILE_NAME = "timer_state.json"
+JOURNAL_FILE_NAME = "timer_journal.jsonl"
+BATCH_WORKERS = 8
+# Targets per pool task; keeps executor overhead small next to a file read.
+BATCH_CHUNK = 64
+
+
+def _target_name(path: str) -> str:
+    path = path.rstrip(os.sep) or path
+    base = os.path.basename(path)
+    if base == STATE_FILE_NAME:
+        return os.path.basename(os.path.dirname(path)) or base
+    stem, ext = os.path.splitext(base)
+    return stem if ext == ".json" else base
+
+
+def _is_state_dir(path: str) -> bool:
+    return os.path.exists(os.path.join(path, STATE_FILE_NAME)) or os.path.exists(
+        os.path.join(path, JOURNAL_FILE_NAME)
+    )
+
+
+def collect_targets(
+    sources: Iterable[str], *, stdin: Optional[TextIO] = None
+) -> list[tuple[str, str]]:
+    """Expand the ``--batch`` arguments into ``(name, path)`` pairs."""
+    targets = []
+    for source in sources:
+        if source == "-":
+            lines = (stdin or sys.stdin).read().splitlines()
+            targets.extend(
+                (_target_name(line), line) for line in lines if line.strip()
+            )
+        elif os.path.isdir(source) and not _is_state_dir(source):
+            with os.scandir(source) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.is_dir() or entry.name.endswith(".json"):
+                        targets.append((_target_name(entry.path), entry.path))
+        else:
+            targets.append((_target_name(source), source))
+    return targets
+
+
+# (name, snapshot, error): exactly one of snapshot and error is set.
+Loaded = tuple[str, Optional[StateSnapshot], Optional[str]]
+
+
+def _load_chunk(chunk: list[tuple[str, str]]) -> list[Optional[Loaded]]:
+    loaded: list[Optional[Loaded]] = []
+    for name, path in chunk:
+        if os.path.isdir(path) and not _is_state_dir(path):
+            loaded.append(None)
+            continue
+        try:
+            loaded.append((name, load_snapshot_at(path), None))
+        except BrokenState as exc:
+            loaded.append((name, None, str(exc)))
+    return loaded
+
+
+def load_snapshots(
+    targets: list[tuple[str, str]], *, workers: int = BATCH_WORKERS
+) -> Iterator[Loaded]:
+    """Yield ``(name, snapshot, error)`` in target order, loading concurrently."""
+    chunks = [
+        targets[start : start + BATCH_CHUNK]
+        for start in range(0, len(targets), BATCH_CHUNK)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for loaded in pool.map(_load_chunk, chunks):
+            yield from (item for item in loaded if item is not None)
+
+
+def _status(
+    snapshot: StateSnapshot,
+    now: float,
+    *,
+    graph_only: bool,
+    bar_style: Optional[str],
+    use_ansi: bool,
+) -> tuple[str, str]:
+    timer = TimerState.from_snapshot(snapshot)
+    options = RenderOptions(
+        LAYOUT_GRAPH_ONLY if graph_only else LAYOUT_ONE_LINE,
+        bar_style or snapshot.effective_bar_style,
+        use_ansi,
+    )
+    text = render_lines(timer, options, now=now)[0]
+    if timer.finish_at is None:
+        return text, "cleared"
+    if remaining_at(timer, now) == 0:
+        return text, "expired"
+    return text, "active"
+
+
+def run_batch(
+    sources: list[str],
+    *,
+    output_format: str = "text",
+    graph_only: bool = False,
+    bar_style: Optional[str] = None,
+    use_ansi: bool = False,
+    out: Optional[TextIO] = None,
+    now: Optional[float] = None,
+    workers: int = BATCH_WORKERS,
+):
+    """Print one status row per target; ``bar_style`` None uses each saved style."""
+    out = out or sys.stdout
+    now = time.time() if now is None else now
+    loaded = load_snapshots(collect_targets(sources), workers=workers)
+    width = 0
+    if output_format != "json":
+        # Aligned over the rows printed, not the skipped directories.
+        loaded = list(loaded)
+        width = max((len(name) for name, _snapshot, _error in loaded), default=0)
+    for name, snapshot, error in loaded:
+        if snapshot is None:
+            if output_format == "json":
+                row = {"name": name, "class": "error", "error": error}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"{name:<{width}}  ! {error}\n")
+            continue
+        text, css_class = _status(
+            snapshot, now, graph_only=graph_only, bar_style=bar_style, use_ansi=use_ansi
+        )
+        if output_format == "json":
+            row = {
+                "name": name,
+                "text": text,
+                "class": css_class,
+                "finish_at": snapshot.finish_at,
+                "mem_sec": snapshot.effective_mem_sec,
+            }
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            out.write(f"{name:<{width}}  {text}\n")
@@ -0,0 +1,327 @@
+"""Stdlib-only benchmarks for the hot paths: ``python -m decafe_timer.bench``.
+
+Each case reports ops/sec and p50/p99 latency per operation.
+``--save-baseline`` writes the results as JSON; ``--baseline`` compares a run
+against such a file and exits non-zero when a case's p50 regressed by more
+than ``--max-regression`` (a per-case ``max_regression`` stored in the
+baseline file takes precedence).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator, Optional
+
+from . import core, state
+from .duration import parse_simple_duration
+from .render import BAR_STYLE_GREEK_CROSS, render_snapshot_line
+
+DEFAULT_MAX_REGRESSION = 0.25
+QUICK_FACTOR = 10
+COLD_START_ARGS = ["--layout", "one-line", "--color", "never"]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+    samples: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    # Context manager yielding the zero-argument callable to time.
+    setup: Callable[[], AbstractContextManager[Callable[[], object]]]
+    samples: int = 200
+    number: int = 200
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def measure(
+    name: str, func: Callable[[], object], *, samples: int, number: int
+) -> BenchResult:
+    """Time ``samples`` batches of ``number`` calls and report per-op figures."""
+    func()
+    per_op = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_op.append((time.perf_counter() - start) / number)
+    per_op.sort()
+    mean = sum(per_op) / len(per_op)
+    return BenchResult(
+        name=name,
+        ops_per_sec=1.0 / mean if mean > 0 else float("inf"),
+        p50_us=_percentile(per_op, 0.5) * 1e6,
+        p99_us=_percentile(per_op, 0.99) * 1e6,
+        samples=samples,
+    )
+
+
+# ------------------------------
+# Cases
+# ------------------------------
+@contextmanager
+def _temp_state_dir() -> Iterator[str]:
+    original = state._cache_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        state._cache_dir = lambda: tmp
+        try:
+            yield tmp
+        finally:
+            state._cache_dir = original
+
+
+@contextmanager
+def _render_case(graph_only: bool):
+    remaining = itertools.cycle(range(10800, 0, -7))
+
+    def run():
+        return render_snapshot_line(
+            next(remaining),
+            10800,
+            graph_only=graph_only,
+            bar_style=BAR_STYLE_GREEK_CROSS,
+            use_ansi=True,
+        )
+
+    yield run
+
+
+@contextmanager
+def _core_render_case():
+    timer = core.TimerState(1_800_000_000 + 10800, 10800)
+    options = core.RenderOptions(core.LAYOUT_ONE_LINE, use_ansi=True)
+    now = itertools.cycle(range(1_800_000_000, 1_800_010_800, 7))
+    yield lambda: core.render_lines(timer, options, now=next(now))
+
+
+@contextmanager
+def _duration_case():
+    inputs = itertools.cycle(["2h30m", "45m", "01:30:00", "1h 5m 3s"])
+    yield lambda: parse_simple_duration(next(inputs))
+
+
+def _sample_payload() -> dict:
+    return {
+        "version": state.STATE_VERSION,
+        "finish_at": int(time.time()) + 3600,
+        "mem_sec": 10800,
+        "last_saved_at": int(time.time()),
+    }
+
+
+@contextmanager
+def _state_read_case():
+    with _temp_state_dir():
+        state._write_state_payload(_sample_payload())
+        yield state._read_state_payload
+
+
+@contextmanager
+def _snapshot_read_binary_case():
+    with _temp_state_dir():
+        state.save_state(int(time.time()) + 3600, 10800)
+        yield state.load_snapshot
+
+
+@contextmanager
+def _state_write_case():
+    payload = _sample_payload()
+    with _temp_state_dir():
+        yield lambda: state._write_state_payload(payload)
+
+
+@contextmanager
+def _journal_append_case():
+    def run():
+        snapshot = state.load_snapshot()
+        state.save_state(snapshot.finish_at or 0, 10800, snapshot=snapshot)
+
+    with _temp_state_dir():
+        state._write_state_payload(_sample_payload())
+        yield run
+
+
+@contextmanager
+def _state_update_case():
+    def run():
+        with state.lock_state():
+            snapshot = state.load_snapshot()
+            state.save_state(snapshot.finish_at or 0, 10800, snapshot=snapshot)
+
+    with _temp_state_dir():
+        state._write_state_payload(_sample_payload())
+        yield run
+
+
+@contextmanager
+def _cold_start_case():
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import decafe_timer; decafe_timer.main({COLD_START_ARGS!r})"
+    with tempfile.TemporaryDirectory() as tmp:
+        # appdirs honours XDG_CACHE_HOME, so the child reads an empty state.
+        env = {**os.environ, "XDG_CACHE_HOME": tmp, "PYTHONPATH": src_dir}
+
+        def run():
+            subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+
+        yield run
+
+
+CASES = (
+    BenchCase("render_one_line", lambda: _render_case(False)),
+    BenchCase("render_graph_only", lambda: _render_case(True)),
+    BenchCase("core_render_lines", _core_render_case),
+    BenchCase("parse_simple_duration", _duration_case),
+    BenchCase("state_read", _state_read_case, number=50),
+    BenchCase("snapshot_read_binary", _snapshot_read_binary_case),
+    BenchCase("state_write", _state_write_case, samples=100, number=10),
+    BenchCase("journal_append", _journal_append_case, samples=100, number=10),
+    BenchCase("state_update_locked", _state_update_case, samples=100, number=10),
+    BenchCase("cli_cold_start", _cold_start_case, samples=20, number=1),
+)
+CASE_NAMES = tuple(case.name for case in CASES)
+
+
+def run_benchmarks(
+    names: Optional[list[str]] = None, *, quick: bool = False
+) -> list[BenchResult]:
+    results = []
+    for case in CASES:
+        if names and case.name not in names:
+            continue
+        samples = case.samples
+        number = case.number
+        if quick:
+            samples = max(samples // QUICK_FACTOR, 5)
+            number = max(number // QUICK_FACTOR, 1)
+        with case.setup() as func:
+            results.append(measure(case.name, func, samples=samples, number=number))
+    return results
+
+
+# ------------------------------
+# Baselines
+# ------------------------------
+def results_to_json(results: list[BenchResult]) -> dict:
+    return {"results": {result.name: result.as_dict() for result in results}}
+
+
+def compare_to_baseline(
+    results: list[BenchResult],
+    baseline: dict,
+    *,
+    max_regression: float = DEFAULT_MAX_REGRESSION,
+) -> list[str]:
+    """Return one message per case whose p50 regressed beyond its budget."""
+    entries = baseline.get("results", {})
+    failures = []
+    for result in results:
+        entry = entries.get(result.name)
+        if not entry:
+            continue
+        budget = entry.get("max_regression", max_regression)
+        limit = entry["p50_us"] * (1.0 + budget)
+        if result.p50_us > limit:
+            failures.append(
+                f"{result.name}: p50 {result.p50_us:.2f} us exceeds "
+                f"{limit:.2f} us (baseline {entry['p50_us']:.2f} us "
+                f"+{budget:.0%})"
+            )
+    return failures
+
+
+def format_result(result: BenchResult) -> str:
+    return (
+        f"{result.name:<22} {result.ops_per_sec:>12,.0f} ops/s"
+        f"  p50 {result.p50_us:>10.2f} us  p99 {result.p99_us:>10.2f} us"
+    )
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m decafe_timer.bench",
+        description="Benchmark decafe-timer hot paths.",
+    )
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        metavar="CASE",
+        help=f"Cases to run (default: all). Choices: {', '.join(CASE_NAMES)}.",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run fewer iterations (noisier, for smoke checks).",
+    )
+    parser.add_argument("--baseline", help="Compare against this baseline JSON.")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=DEFAULT_MAX_REGRESSION,
+        help="Allowed p50 slowdown as a fraction (default: 0.25).",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as JSON instead of a table.",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASE_NAMES]
+    if unknown:
+        parser.error(f"unknown case: {', '.join(unknown)}")
+    results = run_benchmarks(args.cases, quick=args.quick)
+    if args.json:
+        print(json.dumps(results_to_json(results), indent=2))
+    else:
+        for result in results:
+            print(format_result(result))
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results_to_json(results), f, indent=2)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = compare_to_baseline(
+            results, baseline, max_regression=args.max_regression
+        )
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Fixed-layout binary sidecar (``timer_state.bin``) for zero-parse readers.
+
+The file backend's writer mirrors every committed snapshot into one
+``struct`` record, updated in place through ``mmap`` under a seqlock: the
+sequence number is odd while a write is in progress and bumped to the next
+even value afterwards, so a reader that sees the same even number before and
+after copying the fields has a consistent record. The record also stores the
+journal size and checkpoint mtime it corresponds to; a reader that finds
+either changed (a crash between the journal append and the sidecar update,
+or a writer that does not know about the sidecar) falls back to JSON. The
+state writer mirrors only revisions it can read back from the journal, and
+re-mirrors the files when a commit finds the sidecar ahead of them.
+
+Mappings are cached per path, so long-lived readers (the live loop, the
+daemon) pay two ``stat`` calls and one ``unpack_from`` per snapshot.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+
+MAGIC = b"DCFB"
+LAYOUT_VERSION = 1
+# magic, layout version, flags, seq, revision, finish_at, mem_sec,
+# last_saved_at, journal size, checkpoint mtime_ns, bar style index,
+# checkpoint format version (0 when the payload has none).
+LAYOUT = struct.Struct("<4sHHQQqqqQQBB6x")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+READ_ATTEMPTS = 8
+
+HAS_FINISH_AT = 1
+HAS_MEM_SEC = 2
+HAS_LAST_SAVED_AT = 4
+HAS_ONE_LINE = 8
+ONE_LINE = 16
+HAS_GRAPH_ONLY = 32
+GRAPH_ONLY = 64
+
+_read_maps: dict[str, mmap.mmap] = {}
+
+
+def _file_stamp(checkpoint_path: str, journal_path: str) -> tuple[int, int]:
+    try:
+        journal_size = os.stat(journal_path).st_size
+    except OSError:
+        journal_size = 0
+    try:
+        checkpoint_mtime_ns = os.stat(checkpoint_path).st_mtime_ns
+    except OSError:
+        checkpoint_mtime_ns = 0
+    return journal_size, checkpoint_mtime_ns
+
+
+def _map_for_read(path: str) -> mmap.mmap | None:
+    mapped = _read_maps.get(path)
+    if mapped is not None:
+        return mapped
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), LAYOUT.size, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    _read_maps[path] = mapped
+    return mapped
+
+
+def close_maps():
+    for mapped in _read_maps.values():
+        mapped.close()
+    _read_maps.clear()
+
+
+def read_payload(
+    path: str, checkpoint_path: str, journal_path: str, bar_styles: tuple
+) -> dict | None:
+    """Return the state payload from the sidecar, or None if it is unusable."""
+    mapped = _map_for_read(path)
+    if mapped is None:
+        return None
+    for _attempt in range(READ_ATTEMPTS):
+        (seq,) = SEQ.unpack_from(mapped, SEQ_OFFSET)
+        if seq & 1:
+            continue
+        record = LAYOUT.unpack_from(mapped)
+        if SEQ.unpack_from(mapped, SEQ_OFFSET)[0] == seq:
+            break
+    else:
+        return None
+    (
+        magic,
+        version,
+        flags,
+        seq,
+        revision,
+        finish_at,
+        mem_sec,
+        last_saved_at,
+        journal_size,
+        checkpoint_mtime_ns,
+        bar_style_index,
+        state_version,
+    ) = record
+    if (
+        magic != MAGIC
+        or version != LAYOUT_VERSION
+        or (journal_size, checkpoint_mtime_ns)
+        != _file_stamp(checkpoint_path, journal_path)
+    ):
+        # Stale or replaced: drop the mapping so the next read maps afresh.
+        _read_maps.pop(path).close()
+        return None
+    payload: dict = {"version": state_version} if state_version else {}
+    payload["revision"] = revision
+    if flags & HAS_FINISH_AT:
+        payload["finish_at"] = finish_at
+    if flags & HAS_MEM_SEC:
+        payload["mem_sec"] = mem_sec
+    if 0 < bar_style_index <= len(bar_styles):
+        payload["bar_style"] = bar_styles[bar_style_index - 1]
+    if flags & HAS_ONE_LINE:
+        payload["one_line"] = bool(flags & ONE_LINE)
+    if flags & HAS_GRAPH_ONLY:
+        payload["graph_only"] = bool(flags & GRAPH_ONLY)
+    if flags & HAS_LAST_SAVED_AT:
+        payload["last_saved_at"] = last_saved_at
+    return payload
+
+
+def write_snapshot(
+    path: str,
+    snapshot,
+    checkpoint_path: str,
+    journal_path: str,
+    bar_styles: tuple,
+):
+    """Mirror ``snapshot`` (a ``state.StateSnapshot``) into the sidecar."""
+    flags = 0
+    if snapshot.finish_at is not None:
+        flags |= HAS_FINISH_AT
+    if snapshot.mem_sec is not None:
+        flags |= HAS_MEM_SEC
+    if snapshot.one_line is not None:
+        flags |= HAS_ONE_LINE | (ONE_LINE if snapshot.one_line else 0)
+    if snapshot.graph_only is not None:
+        flags |= HAS_GRAPH_ONLY | (GRAPH_ONLY if snapshot.graph_only else 0)
+    last_saved_at = snapshot.payload.get("last_saved_at")
+    if isinstance(last_saved_at, int) and not isinstance(last_saved_at, bool):
+        flags |= HAS_LAST_SAVED_AT
+    else:
+        last_saved_at = 0
+    state_version = snapshot.payload.get("version")
+    if not isinstance(state_version, int) or not 0 < state_version < 256:
+        state_version = 0
+    bar_style = snapshot.bar_style
+    bar_style_index = bar_styles.index(bar_style) + 1 if bar_style in bar_styles else 0
+    journal_size, checkpoint_mtime_ns = _file_stamp(checkpoint_path, journal_path)
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < LAYOUT.size:
+            os.ftruncate(fd, LAYOUT.size)
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl is not None:
+            # Writers normally hold lock_state already; this keeps the
+            # seqlock single-writer even for callers that do not.
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        with mmap.mmap(fd, LAYOUT.size, access=mmap.ACCESS_WRITE) as mapped:
+            (seq,) = SEQ.unpack_from(mapped, SEQ_OFFSET)
+            seq |= 1
+            SEQ.pack_into(mapped, SEQ_OFFSET, seq)
+            LAYOUT.pack_into(
+                mapped,
+                0,
+                MAGIC,
+                LAYOUT_VERSION,
+                flags,
+                seq,
+                snapshot.revision,
+                snapshot.finish_at or 0,
+                snapshot.mem_sec or 0,
+                last_saved_at,
+                journal_size,
+                checkpoint_mtime_ns,
+                bar_style_index,
+                state_version,
+            )
+            SEQ.pack_into(mapped, SEQ_OFFSET, seq + 1)
+    finally:
+        # Closing the descriptor releases the flock.
+        os.close(fd)
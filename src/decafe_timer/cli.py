@@ -6,6 +6,11 @@ from typing import Optional
 
 from .__about__ import __version__
 
+COMMAND_CONFLICT_MESSAGE = (
+    "Cannot combine run, intake, mem, config, clear, daemon, watch, stats, "
+    "profiles, status, next-change, hooks, metrics, and dashboard."
+)
+
 
 @dataclass(frozen=True)
 class CliRequest:
@@ -16,6 +21,15 @@ class CliRequest:
     config: bool
     duration: Optional[str]
     mem_duration: Optional[str]
+    daemon: bool = False
+    watch: bool = False
+    stats: bool = False
+    profiles: bool = False
+    status: bool = False
+    next_change: bool = False
+    hooks: bool = False
+    metrics: bool = False
+    dashboard: bool = False
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -27,7 +41,16 @@ def build_arg_parser() -> argparse.ArgumentParser:
         help=(
             "Intake caffeine (e.g. intake 2h, +5h) or set memory (mem 3h). "
             "Use 'config' to show memory and bar style. "
-            "Use 'clear' or 0 to remove the current timer."
+            "Use 'clear' or 0 to remove the current timer. "
+            "Use 'daemon' to serve status over a Unix socket. "
+            "Use 'watch' to print a line each time the status changes. "
+            "Use 'stats' to summarize intake history. "
+            "Use 'profiles' to list profiles with a running timer. "
+            "Use 'status --batch PATH...' to render many state files at once. "
+            "Use 'next-change' to print when the rendered status next changes. "
+            "Use 'hooks --on-expire CMD' to run commands when timers expire. "
+            "Use 'metrics' to print OpenMetrics text for monitoring. "
+            "Use 'dashboard' to show every profile's timer as a live row."
         ),
     )
     parser.add_argument(
@@ -63,12 +86,84 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=None,
         help="Pick the ASCII bar style (default: stored setting or greek-cross).",
     )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help=(
+            "Output format for watch, stats, profiles, next-change, "
+            "and status --batch (text, json)."
+        ),
+    )
+    parser.add_argument(
+        "--by",
+        choices=("day", "week", "month"),
+        default="day",
+        help="Period to group stats by (day, week, month).",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Build (or rebuild) the stats rollup index, kept up to date afterwards.",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        default=None,
+        help=(
+            "With status: state files or directories to render ('-' reads "
+            "paths from stdin)."
+        ),
+    )
+    parser.add_argument(
+        "--on-expire",
+        action="append",
+        default=None,
+        metavar="CMD",
+        help="With hooks: shell command to run when a timer expires (repeatable).",
+    )
+    parser.add_argument(
+        "--on-color",
+        action="append",
+        default=None,
+        metavar="CMD",
+        help=(
+            "With hooks: shell command to run when a bar changes color "
+            "(repeatable)."
+        ),
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        metavar="PATH",
+        help=(
+            "With metrics: write the OpenMetrics text to PATH atomically. "
+            "With daemon: rewrite PATH every 15 seconds."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help=(
+            "Named timer profile (default: $DECAFE_TIMER_PROFILE or 'default')."
+        ),
+    )
     parser.add_argument(
         "--color",
         choices=("auto", "always", "never"),
         default="auto",
         help="Control ANSI colors (auto, always, never).",
     )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        default=None,
+        help=(
+            "Print per-phase timings as JSON lines to stderr "
+            "(also: DECAFE_TIMER_TRACE=1 or =PATH)."
+        ),
+    )
     return parser
 
 
@@ -84,6 +179,15 @@ def normalize_cli_request(args: argparse.Namespace) -> tuple[CliRequest, Optiona
     requested_intake = False
     requested_mem = False
     requested_config = False
+    requested_daemon = False
+    requested_watch = False
+    requested_stats = False
+    requested_profiles = False
+    requested_status = False
+    requested_next_change = False
+    requested_hooks = False
+    requested_metrics = False
+    requested_dashboard = False
 
     def pop_token():
         nonlocal tokens, tokens_lower
@@ -112,6 +216,42 @@ def normalize_cli_request(args: argparse.Namespace) -> tuple[CliRequest, Optiona
             requested_config = True
             pop_token()
             continue
+        if first == "daemon":
+            requested_daemon = True
+            pop_token()
+            continue
+        if first == "watch":
+            requested_watch = True
+            pop_token()
+            continue
+        if first == "stats":
+            requested_stats = True
+            pop_token()
+            continue
+        if first == "profiles":
+            requested_profiles = True
+            pop_token()
+            continue
+        if first == "status":
+            requested_status = True
+            pop_token()
+            continue
+        if first == "next-change":
+            requested_next_change = True
+            pop_token()
+            continue
+        if first == "hooks":
+            requested_hooks = True
+            pop_token()
+            continue
+        if first == "metrics":
+            requested_metrics = True
+            pop_token()
+            continue
+        if first == "dashboard":
+            requested_dashboard = True
+            pop_token()
+            continue
         if first.startswith("+"):
             if first == "+":
                 return CliRequest(requested_run, False, False, False, False, None, None), (
@@ -134,9 +274,29 @@ def normalize_cli_request(args: argparse.Namespace) -> tuple[CliRequest, Optiona
             tokens_lower[0] = tokens_lower[0][1:]
         break
 
-    if sum([requested_run, requested_clear, requested_intake, requested_mem, requested_config]) > 1:
+    if (
+        sum(
+            [
+                requested_run,
+                requested_clear,
+                requested_intake,
+                requested_mem,
+                requested_config,
+                requested_daemon,
+                requested_watch,
+                requested_stats,
+                requested_profiles,
+                requested_status,
+                requested_next_change,
+                requested_hooks,
+                requested_metrics,
+                requested_dashboard,
+            ]
+        )
+        > 1
+    ):
         return CliRequest(requested_run, False, False, False, False, None, None), (
-            "Cannot combine run, intake, mem, config, and clear."
+            COMMAND_CONFLICT_MESSAGE
         )
 
     if requested_run and tokens:
@@ -159,6 +319,111 @@ def normalize_cli_request(args: argparse.Namespace) -> tuple[CliRequest, Optiona
             "config does not accept a duration."
         )
 
+    if getattr(args, "metrics_file", None) and not (
+        requested_metrics or requested_daemon
+    ):
+        return CliRequest(requested_run, False, False, False, False, None, None), (
+            "--metrics-file requires the metrics or daemon command."
+        )
+
+    if requested_daemon:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "daemon does not accept a duration."
+            )
+        return CliRequest(False, False, False, False, False, None, None, daemon=True), None
+
+    if requested_watch:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "watch does not accept a duration."
+            )
+        return CliRequest(False, False, False, False, False, None, None, watch=True), None
+
+    if requested_stats:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "stats does not accept a duration."
+            )
+        return CliRequest(False, False, False, False, False, None, None, stats=True), None
+
+    if getattr(args, "batch", None) and not requested_status:
+        return CliRequest(requested_run, False, False, False, False, None, None), (
+            "--batch requires the status command."
+        )
+
+    if requested_status:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "status does not accept a duration."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, status=True),
+            None,
+        )
+
+    if requested_next_change:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "next-change does not accept a duration."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, next_change=True),
+            None,
+        )
+
+    has_hook_commands = bool(
+        getattr(args, "on_expire", None) or getattr(args, "on_color", None)
+    )
+    if has_hook_commands and not requested_hooks:
+        return CliRequest(requested_run, False, False, False, False, None, None), (
+            "--on-expire and --on-color require the hooks command."
+        )
+
+    if requested_hooks:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "hooks does not accept a duration."
+            )
+        if not has_hook_commands:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "hooks requires --on-expire or --on-color."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, hooks=True),
+            None,
+        )
+
+    if requested_metrics:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "metrics does not accept a duration."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, metrics=True),
+            None,
+        )
+
+    if requested_dashboard:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "dashboard does not accept a duration."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, dashboard=True),
+            None,
+        )
+
+    if requested_profiles:
+        if tokens:
+            return CliRequest(requested_run, False, False, False, False, None, None), (
+                "profiles does not accept a duration."
+            )
+        return (
+            CliRequest(False, False, False, False, False, None, None, profiles=True),
+            None,
+        )
+
     if requested_mem:
         mem_duration = " ".join(tokens) if tokens else None
         return (
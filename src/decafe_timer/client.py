@@ -0,0 +1,86 @@
+"""Minimal status client for a running ``decafe-timer daemon``.
+
+Only the standard library's ``os``/``socket``/``sys``/``json`` are imported on
+the fast path; if the daemon is not reachable the full CLI is loaded instead.
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_ENV = "DECAFE_TIMER_SOCKET"
+SOCKET_NAME = "decafe-timer.sock"
+QUERY_TIMEOUT_SEC = 0.5
+QUERY_OPTIONS = ("--layout", "--bar-style", "--color")
+
+
+def socket_path() -> str:
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join("/tmp", f"decafe-timer-{uid}.sock")
+
+
+def query(request: dict, *, path=None, timeout: float = QUERY_TIMEOUT_SEC):
+    """Send one request to the daemon; return the reply text or None."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path or socket_path())
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            chunks = []
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b"".join(chunks).decode("utf-8")
+
+
+def _parse_query_args(argv):
+    """Parse the snapshot options; return None for anything else."""
+    request = {}
+    index = 0
+    while index < len(argv):
+        token = argv[index]
+        name, sep, value = token.partition("=")
+        if name not in QUERY_OPTIONS:
+            return None
+        if not sep:
+            index += 1
+            if index >= len(argv):
+                return None
+            value = argv[index]
+        request[name[2:].replace("-", "_")] = value
+        index += 1
+    color = request.get("color", "auto")
+    if color == "auto":
+        request["color"] = "always" if sys.stdout.isatty() else "never"
+    return request
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    request = _parse_query_args(list(argv))
+    if request is not None:
+        reply = query(request)
+        if reply:
+            sys.stdout.write(reply)
+            return
+    from .main import main as full_main
+
+    full_main(list(argv))
+
+
+if __name__ == "__main__":
+    main()
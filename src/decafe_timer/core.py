@@ -0,0 +1,206 @@
+"""Pure timer API: immutable values in, new values or rendered text out.
+
+Nothing here reads the clock, touches files, or prints; callers pass ``now``
+(epoch seconds) explicitly. A host process can keep a ``TimerState`` in
+memory and render it as often as it likes; ``state.load_timer`` and
+``state.save_timer`` are the storage layer for sharing it with the CLI.
+
+Kept free of dataclasses/typing imports: the CLI's snapshot path renders
+through this module (see ``main._run_fast_snapshot``).
+"""
+
+from __future__ import annotations
+
+from .render import (
+    BAR_STYLE_GREEK_CROSS,
+    BAR_STYLES,
+    format_remaining,
+    format_timestamp,
+    next_change_at as _next_change_at,
+    render_snapshot_line,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .state import StateSnapshot
+
+DEFAULT_MEM_SEC = 3 * 60 * 60
+
+LAYOUT_DEFAULT = "default"
+LAYOUT_ONE_LINE = "one-line"
+LAYOUT_GRAPH_ONLY = "graph-only"
+LAYOUT_CHOICES = (LAYOUT_DEFAULT, LAYOUT_ONE_LINE, LAYOUT_GRAPH_ONLY)
+
+NO_ACTIVE_TIMER_MESSAGE = "---"
+EXPIRED_LABEL = "Expired"
+EXPIRED_MESSAGES = [
+    "Cooldown expired! ☕ You may drink coffee now.",
+    # Gentle encouragement
+    "Your break is over -- enjoy your coffee, gently.",
+    "You’ve waited well. Treat yourself to a warm cup.",
+    "Time’s up. A calm sip is yours.",
+    # Soft, calming tone
+    "Your coffee time has arrived -- relax and enjoy.",
+    "A warm cup is waiting for you.",
+    "The timer’s done. Brew a moment of comfort.",
+    "Ease back in. Coffee is ready when you are.",
+    # Light humor
+    "Permission granted: caffeination may proceed.",
+    "Coffee mode unlocked. Use wisely.",
+    "Alert: Bean protocol complete.",
+    # Gentle behavior support
+    "If you choose to, a small cup won’t hurt now.",
+    "Ready when you are. Keep listening to your body.",
+    "You did the wait. Now choose what feels right.",
+]
+
+
+class _Frozen:
+    """Slotted value object: fields are set once in ``__init__``."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._fields())
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+    def __reduce__(self):
+        return self.__class__, self._fields()
+
+
+class TimerState(_Frozen):
+    """When caffeine clears (``finish_at``, None when cleared) and the bar scale."""
+
+    __slots__ = ("finish_at", "mem_sec")
+
+    def __init__(self, finish_at: int | None = None, mem_sec: int = DEFAULT_MEM_SEC):
+        if mem_sec <= 0:
+            raise ValueError("Duration must be positive.")
+        init = object.__setattr__
+        init(self, "finish_at", None if finish_at is None else int(finish_at))
+        init(self, "mem_sec", int(mem_sec))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: StateSnapshot) -> TimerState:
+        return cls(snapshot.finish_at, snapshot.effective_mem_sec)
+
+
+class RenderOptions(_Frozen):
+    """How to render a ``TimerState``; the same choices as the CLI options."""
+
+    __slots__ = ("layout", "bar_style", "use_ansi")
+
+    def __init__(
+        self,
+        layout: str = LAYOUT_DEFAULT,
+        bar_style: str = BAR_STYLE_GREEK_CROSS,
+        use_ansi: bool = False,
+    ):
+        if layout not in LAYOUT_CHOICES:
+            raise ValueError(f"Unknown layout: {layout!r}")
+        if bar_style not in BAR_STYLES:
+            raise ValueError(f"Unknown bar style: {bar_style!r}")
+        init = object.__setattr__
+        init(self, "layout", layout)
+        init(self, "bar_style", bar_style)
+        init(self, "use_ansi", bool(use_ansi))
+
+
+# ------------------------------
+# Transitions
+# ------------------------------
+def intake(timer: TimerState, added_sec: int, *, now: int) -> TimerState:
+    """Add ``added_sec``; an expired or cleared timer restarts from ``now``."""
+    if added_sec <= 0:
+        raise ValueError("Duration must be positive.")
+    finish_at = timer.finish_at
+    if finish_at is None or finish_at <= now:
+        finish_at = int(now)
+    return TimerState(finish_at + added_sec, timer.mem_sec)
+
+
+def clear(timer: TimerState) -> TimerState:
+    return TimerState(None, timer.mem_sec)
+
+
+def set_mem(timer: TimerState, mem_sec: int) -> TimerState:
+    return TimerState(timer.finish_at, mem_sec)
+
+
+def remaining_at(timer: TimerState, t: float) -> int | None:
+    """Whole seconds left at ``t`` as the CLI counts them; None when cleared."""
+    if timer.finish_at is None:
+        return None
+    return max(int(timer.finish_at - t), 0)
+
+
+# ------------------------------
+# Rendering
+# ------------------------------
+def expired_message(timer: TimerState) -> str:
+    """The closing message, fixed per timer so repeated renders agree."""
+    import hashlib
+
+    key = f"{timer.finish_at}-{timer.mem_sec}".encode("utf-8")
+    digest = hashlib.sha256(key).digest()
+    index = int.from_bytes(digest[:8], "big") % len(EXPIRED_MESSAGES)
+    return EXPIRED_MESSAGES[index]
+
+
+def render_lines(timer: TimerState, options: RenderOptions, *, now: float) -> list[str]:
+    """The lines ``decafe-timer`` prints for ``timer`` at ``now``."""
+    finish_at = timer.finish_at
+    if finish_at is None:
+        return [NO_ACTIVE_TIMER_MESSAGE]
+    remaining_sec = int(finish_at - now)
+    if remaining_sec <= 0:
+        return [EXPIRED_LABEL, expired_message(timer)]
+    layout = options.layout
+    line = render_snapshot_line(
+        remaining_sec,
+        timer.mem_sec,
+        graph_only=layout != LAYOUT_ONE_LINE,
+        bar_style=options.bar_style,
+        use_ansi=options.use_ansi,
+    )
+    if layout != LAYOUT_DEFAULT:
+        return [line]
+    return [
+        f"Remaining: {format_remaining(remaining_sec)}",
+        f"Clears at: {format_timestamp(finish_at)}",
+        line,
+    ]
+
+
+def next_change_at(
+    timer: TimerState, options: RenderOptions, *, now: float
+) -> int | None:
+    """Epoch second after which ``render_lines`` next differs (see render)."""
+    if timer.finish_at is None:
+        return None
+    return _next_change_at(
+        timer.finish_at,
+        timer.mem_sec,
+        now=now,
+        graph_only=options.layout == LAYOUT_GRAPH_ONLY,
+        bar_style=options.bar_style,
+        use_ansi=options.use_ansi,
+    )
@@ -0,0 +1,222 @@
+"""Long-running status server behind ``decafe-timer daemon``.
+
+The daemon keeps the parsed state in memory, reloads it only when the state
+file changes, and answers one JSON request per connection on a Unix socket
+with the rendered snapshot text (see ``client.py`` for the other side).
+A ``{"metrics": true}`` request is answered with the OpenMetrics exposition
+(``metrics.py``), including the daemon's own state reads and render
+latencies; with ``--metrics-file`` the same text is rewritten every
+``METRICS_INTERVAL_SEC``.
+"""
+
+import json
+import os
+import selectors
+import signal
+import socket
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+from .client import socket_path
+from .main import (
+    _resolve_effective_bar_style,
+    _resolve_effective_render_flags,
+    _snapshot_status_lines,
+)
+from .metrics import ToolHealth, render_metrics, write_atomic
+from .state import BAR_STYLE_CHOICES, load_snapshot, watch_state
+
+LAYOUT_CHOICES = ("default", "one-line", "graph-only")
+COLOR_CHOICES = ("always", "never")
+MAX_REQUEST_BYTES = 4096
+CLIENT_TIMEOUT_SEC = 1.0
+METRICS_INTERVAL_SEC = 15.0
+
+
+class DaemonAlreadyRunning(RuntimeError):
+    pass
+
+
+def _parse_request(raw: bytes) -> Optional[SimpleNamespace]:
+    try:
+        data = json.loads(raw.decode("utf-8") or "{}")
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    if data.get("metrics") is True:
+        return SimpleNamespace(metrics=True)
+    layout = data.get("layout")
+    bar_style = data.get("bar_style")
+    color = data.get("color", "never")
+    if layout is not None and layout not in LAYOUT_CHOICES:
+        return None
+    if bar_style is not None and bar_style not in BAR_STYLE_CHOICES:
+        return None
+    if color not in COLOR_CHOICES:
+        return None
+    # Shaped like the argparse namespace so the CLI resolvers can be reused.
+    return SimpleNamespace(
+        layout=layout,
+        bar_style=bar_style,
+        color=color,
+        one_line=None,
+        graph_only=None,
+        metrics=False,
+    )
+
+
+class StatusDaemon:
+    def __init__(
+        self, path: Optional[str] = None, *, metrics_file: Optional[str] = None
+    ):
+        self.path = path or socket_path()
+        self.metrics_file = metrics_file
+        self.health = ToolHealth(state_reads=1)
+        self.snapshot = load_snapshot()
+        self.watcher = watch_state()
+        self.server: Optional[socket.socket] = None
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._stopping = False
+
+    def render(self, args: SimpleNamespace) -> str:
+        started = time.perf_counter()
+        snapshot = self.snapshot
+        one_line, graph_only = _resolve_effective_render_flags(args, snapshot)
+        lines = _snapshot_status_lines(
+            snapshot.finish_at,
+            snapshot.effective_mem_sec,
+            one_line=one_line,
+            graph_only=graph_only,
+            bar_style=_resolve_effective_bar_style(args, snapshot),
+            use_ansi=args.color == "always",
+        )
+        text = "".join(f"{line}\n" for line in lines)
+        self.health.render.observe(time.perf_counter() - started)
+        return text
+
+    def metrics(self) -> str:
+        return render_metrics(health=self.health)
+
+    def write_metrics(self):
+        assert self.metrics_file is not None
+        try:
+            write_atomic(self.metrics_file, self.metrics())
+        except OSError as exc:
+            print(f"Cannot write {self.metrics_file}: {exc}")
+
+    def reload_if_changed(self):
+        if self.watcher.poll():
+            self.snapshot = load_snapshot()
+            self.health.state_reads += 1
+
+    def _bind(self):
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise DaemonAlreadyRunning(self.path)
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        server.setblocking(False)
+        self.server = server
+
+    def _handle(self, conn: socket.socket):
+        with conn:
+            conn.settimeout(CLIENT_TIMEOUT_SEC)
+            raw = b""
+            try:
+                while b"\n" not in raw and len(raw) < MAX_REQUEST_BYTES:
+                    chunk = conn.recv(MAX_REQUEST_BYTES)
+                    if not chunk:
+                        break
+                    raw += chunk
+                args = _parse_request(raw.split(b"\n", 1)[0])
+                if args is None:
+                    return
+                if args.metrics:
+                    reply = self.metrics()
+                else:
+                    self.reload_if_changed()
+                    reply = self.render(args)
+                conn.sendall(reply.encode("utf-8"))
+            except OSError:
+                return
+
+    def serve_forever(self):
+        try:
+            self._bind()
+        except BaseException:
+            self.watcher.close()
+            raise
+        assert self.server is not None
+        selector = selectors.DefaultSelector()
+        selector.register(self.server, selectors.EVENT_READ)
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        watch_fd = self.watcher.fileno()
+        if watch_fd is not None:
+            selector.register(watch_fd, selectors.EVENT_READ)
+        poll_timeout = None if watch_fd is not None else self.watcher.poll_interval
+        next_metrics = time.monotonic()
+        try:
+            while not self._stopping:
+                timeout = poll_timeout
+                if self.metrics_file is not None:
+                    if time.monotonic() >= next_metrics:
+                        self.write_metrics()
+                        next_metrics = time.monotonic() + METRICS_INTERVAL_SEC
+                    until_metrics = max(next_metrics - time.monotonic(), 0.0)
+                    timeout = min(timeout or until_metrics, until_metrics)
+                for key, _mask in selector.select(timeout):
+                    if key.fileobj is self.server:
+                        try:
+                            conn, _addr = self.server.accept()
+                        except BlockingIOError:
+                            continue
+                        self._handle(conn)
+                self.reload_if_changed()
+        finally:
+            selector.close()
+            self.close()
+
+    def stop(self):
+        """Ask a running ``serve_forever`` to return (safe from other threads)."""
+        self._stopping = True
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self.watcher.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+
+def run_daemon(path: Optional[str] = None, *, metrics_file: Optional[str] = None):
+    daemon = StatusDaemon(path, metrics_file=metrics_file)
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: daemon.stop())
+    try:
+        daemon.serve_forever()
+    except DaemonAlreadyRunning as exc:
+        print(f"Daemon already running at {exc}")
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,346 @@
+"""``decafe-timer dashboard``: every profile's timer in one terminal.
+
+Each profile is one aligned row (name, then the one-line or graph-only
+frame). A single asyncio task drives all of them: every row knows from
+``core.next_change_at`` when its text next changes, those deadlines share
+one heap, and the task sleeps until the earliest. Only the rows that are due
+are re-rendered, and a row is rewritten only when its text differs, through
+its own ``termdiff.LineDiffer`` between relative cursor moves; all updates
+of one wake-up go out in a single write. With the one-line layout that is
+one wake-up a second for every row together; graph-only rows wake only when
+their bar changes.
+
+State is reloaded on change notifications: a ``filewatch.PathsWatcher``
+follows every profile's files (the database, with the SQLite backend) on one
+inotify descriptor registered with the event loop, and only profiles whose
+files changed are re-read. The profile list is re-listed every
+``RESCAN_INTERVAL_SEC`` to pick up new profiles.
+
+Rows are reached with relative cursor moves, which stop at the top of the
+screen, so only as many rows as fit above the cursor line are drawn (the rest
+are summarized on one line); the layout is redrawn when the terminal is
+resized. Without cursor-movement support (not a TTY) changed rows are
+printed as new lines instead.
+"""
+
+import asyncio
+import heapq
+import itertools
+import shutil
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional, TextIO
+
+from . import state
+from .core import (
+    LAYOUT_GRAPH_ONLY,
+    LAYOUT_ONE_LINE,
+    RenderOptions,
+    TimerState,
+    next_change_at,
+    render_lines,
+)
+from .filewatch import PathsWatcher
+from .render import render_live_frame
+from .termdiff import LineDiffer, supports_cursor_moves
+from .ticks import WAKE_SLACK_SEC
+
+RESCAN_INTERVAL_SEC = 5.0
+LABEL_GAP = "  "
+ESC = "\x1b"
+
+
+@dataclass
+class Row:
+    profile: str
+    timer: TimerState
+    options: RenderOptions
+    differ: LineDiffer
+    index: int = 0
+    parts: tuple[str, ...] = ()
+    generation: int = 0
+
+
+class Dashboard:
+    def __init__(
+        self,
+        *,
+        graph_only: bool = False,
+        bar_style: Optional[str] = None,
+        use_ansi: bool = False,
+        stream: Optional[TextIO] = None,
+    ):
+        self.stream = stream or sys.stdout
+        self.incremental = supports_cursor_moves(self.stream)
+        self.layout = LAYOUT_GRAPH_ONLY if graph_only else LAYOUT_ONE_LINE
+        self.bar_style = bar_style
+        self.use_ansi = use_ansi
+        self.rows: dict[str, Row] = {}
+        self.order: list[str] = []
+        self.watcher = PathsWatcher()
+        self._watched: dict[str, list[str]] = {}  # path -> profiles
+        self._label_width = 0
+        # (due_at, tie-breaker, profile, generation); rows get a new
+        # generation from the same counter whenever they are (re)loaded.
+        self._heap: list[tuple[int, int, str, int]] = []
+        self._counter = itertools.count()
+        self._drawn = 0
+        self._shown = 0  # rows with index below this are on screen
+        self._resized = False
+        self._stopping = False
+        self._wake: Optional[asyncio.Event] = None
+
+    # ------------------------------
+    # Rows
+    # ------------------------------
+    def _row_state(self, profile: str) -> tuple[TimerState, RenderOptions]:
+        snapshot = state.load_profile_snapshot(profile)
+        options = RenderOptions(
+            self.layout,
+            self.bar_style or snapshot.effective_bar_style,
+            self.use_ansi,
+        )
+        return TimerState.from_snapshot(snapshot), options
+
+    def _schedule(self, row: Row, now: float):
+        due_at = next_change_at(row.timer, row.options, now=now)
+        if due_at is not None:
+            heapq.heappush(
+                self._heap, (due_at, next(self._counter), row.profile, row.generation)
+            )
+
+    def _label(self, row: Row) -> str:
+        return f"{row.profile:<{self._label_width}}{LABEL_GAP}"
+
+    def _frame(self, row: Row, now: float) -> tuple[str, ...]:
+        """The row's text at ``now``, in parts for ``LineDiffer``.
+
+        Running timers use the live loop's frame table, so the bar part is a
+        shared string the differ has already split; otherwise the first
+        ``render_lines`` line ("Expired" or "---").
+        """
+        timer, options = row.timer, row.options
+        if timer.finish_at is not None:
+            remaining_sec = int(timer.finish_at - now)
+            if remaining_sec > 0:
+                prefix, bar, _cells = render_live_frame(
+                    remaining_sec,
+                    timer.mem_sec,
+                    graph_only=options.layout == LAYOUT_GRAPH_ONLY,
+                    bar_style=options.bar_style,
+                    use_ansi=options.use_ansi,
+                )
+                return prefix, bar
+        return (render_lines(timer, options, now=now)[0],)
+
+    def _update_row(self, row: Row, now: float) -> str:
+        """Return what to write so ``row`` shows its frame at ``now``."""
+        if self.incremental and row.index >= self._shown:
+            return ""
+        parts = self._frame(row, now)
+        if parts == row.parts:
+            return ""
+        row.parts = parts
+        if not self.incremental:
+            return f"{self._label(row)}{''.join(parts)}\n"
+        output = row.differ.update(self._label(row), *parts)
+        if not output:
+            return ""
+        up = self._drawn - row.index
+        return f"{ESC}[{up}A{output}{ESC}[{up}B"
+
+    def sync_profiles(self, now: float) -> str:
+        """Follow added and removed profiles; redraw everything if any."""
+        names = state.profile_names()
+        if names == self.order:
+            return ""
+        for profile in set(self.rows) - set(names):
+            del self.rows[profile]
+            self._unwatch(profile)
+        for profile in names:
+            if profile in self.rows:
+                continue
+            timer, options = self._row_state(profile)
+            row = Row(profile, timer, options, LineDiffer())
+            row.generation = next(self._counter)
+            self.rows[profile] = row
+            self._schedule(row, now)
+            for path in state.profile_watch_paths(profile):
+                self.watcher.add(path)
+                profiles = self._watched.setdefault(path, [])
+                if profile not in profiles:
+                    profiles.append(profile)
+        self.order = list(names)
+        for index, profile in enumerate(names):
+            self.rows[profile].index = index
+        self._label_width = max(map(len, names), default=0)
+        return self.redraw(now)
+
+    def _unwatch(self, profile: str):
+        for path, profiles in list(self._watched.items()):
+            if profile in profiles:
+                profiles.remove(profile)
+            if not profiles:
+                del self._watched[path]
+                self.watcher.discard(path)
+
+    def reload(self, paths: set[str], now: float) -> str:
+        """Re-read the profiles whose files are in ``paths``."""
+        profiles = {
+            profile for path in paths for profile in self._watched.get(path, ())
+        }
+        output = []
+        for profile in sorted(profiles):
+            row = self.rows.get(profile)
+            if row is None:
+                continue
+            timer, options = self._row_state(profile)
+            if (timer, options) == (row.timer, row.options):
+                continue
+            row.timer, row.options = timer, options
+            row.generation = next(self._counter)
+            self._schedule(row, now)
+            output.append(self._update_row(row, now))
+        return "".join(output)
+
+    def _fitting_rows(self) -> int:
+        """Lines the rows may take; the cursor rests on the line below them."""
+        if not self.incremental:
+            return len(self.order)
+        return max(shutil.get_terminal_size().lines - 1, 1)
+
+    def redraw(self, now: float) -> str:
+        output = []
+        if self.incremental and self._drawn:
+            output.append(f"{ESC}[{self._drawn}A\r{ESC}[J")
+        fitting = self._fitting_rows()
+        self._shown = len(self.order)
+        if self._shown > fitting:
+            self._shown = fitting - 1
+        for profile in self.order[: self._shown]:
+            row = self.rows[profile]
+            row.differ = LineDiffer(incremental=self.incremental)
+            row.parts = self._frame(row, now)
+            if self.incremental:
+                output.append(row.differ.update(self._label(row), *row.parts) + "\n")
+            else:
+                output.append(f"{self._label(row)}{''.join(row.parts)}\n")
+        hidden = len(self.order) - self._shown
+        if hidden:
+            output.append(f"(+{hidden} more profiles)\n")
+        self._drawn = self._shown + bool(hidden)
+        return "".join(output)
+
+    def resized(self):
+        """Redraw on the next wake-up; the SIGWINCH handler."""
+        self._resized = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def render_due(self, now: float) -> str:
+        """Update the rows whose text changes at or before ``now``."""
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] < now:
+            _due_at, _tie, profile, generation = heapq.heappop(heap)
+            row = self.rows.get(profile)
+            if row is not None and row.generation == generation:
+                due.append(row)
+        output = []
+        for row in due:
+            output.append(self._update_row(row, now))
+            self._schedule(row, now)
+        return "".join(output)
+
+    def next_wake(self) -> Optional[float]:
+        """Epoch time of the earliest row change, None if no row will change."""
+        heap = self._heap
+        while heap:
+            _due_at, _tie, profile, generation = heap[0]
+            row = self.rows.get(profile)
+            if row is not None and row.generation == generation:
+                return heap[0][0] + WAKE_SLACK_SEC
+            heapq.heappop(heap)
+        return None
+
+    # ------------------------------
+    # Event loop
+    # ------------------------------
+    def _write(self, output: str):
+        if output:
+            self.stream.write(output)
+            self.stream.flush()
+
+    def stop(self):
+        """Ask ``run`` to return; call from the event loop's thread."""
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._wake = wake = asyncio.Event()
+        fd = self.watcher.fileno()
+        if fd is not None:
+            loop.add_reader(fd, wake.set)
+        sigwinch = getattr(signal, "SIGWINCH", None)
+        if sigwinch is not None:
+            try:
+                loop.add_signal_handler(sigwinch, self.resized)
+            except (NotImplementedError, RuntimeError, ValueError):
+                sigwinch = None
+        try:
+            self._write(self.sync_profiles(time.time()))
+            next_scan = loop.time() + RESCAN_INTERVAL_SEC
+            while not self._stopping:
+                delay = next_scan - loop.time()
+                wake_at = self.next_wake()
+                if wake_at is not None:
+                    delay = min(delay, wake_at - time.time())
+                if fd is None:
+                    delay = min(delay, self.watcher.poll_interval)
+                try:
+                    await asyncio.wait_for(wake.wait(), max(delay, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+                if self._stopping:
+                    break
+                now = time.time()
+                output = [self.reload(self.watcher.changed(), now)]
+                if loop.time() >= next_scan:
+                    output.append(self.sync_profiles(now))
+                    next_scan = loop.time() + RESCAN_INTERVAL_SEC
+                if self._resized:
+                    self._resized = False
+                    output.append(self.redraw(now))
+                output.append(self.render_due(now))
+                self._write("".join(output))
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            if sigwinch is not None:
+                loop.remove_signal_handler(sigwinch)
+            self._wake = None
+
+    def close(self):
+        self.watcher.close()
+
+
+def run_dashboard(
+    *,
+    graph_only: bool = False,
+    bar_style: Optional[str] = None,
+    use_ansi: bool = False,
+):
+    dashboard = Dashboard(
+        graph_only=graph_only, bar_style=bar_style, use_ansi=use_ansi
+    )
+    try:
+        asyncio.run(dashboard.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dashboard.close()
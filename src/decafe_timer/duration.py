@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import re
-from datetime import timedelta
 
 
 DURATION_PATTERN = re.compile(r"(\d+)([hms])", re.IGNORECASE)
@@ -62,7 +61,7 @@ def _parse_single_duration(duration_str: str):
 
 
 def duration_to_seconds(hours: int, minutes: int, seconds: int) -> int:
-    return int(timedelta(hours=hours, minutes=minutes, seconds=seconds).total_seconds())
+    return hours * 3600 + minutes * 60 + seconds
 
 
 def parse_simple_duration(duration_str: str) -> int:
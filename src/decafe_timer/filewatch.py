@@ -0,0 +1,356 @@
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# inotify(7) constants.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+POLL_INTERVAL_SEC = 1.0
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        init1 = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError, ImportError):
+        return None
+    init1.argtypes = [ctypes.c_int]
+    init1.restype = ctypes.c_int
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    add_watch.restype = ctypes.c_int
+    return init1, add_watch
+
+
+def _signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class StateWatcher:
+    """Wait for changes to a file (and optionally its siblings in ``also``).
+
+    Uses inotify on the parent directory when available (writers replace the
+    file via rename, so watching the inode alone would miss updates) and falls
+    back to comparing ``stat`` signatures once per poll interval.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        also: tuple = (),
+        poll_interval: float = POLL_INTERVAL_SEC,
+    ):
+        self.path = Path(path)
+        self.paths = [self.path, *(Path(other) for other in also)]
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._signature = self._stat_signature()
+        self._open_inotify()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def fileno(self) -> Optional[int]:
+        return self._fd
+
+    def _open_inotify(self):
+        funcs = _load_inotify()
+        if funcs is None:
+            return
+        init1, add_watch = funcs
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        fd = init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return
+        if add_watch(fd, os.fsencode(self.path.parent), WATCH_MASK) < 0:
+            os.close(fd)
+            return
+        self._fd = fd
+
+    def _stat_signature(self):
+        return tuple(_signature(str(path)) for path in self.paths)
+
+    def _drain(self) -> bool:
+        """Consume pending inotify events; return True if the file was touched."""
+        assert self._fd is not None
+        names = {os.fsencode(path.name) for path in self.paths}
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                _wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                event_name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if event_name in names or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    changed = True
+        return changed
+
+    def poll(self) -> bool:
+        """Return True if the file changed since the last check (non-blocking)."""
+        if self._fd is not None:
+            return self._drain()
+        signature = self._stat_signature()
+        if signature != self._signature:
+            self._signature = signature
+            return True
+        return False
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds; return True as soon as the file changes."""
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            remaining = deadline - time.monotonic()
+            if self._fd is not None:
+                readable, _, _ = select.select([self._fd], [], [], max(remaining, 0.0))
+                if readable and self._drain():
+                    return True
+                if not readable:
+                    return False
+                continue
+            if self.poll():
+                return True
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PathsWatcher:
+    """Report which of many files changed, on one inotify descriptor.
+
+    ``StateWatcher`` follows one state; this follows any number (the
+    dashboard's profiles) without an inotify instance per file. Directories
+    are watched as above; without inotify, ``changed`` compares ``stat``
+    signatures and callers should call it every ``poll_interval``.
+    """
+
+    def __init__(self, paths=(), *, poll_interval: float = POLL_INTERVAL_SEC):
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._add_watch = None
+        # inotify watch descriptor -> directory -> {file name: path}
+        self._dirs: dict[int, str] = {}
+        self._names: dict[str, dict[bytes, str]] = {}
+        self._signatures: dict[str, object] = {}
+        funcs = _load_inotify()
+        if funcs is not None:
+            init1, self._add_watch = funcs
+            fd = init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+        for path in paths:
+            self.add(path)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def fileno(self) -> Optional[int]:
+        return self._fd
+
+    def add(self, path):
+        path = str(path)
+        if path in self._signatures:
+            return
+        self._signatures[path] = _signature(path)
+        directory, name = os.path.split(path)
+        names = self._names.get(directory)
+        if names is None:
+            names = self._names[directory] = {}
+            if self._fd is not None:
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                except OSError:
+                    pass
+                wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd >= 0:
+                    self._dirs[wd] = directory
+        names[os.fsencode(name)] = path
+
+    def discard(self, path):
+        """Stop reporting ``path``."""
+        path = str(path)
+        self._signatures.pop(path, None)
+        directory, name = os.path.split(path)
+        names = self._names.get(directory)
+        if names is None:
+            return
+        names.pop(os.fsencode(name), None)
+        if not names:
+            # Forget the directory so a later ``add`` watches it afresh (the
+            # kernel drops the watch if the directory is removed); events
+            # from its old descriptor are ignored meanwhile.
+            del self._names[directory]
+            for wd in [wd for wd, known in self._dirs.items() if known == directory]:
+                del self._dirs[wd]
+
+    def changed(self) -> set[str]:
+        """Return the watched paths touched since the last call (non-blocking)."""
+        if self._fd is None:
+            changed = set()
+            for path, signature in self._signatures.items():
+                current = _signature(path)
+                if current != signature:
+                    self._signatures[path] = current
+                    changed.add(path)
+            return changed
+        return self._drain()
+
+    def wait(self, timeout: float) -> set[str]:
+        """Block up to ``timeout`` seconds; return the paths that changed."""
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            remaining = deadline - time.monotonic()
+            if self._fd is not None:
+                readable, _, _ = select.select([self._fd], [], [], max(remaining, 0.0))
+                if not readable:
+                    return set()
+                changed = self._drain()
+                if changed:
+                    return changed
+                continue
+            changed = self.changed()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _drain(self) -> set[str]:
+        assert self._fd is not None
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                event_name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                names = self._names.get(self._dirs.get(wd, ""), {})
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    changed.update(names.values())
+                elif event_name in names:
+                    changed.add(names[event_name])
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GroupsWatcher:
+    """Report which named groups of files changed (a profile's state files).
+
+    Groups may share files (with the SQLite backend every profile is the
+    same database); a change to a shared file reports every group using it.
+    """
+
+    def __init__(self, *, poll_interval: float = POLL_INTERVAL_SEC):
+        self.watcher = PathsWatcher(poll_interval=poll_interval)
+        self._groups: dict[str, tuple[str, ...]] = {}
+        self._owners: dict[str, set[str]] = {}  # path -> group names
+
+    def names(self) -> set[str]:
+        return set(self._groups)
+
+    def add(self, name: str, paths):
+        self.discard(name)
+        self._groups[name] = paths = tuple(str(path) for path in paths)
+        for path in paths:
+            self.watcher.add(path)
+            self._owners.setdefault(path, set()).add(name)
+
+    def discard(self, name: str):
+        for path in self._groups.pop(name, ()):
+            owners = self._owners[path]
+            owners.discard(name)
+            if not owners:
+                del self._owners[path]
+                self.watcher.discard(path)
+
+    def _owning(self, paths: set[str]) -> set[str]:
+        return {name for path in paths for name in self._owners.get(path, ())}
+
+    def changed(self) -> set[str]:
+        """Return the groups touched since the last call (non-blocking)."""
+        return self._owning(self.watcher.changed())
+
+    def wait(self, timeout: float) -> set[str]:
+        """Block up to ``timeout`` seconds; return the groups that changed."""
+        return self._owning(self.watcher.wait(timeout))
+
+    def fileno(self) -> Optional[int]:
+        return self.watcher.fileno()
+
+    def close(self):
+        self.watcher.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,154 @@
+"""Append-only event journal behind the state file.
+
+Every state change is one JSON line ``{"rev": n, "at": epoch, "type": ...}``
+carrying the fields it sets. The current state is the checkpoint payload
+(``timer_state.json``) with the events newer than its ``revision`` replayed
+on top. Compaction moves the journal into the history file and writes a
+fresh checkpoint, so replay stays short while the full history is kept.
+"""
+
+from __future__ import annotations
+
+import os
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import BinaryIO, Optional
+
+EVENT_INTAKE = "intake"
+EVENT_MEM = "mem"
+EVENT_CONFIG = "config"
+EVENT_CLEAR = "clear"
+# Payload keys an event may set; everything else in an event is metadata.
+EVENT_FIELDS = ("finish_at", "mem_sec", "bar_style", "one_line", "graph_only")
+# Below this many bytes, ``iter_events(since=)`` scans instead of bisecting.
+SEEK_BLOCK = 4096
+
+
+def iter_events(path: str, *, since: int = 0) -> Iterator[dict]:
+    """Yield the well-formed events of a journal file, one line at a time.
+
+    A torn last line (crash mid-append) or any other malformed line is
+    skipped rather than invalidating the whole journal. With ``since``,
+    reading starts near the first event newer than that revision instead of
+    at the top of the file; some older events may still be yielded.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        if since:
+            _seek_after(f, since)
+        for line in f:
+            event = _parse_event(line)
+            if event is not None:
+                yield event
+
+
+def _parse_event(line: bytes) -> Optional[dict]:
+    # Imported on use, like in state: sidecar reads never need json.
+    import json
+
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    rev = event.get("rev")
+    if isinstance(rev, int) and not isinstance(rev, bool):
+        return event
+    return None
+
+
+def _seek_after(f: BinaryIO, since: int):
+    """Bisect ``f`` to a line start with no event newer than ``since`` before it.
+
+    Revisions only grow down the file, except that an interrupted compaction
+    archives a block twice; the repeat restarts lower and then runs on to the
+    newest revision, so every revision above a probed line still follows it.
+    """
+    low, high = 0, f.seek(0, os.SEEK_END)
+    while high - low > SEEK_BLOCK:
+        middle = (low + high) // 2
+        f.seek(middle)
+        f.readline()
+        event = _parse_event(f.readline())
+        if event is not None and event["rev"] <= since:
+            low = f.tell()
+        else:
+            high = middle
+    f.seek(low)
+
+
+def last_rev(path: str) -> int:
+    """Return the ``rev`` of the newest well-formed event (0 if none)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0
+    for line in reversed(data.splitlines()):
+        event = _parse_event(line)
+        if event is not None:
+            return event["rev"]
+    return 0
+
+
+def append_event(path: str, event: dict):
+    """Append ``event`` as one line; call with the state lock held.
+
+    A torn last line left by a crash is cut off first, so the new event
+    starts on a line of its own instead of being glued onto the fragment.
+    """
+    import json
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+        f.write((json.dumps(event) + "\n").encode("utf-8"))
+
+
+def apply_event(payload: dict, event: dict):
+    """Fold one event into a state payload in place."""
+    for key in EVENT_FIELDS:
+        if key in event:
+            payload[key] = event[key]
+    if event.get("type") == EVENT_CLEAR:
+        payload.pop("finish_at", None)
+    payload["revision"] = event["rev"]
+    if "at" in event:
+        payload["last_saved_at"] = event["at"]
+
+
+def replay(payload: dict, events: Iterable[dict], *, since: int) -> dict:
+    """Return ``payload`` with the events whose ``rev`` exceeds ``since`` applied."""
+    result = dict(payload)
+    for event in events:
+        if event["rev"] > since:
+            apply_event(result, event)
+            since = event["rev"]
+    return result
+
+
+def archive(journal_path: str, history_path: str):
+    """Append the journal's lines to the history file, then empty the journal."""
+    try:
+        with open(journal_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return
+    if data:
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        with open(history_path, "ab") as f:
+            f.write(data)
+    with open(journal_path, "wb"):
+        pass
@@ -1,325 +1,106 @@
-import hashlib
-import json
-import random
+# Heavier modules (argparse via .cli, hashlib, random, the tick scheduler)
+# are imported where they are used so the plain snapshot invocation starts
+# fast; see _run_fast_snapshot.
+from __future__ import annotations
+
+import os
 import sys
 import time
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Optional
-
-from .cli import CliRequest, normalize_cli_request, parse_cli_args
-from .duration import (
-    duration_to_seconds,
-    parse_simple_duration,
+from types import SimpleNamespace
+
+from .core import (
+    EXPIRED_LABEL,
+    EXPIRED_MESSAGES,
+    LAYOUT_DEFAULT,
+    LAYOUT_GRAPH_ONLY,
+    LAYOUT_ONE_LINE,
+    NO_ACTIVE_TIMER_MESSAGE,
+    RenderOptions,
+    TimerState,
+    expired_message,
+    intake,
+    render_lines,
 )
 from .render import (
-    BAR_STYLE_BLOCKS,
-    BAR_STYLE_COUNTING_ROD,
     BAR_STYLE_GREEK_CROSS,
     format_remaining,
-    render_live_line,
-    render_snapshot_line,
-    visible_length,
+    format_timestamp,
+    next_change_at,
+    next_change_remaining,
+    render_live_frame,
 )
-
-APP_NAME = "coffee_timer"
-APP_AUTHOR = "tos-kamiya"
-
-
-def _cache_dir() -> Path:
-    from appdirs import user_cache_dir
-
-    return Path(user_cache_dir(APP_NAME, APP_AUTHOR))
-
-
-def _state_file() -> Path:
-    return _cache_dir() / "timer_state.json"
-
-EXPIRED_MESSAGES = [
-    "Cooldown expired! ☕ You may drink coffee now.",
-    # Gentle encouragement
-    "Your break is over -- enjoy your coffee, gently.",
-    "You’ve waited well. Treat yourself to a warm cup.",
-    "Time’s up. A calm sip is yours.",
-    # Soft, calming tone
-    "Your coffee time has arrived -- relax and enjoy.",
-    "A warm cup is waiting for you.",
-    "The timer’s done. Brew a moment of comfort.",
-    "Ease back in. Coffee is ready when you are.",
-    # Light humor
-    "Permission granted: caffeination may proceed.",
-    "Coffee mode unlocked. Use wisely.",
-    "Alert: Bean protocol complete.",
-    # Gentle behavior support
-    "If you choose to, a small cup won’t hurt now.",
-    "Ready when you are. Keep listening to your body.",
-    "You did the wait. Now choose what feels right.",
-]
-NO_ACTIVE_TIMER_MESSAGE = "---"
-BROKEN_STATE_MESSAGE = "State file is invalid; ignoring it."
-
-DEFAULT_MEM_SEC = duration_to_seconds(3, 0, 0)
-DEFAULT_BAR_STYLE = BAR_STYLE_GREEK_CROSS
-DEFAULT_ONE_LINE = False
-DEFAULT_GRAPH_ONLY = False
-BAR_STYLE_CHOICES = (
-    BAR_STYLE_GREEK_CROSS,
-    BAR_STYLE_COUNTING_ROD,
-    BAR_STYLE_BLOCKS,
+from .state import (
+    BAR_STYLE_CHOICES,
+    StateConflict,
+    StateSnapshot,
+    active_profiles,
+    clear_state,
+    load_state,
+    load_snapshot,
+    lock_state,
+    save_mem,
+    save_render_config,
+    save_state,
+    use_profile,
+    watch_state,
 )
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .cli import CliRequest
+    from .metrics import ToolHealth
+    from .ticks import TickScheduler
 
-def _select_expired_message(
-    finish_at: Optional[datetime],
-    mem_sec: Optional[int],
-) -> str:
-    if finish_at is None or mem_sec is None:
-        return random.choice(EXPIRED_MESSAGES)
-    key = f"{finish_at.isoformat()}-{mem_sec}".encode("utf-8")
-    digest = hashlib.sha256(key).digest()
-    index = int.from_bytes(digest[:8], "big") % len(EXPIRED_MESSAGES)
-    return EXPIRED_MESSAGES[index]
-
-
-def _schedule_timer_seconds(remaining_sec: int, mem_sec: int):
-    """Create a new timer from seconds, persist it, and return (finish_at, mem_sec)."""
-    if remaining_sec <= 0 or mem_sec <= 0:
-        raise ValueError("Duration must be positive.")
-    finish_at = datetime.now() + timedelta(seconds=remaining_sec)
-    save_state(finish_at, mem_sec)
-    return finish_at, mem_sec
-
-
-# ------------------------------
-# Persistence helpers
-# ------------------------------
-_broken_state_notice_shown = False
-
-
-def _warn_broken_state():
-    global _broken_state_notice_shown
-    if _broken_state_notice_shown:
-        return
-    print(BROKEN_STATE_MESSAGE)
-    _broken_state_notice_shown = True
-
-
-def _read_state_payload():
-    state_file = _state_file()
-    if not state_file.exists():
-        return {}
-    try:
-        text = state_file.read_text()
-    except OSError:
-        _warn_broken_state()
-        return {}
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        _warn_broken_state()
-        return {}
-    if not isinstance(data, dict):
-        _warn_broken_state()
-        return {}
-    return data
-
-
-def _parse_finish_at(value) -> Optional[datetime]:
-    if value is None:
-        return None
-    try:
-        return datetime.fromisoformat(value)
-    except Exception:
-        return None
-
-
-def _parse_mem_sec(value) -> Optional[int]:
-    if value is None:
-        return None
-    try:
-        mem_sec = int(value)
-    except (TypeError, ValueError):
-        return None
-    if mem_sec <= 0:
-        return None
-    return mem_sec
+STATE_CONFLICT_MESSAGE = "State file keeps changing; please try again."
+STATE_UPDATE_ATTEMPTS = 5
 
+# Options the fast path understands; anything else goes through argparse.
+FAST_VALUE_OPTIONS = {
+    "--layout": ("default", "one-line", "graph-only"),
+    "--bar-style": BAR_STYLE_CHOICES,
+    "--color": ("auto", "always", "never"),
+}
+FAST_FLAG_OPTIONS = ("--one-line", "--graph-only", "--trace")
 
-def _parse_bool(value) -> Optional[bool]:
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, (int, float)):
-        if value in (0, 1):
-            return bool(int(value))
-        return None
-    if isinstance(value, str):
-        lowered = value.strip().lower()
-        if lowered in {"true", "1", "yes", "y", "on"}:
-            return True
-        if lowered in {"false", "0", "no", "n", "off"}:
-            return False
-    return None
+TRACE_ENV = "DECAFE_TIMER_TRACE"
+TRACE_FLAG = "--trace"
+TRACE_OFF_VALUES = ("", "0", "false", "no", "off")
 
 
-def _parse_bar_style(value) -> Optional[str]:
-    if value is None:
+def trace_setting() -> str | None:
+    """``DECAFE_TIMER_TRACE`` when it turns tracing on, else None."""
+    value = os.environ.get(TRACE_ENV, "")
+    if value.strip().lower() in TRACE_OFF_VALUES:
         return None
-    if value in BAR_STYLE_CHOICES:
-        return value
-    return None
+    return value
 
 
-def _resolve_mem_sec(payload: dict) -> Optional[int]:
-    mem_sec = _parse_mem_sec(payload.get("mem_sec"))
-    if mem_sec is None:
-        mem_sec = _parse_mem_sec(payload.get("duration_sec"))
-    return mem_sec
-
-
-def _resolve_bar_style(payload: dict) -> Optional[str]:
-    return _parse_bar_style(payload.get("bar_style"))
-
-
-def _resolve_one_line(payload: dict) -> Optional[bool]:
-    return _parse_bool(payload.get("one_line"))
-
-
-def _resolve_graph_only(payload: dict) -> Optional[bool]:
-    return _parse_bool(payload.get("graph_only"))
-
+def _select_expired_message(
+    finish_at: int | None,
+    mem_sec: int | None,
+) -> str:
+    if finish_at is None or mem_sec is None:
+        import random
 
-def _write_state_payload(payload: dict):
-    state_file = _state_file()
-    state_file.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = state_file.with_name(f"{state_file.name}.tmp")
-    tmp_path.write_text(json.dumps(payload))
-    tmp_path.replace(state_file)
+        return random.choice(EXPIRED_MESSAGES)
+    return expired_message(TimerState(finish_at, mem_sec))
 
 
-def save_state(
-    finish_at: datetime,
-    mem_sec: int,
-):
-    """Save finish time, display memory, and current time to cache."""
-    existing = _read_state_payload()
-    now = datetime.now()
-    payload = {
-        "finish_at": finish_at.isoformat(),
-        "mem_sec": int(mem_sec),
-        "last_saved_at": now.isoformat(),
-    }
-    if "bar_style" in existing:
-        bar_style = _resolve_bar_style(existing)
-        if bar_style is not None:
-            payload["bar_style"] = bar_style
-    if "one_line" in existing:
-        one_line = _resolve_one_line(existing)
-        if one_line is not None:
-            payload["one_line"] = one_line
-    if "graph_only" in existing:
-        graph_only = _resolve_graph_only(existing)
-        if graph_only is not None:
-            payload["graph_only"] = graph_only
-    _write_state_payload(payload)
-
-
-def load_state():
-    """Load finish time and display memory from cache."""
-    data = _read_state_payload()
-    finish_at = _parse_finish_at(data.get("finish_at"))
-    mem_sec = _resolve_mem_sec(data) or DEFAULT_MEM_SEC
+def _schedule_timer_seconds(remaining_sec: int, mem_sec: int):
+    """Create a new timer from seconds, persist it, and return (finish_at, mem_sec)."""
+    if remaining_sec <= 0 or mem_sec <= 0:
+        raise ValueError("Duration must be positive.")
+    finish_at = int(time.time()) + remaining_sec
+    save_state(finish_at, mem_sec, added_sec=remaining_sec)
     return finish_at, mem_sec
 
 
-def save_mem(mem_sec: int):
-    payload = _read_state_payload()
-    finish_at_raw = payload.get("finish_at")
-    resolved_bar_style = _resolve_bar_style(payload)
-    resolved_one_line = _resolve_one_line(payload)
-    resolved_graph_only = _resolve_graph_only(payload)
-    payload = {
-        "mem_sec": int(mem_sec),
-        "last_saved_at": datetime.now().isoformat(),
-    }
-    if resolved_bar_style is not None:
-        payload["bar_style"] = resolved_bar_style
-    if resolved_one_line is not None:
-        payload["one_line"] = resolved_one_line
-    if resolved_graph_only is not None:
-        payload["graph_only"] = resolved_graph_only
-    if finish_at_raw is not None:
-        payload["finish_at"] = finish_at_raw
-    _write_state_payload(payload)
-
-
-def load_mem_sec() -> int:
-    data = _read_state_payload()
-    return _resolve_mem_sec(data) or DEFAULT_MEM_SEC
-
-
-def load_bar_style() -> str:
-    data = _read_state_payload()
-    return _resolve_bar_style(data) or DEFAULT_BAR_STYLE
-
-
-def load_render_flags() -> tuple[bool, bool]:
-    data = _read_state_payload()
-    one_line = _resolve_one_line(data)
-    graph_only = _resolve_graph_only(data)
-    return (
-        one_line if one_line is not None else DEFAULT_ONE_LINE,
-        graph_only if graph_only is not None else DEFAULT_GRAPH_ONLY,
-    )
-
-
-def save_render_config(
-    *, bar_style: str, one_line: bool, graph_only: bool, mem_sec: Optional[int]
-):
-    payload = {
-        "bar_style": bar_style,
-        "one_line": bool(one_line),
-        "graph_only": bool(graph_only),
-        "last_saved_at": datetime.now().isoformat(),
-    }
-    if mem_sec is not None:
-        payload["mem_sec"] = int(mem_sec)
-    finish_at_raw = _read_state_payload().get("finish_at")
-    if finish_at_raw is not None:
-        payload["finish_at"] = finish_at_raw
-    _write_state_payload(payload)
-
-
-def clear_state():
-    payload = _read_state_payload()
-    mem_sec = _resolve_mem_sec(payload)
-    bar_style = _resolve_bar_style(payload)
-    one_line = _resolve_one_line(payload)
-    graph_only = _resolve_graph_only(payload)
-    if mem_sec is not None or bar_style is not None or one_line is not None or graph_only is not None:
-        _write_state_payload(
-            {
-                **({"mem_sec": int(mem_sec)} if mem_sec is not None else {}),
-                "bar_style": bar_style or DEFAULT_BAR_STYLE,
-                **({"one_line": one_line} if one_line is not None else {}),
-                **({"graph_only": graph_only} if graph_only is not None else {}),
-                "last_saved_at": datetime.now().isoformat(),
-            }
-        )
-        return
-    state_file = _state_file()
-    if state_file.exists():
-        try:
-            state_file.unlink()
-        except OSError:
-            pass
-
-
 # ------------------------------
 # Timer core
 # ------------------------------
 def run_timer_loop(
-    finish_at: Optional[datetime] = None,
-    mem_sec: Optional[int] = None,
+    finish_at: int | None = None,
+    mem_sec: int | None = None,
     *,
     one_line: bool = False,
     graph_only: bool = False,
@@ -333,11 +114,13 @@ def run_timer_loop(
             print(NO_ACTIVE_TIMER_MESSAGE)
             return
 
-    now = datetime.now()
-    if (finish_at - now) <= timedelta(0):
+    if finish_at <= time.time():
         _print_expired_message(finish_at, mem_sec)
         return
 
+    from .metrics import ToolHealth, record_health
+
+    health = ToolHealth()
     try:
         finish_at, mem_sec, was_cleared = _run_live_loop(
             finish_at,
@@ -346,6 +129,7 @@ def run_timer_loop(
             graph_only=graph_only,
             bar_style=bar_style,
             use_ansi=use_ansi,
+            health=health,
         )
 
         if was_cleared:
@@ -356,109 +140,141 @@ def run_timer_loop(
 
     except KeyboardInterrupt:
         print("\nInterrupted by user. Timer state saved.")
+    finally:
+        record_health(health)
 
 
 def _run_live_loop(
-    finish_at: datetime,
+    finish_at: int,
     mem_sec: int,
     *,
     one_line: bool = False,
     graph_only: bool = False,
     bar_style: str = BAR_STYLE_GREEK_CROSS,
     use_ansi: bool = False,
+    ticks: TickScheduler | None = None,
+    health: ToolHealth | None = None,
 ):
-    last_line_len = 0
-    was_cleared = False
+    """Run the countdown; pass ``ticks`` to inspect its drift stats afterwards.
 
-    while True:
-        loaded_finish_at, mem_sec = load_state()
-        if loaded_finish_at is None:
-            was_cleared = True
-            break
-        finish_at = loaded_finish_at
+    ``health`` collects render times, wake-up drift and state reads for
+    ``decafe-timer metrics``.
+    """
+    from .termdiff import LineDiffer, supports_cursor_moves
+    from .ticks import TickScheduler
 
-        now = datetime.now()
-        remaining = finish_at - now
-        remaining_sec = int(remaining.total_seconds())
+    differ = LineDiffer(incremental=supports_cursor_moves(sys.stdout))
+    was_cleared = False
+    reload = False
+    if ticks is None:
+        ticks = TickScheduler(finish_at)
+    else:
+        ticks.reanchor(finish_at)
+    if health is not None:
+        ticks.stats.observer = health.tick_drift.observe
+
+    with watch_state() as watcher:
+        while True:
+            if reload:
+                snapshot = load_snapshot()
+                if health is not None:
+                    health.state_reads += 1
+                if snapshot.finish_at is None:
+                    was_cleared = True
+                    break
+                finish_at, mem_sec = snapshot.finish_at, snapshot.effective_mem_sec
+                ticks.reanchor(finish_at)
+            else:
+                ticks.mark_wake()
 
-        if remaining_sec <= 0:
-            break
+            remaining_sec = ticks.remaining_sec()
 
-        line = render_live_line(
-            remaining_sec,
-            mem_sec,
-            graph_only=graph_only,
-            bar_style=bar_style,
-            use_ansi=use_ansi,
-        )
-        visible_len = visible_length(line) if use_ansi else len(line)
-        pad = max(last_line_len - visible_len, 0)
-        print(line + (" " * pad), end="\r", flush=True)
-        last_line_len = visible_len
+            if remaining_sec <= 0:
+                break
 
-        time.sleep(1)
+            started = time.perf_counter()
+            prefix, bar, width = render_live_frame(
+                remaining_sec,
+                mem_sec,
+                graph_only=graph_only,
+                bar_style=bar_style,
+                use_ansi=use_ansi,
+            )
+            if health is not None:
+                health.render.observe(time.perf_counter() - started)
+            # Only the cells that changed since the last frame are rewritten.
+            output = differ.update(prefix, bar, width=width)
+            if output:
+                print(output, end="", flush=True)
+
+            # Sleep until the rendered line would differ, waking early when
+            # intake/clear rewrites the state.
+            next_remaining_sec = next_change_remaining(
+                remaining_sec,
+                mem_sec,
+                graph_only=graph_only,
+                bar_style=bar_style,
+                use_ansi=use_ansi,
+            )
+            reload = watcher.wait(ticks.delay_until(next_remaining_sec))
 
-    if last_line_len:
-        print(" " * last_line_len, end="\r", flush=True)
+    output = differ.clear()
+    if output:
+        print(output, end="", flush=True)
     return finish_at, mem_sec, was_cleared
 
 
-def _print_snapshot_status(
-    finish_at: Optional[datetime],
+def _snapshot_status_lines(
+    finish_at: int | None,
     mem_sec: int,
     *,
     one_line: bool = False,
     graph_only: bool = False,
     bar_style: str = BAR_STYLE_GREEK_CROSS,
     use_ansi: bool = False,
-):
-    if finish_at is None:
-        print(NO_ACTIVE_TIMER_MESSAGE)
-        return
-    remaining_sec = int((finish_at - datetime.now()).total_seconds())
-    if remaining_sec <= 0:
-        _print_expired_message(finish_at, mem_sec)
-        return
-
+) -> list[str]:
     if graph_only:
-        line = render_snapshot_line(
-            remaining_sec,
-            mem_sec,
-            graph_only=True,
-            bar_style=bar_style,
-            use_ansi=use_ansi,
-        )
-        print(line)
-        return
+        layout = LAYOUT_GRAPH_ONLY
+    elif one_line:
+        layout = LAYOUT_ONE_LINE
+    else:
+        layout = LAYOUT_DEFAULT
+    return render_lines(
+        TimerState(finish_at, mem_sec),
+        RenderOptions(layout, bar_style, use_ansi),
+        now=time.time(),
+    )
 
-    if one_line:
-        line = render_snapshot_line(
-            remaining_sec,
-            mem_sec,
-            graph_only=False,
-            bar_style=bar_style,
-            use_ansi=use_ansi,
-        )
-        print(line)
-        return
 
-    expires_at = finish_at.strftime("%Y-%m-%d %H:%M:%S")
-    remaining_str = format_remaining(remaining_sec)
-    bar_line = render_snapshot_line(
-        remaining_sec,
+def _print_snapshot_status(
+    finish_at: int | None,
+    mem_sec: int,
+    *,
+    one_line: bool = False,
+    graph_only: bool = False,
+    bar_style: str = BAR_STYLE_GREEK_CROSS,
+    use_ansi: bool = False,
+):
+    for line in _snapshot_status_lines(
+        finish_at,
         mem_sec,
-        graph_only=True,
+        one_line=one_line,
+        graph_only=graph_only,
         bar_style=bar_style,
         use_ansi=use_ansi,
-    )
-    print(f"Remaining: {remaining_str}")
-    print(f"Clears at: {expires_at}")
-    print(bar_line)
+    ):
+        print(line)
+
 
+def _expired_message_lines(
+    finish_at: int | None, mem_sec: int | None
+) -> list[str]:
+    return [EXPIRED_LABEL, _select_expired_message(finish_at, mem_sec)]
 
-def _print_expired_message(finish_at: Optional[datetime], mem_sec: Optional[int]):
-    print("Expired")
-    print(_select_expired_message(finish_at, mem_sec))
+
+def _print_expired_message(finish_at: int | None, mem_sec: int | None):
+    for line in _expired_message_lines(finish_at, mem_sec):
+        print(line)
 
 
 def _should_use_ansi(args) -> bool:
@@ -470,12 +286,12 @@ def _should_use_ansi(args) -> bool:
     return sys.stdout.isatty()
 
 
-def _resolve_effective_bar_style(args) -> str:
-    return args.bar_style or load_bar_style()
+def _resolve_effective_bar_style(args, snapshot: StateSnapshot) -> str:
+    return args.bar_style or snapshot.effective_bar_style
 
 
-def _resolve_effective_render_flags(args) -> tuple[bool, bool]:
-    saved_one_line, saved_graph_only = load_render_flags()
+def _resolve_effective_render_flags(args, snapshot: StateSnapshot) -> tuple[bool, bool]:
+    saved_one_line, saved_graph_only = snapshot.render_flags
     one_line = args.one_line if args.one_line is not None else saved_one_line
     graph_only = args.graph_only if args.graph_only is not None else saved_graph_only
     if args.layout:
@@ -486,25 +302,242 @@ def _resolve_effective_render_flags(args) -> tuple[bool, bool]:
     return bool(one_line), bool(graph_only)
 
 
+def _print_next_change(args, *, output_format: str = "text"):
+    snapshot = load_snapshot()
+    _one_line, graph_only = _resolve_effective_render_flags(args, snapshot)
+    now = time.time()
+    change_at = None
+    if snapshot.finish_at is not None:
+        change_at = next_change_at(
+            snapshot.finish_at,
+            snapshot.effective_mem_sec,
+            now=now,
+            graph_only=graph_only,
+            bar_style=_resolve_effective_bar_style(args, snapshot),
+            use_ansi=_should_use_ansi(args),
+        )
+    if output_format == "json":
+        import json
+
+        delay_sec = None if change_at is None else round(max(change_at - now, 0), 3)
+        print(json.dumps({"next_change_at": change_at, "delay_sec": delay_sec}))
+        return
+    print(NO_ACTIVE_TIMER_MESSAGE if change_at is None else change_at)
+
+
+def _print_active_profiles(*, output_format: str = "text"):
+    now = int(time.time())
+    active = active_profiles(now)
+    if output_format == "json":
+        import json
+
+        for name, finish_at in active:
+            print(
+                json.dumps(
+                    {
+                        "profile": name,
+                        "finish_at": finish_at,
+                        "remaining_sec": finish_at - now,
+                    }
+                )
+            )
+        return
+    if not active:
+        print(NO_ACTIVE_TIMER_MESSAGE)
+        return
+    width = max(len(name) for name, _finish_at in active)
+    for name, finish_at in active:
+        print(
+            f"{name:<{width}}  {format_remaining(finish_at - now)}  "
+            f"{format_timestamp(finish_at)}"
+        )
+
+
 # ------------------------------
 # Entry point
 # ------------------------------
-def main(argv=None):
+def _parse_fast_args(argv: list[str]) -> SimpleNamespace | None:
+    """Parse a plain snapshot invocation; return None to defer to argparse."""
+    args = SimpleNamespace(
+        layout=None,
+        bar_style=None,
+        color="auto",
+        one_line=None,
+        graph_only=None,
+        trace=None,
+    )
+    index = 0
+    while index < len(argv):
+        token = argv[index]
+        if token in FAST_FLAG_OPTIONS:
+            setattr(args, token[2:].replace("-", "_"), True)
+            index += 1
+            continue
+        name, sep, value = token.partition("=")
+        choices = FAST_VALUE_OPTIONS.get(name)
+        if choices is None:
+            return None
+        if not sep:
+            index += 1
+            if index >= len(argv):
+                return None
+            value = argv[index]
+        if value not in choices:
+            return None
+        setattr(args, name[2:].replace("-", "_"), value)
+        index += 1
+    return args
+
+
+def _run_fast_snapshot(argv: list[str]) -> bool:
+    """Print the snapshot status without loading argparse; False if not handled."""
+    args = _parse_fast_args(argv)
+    if args is None:
+        return False
+    snapshot = load_snapshot()
+    one_line, graph_only = _resolve_effective_render_flags(args, snapshot)
+    _print_snapshot_status(
+        snapshot.finish_at,
+        snapshot.effective_mem_sec,
+        one_line=one_line,
+        graph_only=graph_only,
+        bar_style=_resolve_effective_bar_style(args, snapshot),
+        use_ansi=_should_use_ansi(args),
+    )
+    return True
+
+
+def _mutates_state(request: CliRequest) -> bool:
+    return (
+        request.clear
+        or request.config
+        or request.intake
+        or (request.mem and request.mem_duration is not None)
+    )
+
+
+def main(argv=None, *, import_started: float | None = None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if TRACE_FLAG in argv or trace_setting() is not None:
+        from .tracing import Tracer
+
+        import_sec = 0.0
+        if import_started is not None:
+            import_sec = time.perf_counter() - import_started
+        tracer = Tracer.from_environment(import_sec=import_sec)
+        tracer.install()
+        try:
+            return _main(argv)
+        finally:
+            tracer.finish(argv)
+    return _main(argv)
+
+
+def _main(argv: list[str]):
+    if _run_fast_snapshot(argv):
+        return
+    from .cli import normalize_cli_request, parse_cli_args
+
     args = parse_cli_args(argv)
-    effective_bar_style = _resolve_effective_bar_style(args)
-    effective_one_line, effective_graph_only = _resolve_effective_render_flags(args)
     request, error = normalize_cli_request(args)
     if error:
         print(error)
         return
+    try:
+        use_profile(args.profile)
+    except ValueError as exc:
+        print(exc)
+        return
+    if request.profiles:
+        _print_active_profiles(output_format=args.format)
+        return
+    if request.next_change:
+        _print_next_change(args, output_format=args.format)
+        return
+    if request.status and args.batch:
+        from .batch import run_batch
+
+        _one_line, graph_only = _resolve_effective_render_flags(
+            args, StateSnapshot()
+        )
+        run_batch(
+            args.batch,
+            output_format=args.format,
+            graph_only=graph_only,
+            bar_style=args.bar_style,
+            use_ansi=_should_use_ansi(args),
+        )
+        return
+    if request.hooks:
+        from .scheduler import run_hooks
+
+        run_hooks(args.on_expire or (), args.on_color or ())
+        return
+    if request.daemon:
+        from .daemon import run_daemon
+
+        run_daemon(metrics_file=args.metrics_file)
+        return
+    if request.dashboard:
+        from .dashboard import run_dashboard
+
+        _one_line, graph_only = _resolve_effective_render_flags(
+            args, StateSnapshot()
+        )
+        run_dashboard(
+            graph_only=graph_only,
+            bar_style=args.bar_style,
+            use_ansi=_should_use_ansi(args),
+        )
+        return
+    if request.metrics:
+        from .metrics import run_metrics
+
+        run_metrics(args.metrics_file)
+        return
+    if request.watch:
+        from .watch import run_watch
+
+        snapshot = load_snapshot()
+        one_line, graph_only = _resolve_effective_render_flags(args, snapshot)
+        run_watch(
+            snapshot,
+            output_format=args.format,
+            graph_only=graph_only,
+            bar_style=_resolve_effective_bar_style(args, snapshot),
+            use_ansi=_should_use_ansi(args),
+        )
+        return
+    if request.stats:
+        from .stats import run_stats
+
+        run_stats(by=args.by, output_format=args.format, reindex=args.index)
+        return
     args.run = request.run
-    resolved = _resolve_timer_state(
-        args,
-        request,
-        effective_bar_style,
-        effective_one_line,
-        effective_graph_only,
-    )
+    # Hold the lock across read-modify-write so concurrent intakes serialize;
+    # a conflict means a lock-less writer got in between, so re-read and retry.
+    with lock_state(enabled=_mutates_state(request)):
+        for _attempt in range(STATE_UPDATE_ATTEMPTS):
+            snapshot = load_snapshot()
+            effective_bar_style = _resolve_effective_bar_style(args, snapshot)
+            effective_one_line, effective_graph_only = (
+                _resolve_effective_render_flags(args, snapshot)
+            )
+            try:
+                resolved = _resolve_timer_state(
+                    args,
+                    request,
+                    snapshot,
+                    effective_bar_style,
+                    effective_one_line,
+                    effective_graph_only,
+                )
+                break
+            except StateConflict:
+                continue
+        else:
+            print(STATE_CONFLICT_MESSAGE)
+            return
     if resolved is None:
         return
     finish_at, mem_sec, new_timer_started = resolved
@@ -533,23 +566,27 @@ def main(argv=None):
 def _resolve_timer_state(
     args,
     request: CliRequest,
+    snapshot: StateSnapshot,
     bar_style: str,
     one_line: bool,
     graph_only: bool,
 ):
+    # Imported here: it pulls in ``re``, which plain snapshots never need.
+    from .duration import parse_simple_duration
+
     finish_at = None
     mem_sec = None
     new_timer_started = False
 
     if request.clear:
-        clear_state()
+        clear_state(snapshot=snapshot)
         print(NO_ACTIVE_TIMER_MESSAGE)
         return None
 
     if request.config:
-        mem_sec = load_mem_sec()
-        saved_bar_style = load_bar_style()
-        saved_one_line, saved_graph_only = load_render_flags()
+        mem_sec = snapshot.effective_mem_sec
+        saved_bar_style = snapshot.effective_bar_style
+        saved_one_line, saved_graph_only = snapshot.render_flags
         next_bar_style = saved_bar_style
         next_one_line = saved_one_line
         next_graph_only = saved_graph_only
@@ -577,6 +614,7 @@ def _resolve_timer_state(
                 one_line=next_one_line,
                 graph_only=next_graph_only,
                 mem_sec=mem_sec,
+                snapshot=snapshot,
             )
             saved_bar_style = next_bar_style
             saved_one_line = next_one_line
@@ -595,7 +633,7 @@ def _resolve_timer_state(
 
     if request.mem:
         if request.mem_duration is None:
-            mem_sec = load_mem_sec()
+            mem_sec = snapshot.effective_mem_sec
             print(f"Memory: {format_remaining(mem_sec)}")
             return None
         try:
@@ -604,7 +642,7 @@ def _resolve_timer_state(
             message = str(exc)
             print(message)
             return None
-        save_mem(mem_sec)
+        save_mem(mem_sec, snapshot=snapshot)
         print(f"Memory set to: {format_remaining(mem_sec)}")
         return None
 
@@ -613,24 +651,21 @@ def _resolve_timer_state(
             if request.duration:
                 added_sec = parse_simple_duration(request.duration)
             else:
-                added_sec = load_mem_sec()
+                added_sec = snapshot.effective_mem_sec
         except ValueError as exc:
             message = str(exc)
             print(message)
             return None
 
-        finish_at, mem_sec = load_state()
-        now = datetime.now()
-        if finish_at is None or finish_at <= now:
-            finish_at = now + timedelta(seconds=added_sec)
-            save_state(finish_at, mem_sec)
-            new_timer_started = True
-        else:
-            finish_at = finish_at + timedelta(seconds=added_sec)
-            save_state(finish_at, mem_sec)
-        return finish_at, mem_sec, new_timer_started
+        now = int(time.time())
+        timer = intake(TimerState.from_snapshot(snapshot), added_sec, now=now)
+        new_timer_started = snapshot.finish_at is None or snapshot.finish_at <= now
+        save_state(
+            timer.finish_at, timer.mem_sec, snapshot=snapshot, added_sec=added_sec
+        )
+        return timer.finish_at, timer.mem_sec, new_timer_started
 
-    finish_at, mem_sec = load_state()
+    finish_at, mem_sec = snapshot.finish_at, snapshot.effective_mem_sec
     if finish_at is None:
         print(NO_ACTIVE_TIMER_MESSAGE)
         return None
@@ -648,16 +683,16 @@ def _run_live_mode(
     one_line: bool,
     graph_only: bool,
 ):
-    if finish_at > datetime.now():
+    if finish_at > time.time():
         if new_timer_started:
             print(
                 "Caffeine intake recorded. "
-                f"Clears at {finish_at.strftime('%Y-%m-%d %H:%M:%S')}"
+                f"Clears at {format_timestamp(finish_at)}"
             )
         else:
             print(
                 "Resuming caffeine clearance. "
-                f"Clears at {finish_at.strftime('%Y-%m-%d %H:%M:%S')}"
+                f"Clears at {format_timestamp(finish_at)}"
             )
     run_timer_loop(
         finish_at,
@@ -0,0 +1,391 @@
+"""``decafe-timer metrics``: OpenMetrics text for monitoring.
+
+Per profile: remaining seconds, ``mem_sec``, the overflow ratio (time beyond
+the bar scale as a fraction of it), and intake, expiry and state-write
+totals. Intakes and expiries come from the event history; the fold is kept
+per profile in ``timer_metrics_cursor.json`` with the revision it reached,
+so a collection only reads the events of profiles that changed since the
+last one (otherwise it is one state read per profile).
+
+Tool health covers state reads, render latency and live-loop tick drift.
+The daemon reports its own reads and render requests; ``run`` sessions add
+their render times and wake-up drift to ``timer_health.json`` when they end,
+once that file exists (``metrics`` creates it), so nothing is written for
+users who never export metrics.
+
+Output files are replaced atomically (written beside the target, then
+``os.replace``), which is what node_exporter's textfile collector expects.
+"""
+
+import bisect
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from . import journal, state
+
+CURSOR_VERSION = 1
+RENDER_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+DRIFT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _cursor_file() -> str:
+    return os.path.join(state.cache_dir(), "timer_metrics_cursor.json")
+
+
+def _health_file() -> str:
+    return os.path.join(state.cache_dir(), "timer_health.json")
+
+
+def write_atomic(path: str, text: str):
+    """Replace ``path`` with ``text`` so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Per-process name: a daemon and a cron job may target the same file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ------------------------------
+# Tool health
+# ------------------------------
+@dataclass
+class Histogram:
+    """Fixed-bucket histogram; ``counts`` are per bucket, not cumulative."""
+
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if len(self.counts) != len(self.buckets):
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram"):
+        if other.buckets != self.buckets:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def as_dict(self) -> dict:
+        return {"counts": self.counts, "sum": self.sum, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, buckets: tuple[float, ...], data: dict) -> "Histogram":
+        counts = [int(value) for value in data.get("counts", [])]
+        if len(counts) != len(buckets):
+            # Saved with other bucket bounds; start over.
+            return cls(buckets)
+        return cls(buckets, counts, float(data["sum"]), int(data["count"]))
+
+
+@dataclass
+class ToolHealth:
+    state_reads: int = 0
+    render: Histogram = field(default_factory=lambda: Histogram(RENDER_BUCKETS))
+    tick_drift: Histogram = field(default_factory=lambda: Histogram(DRIFT_BUCKETS))
+
+    def merge(self, other: "ToolHealth"):
+        self.state_reads += other.state_reads
+        self.render.merge(other.render)
+        self.tick_drift.merge(other.tick_drift)
+
+    def as_dict(self) -> dict:
+        return {
+            "state_reads": self.state_reads,
+            "render": self.render.as_dict(),
+            "tick_drift": self.tick_drift.as_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ToolHealth":
+        return cls(
+            int(data.get("state_reads", 0)),
+            Histogram.from_dict(RENDER_BUCKETS, data.get("render", {})),
+            Histogram.from_dict(DRIFT_BUCKETS, data.get("tick_drift", {})),
+        )
+
+
+def load_health() -> ToolHealth:
+    try:
+        with open(_health_file(), encoding="utf-8") as f:
+            return ToolHealth.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return ToolHealth()
+
+
+def record_health(health: ToolHealth):
+    """Add ``health`` to the persisted totals, if metrics are being collected.
+
+    Concurrent sessions ending at the same moment may drop one's samples;
+    the totals are for monitoring, not accounting.
+    """
+    if not os.path.exists(_health_file()):
+        return
+    totals = load_health()
+    totals.merge(health)
+    try:
+        write_atomic(_health_file(), json.dumps(totals.as_dict()))
+    except OSError:
+        pass
+
+
+def _enable_health():
+    if not os.path.exists(_health_file()):
+        write_atomic(_health_file(), json.dumps(ToolHealth().as_dict()))
+
+
+# ------------------------------
+# Profiles
+# ------------------------------
+@dataclass
+class HistoryCounts:
+    """Intakes and expiries folded from a profile's history up to ``rev``."""
+
+    rev: int = 0
+    finish_at: Optional[int] = None
+    intakes: int = 0
+    expiries: int = 0
+
+    def feed(self, event: dict):
+        if event["rev"] <= self.rev:
+            return
+        self.rev = event["rev"]
+        at = event.get("at")
+        if (
+            self.finish_at is not None
+            and isinstance(at, (int, float))
+            and self.finish_at <= at
+        ):
+            # The timer ran out before this event changed anything.
+            self.expiries += 1
+            self.finish_at = None
+        kind = event.get("type")
+        if kind == journal.EVENT_INTAKE:
+            self.intakes += 1
+        if kind == journal.EVENT_CLEAR:
+            self.finish_at = None
+        elif "finish_at" in event:
+            self.finish_at = state.parse_finish_at(event["finish_at"])
+
+    def expiries_at(self, now: float) -> int:
+        """Expiries including a timer that has run out since the last event."""
+        pending = self.finish_at is not None and self.finish_at <= now
+        return self.expiries + int(pending)
+
+
+@dataclass
+class ProfileMetrics:
+    profile: str
+    remaining_sec: int
+    mem_sec: int
+    overflow_ratio: float
+    intakes: int
+    expiries: int
+    state_writes: int
+
+
+def _load_cursors() -> dict[str, HistoryCounts]:
+    try:
+        with open(_cursor_file(), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CURSOR_VERSION:
+            return {}
+        return {
+            name: HistoryCounts(**counts) for name, counts in data["profiles"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def _save_cursors(cursors: dict[str, HistoryCounts]):
+    data = {
+        "version": CURSOR_VERSION,
+        "profiles": {name: vars(counts) for name, counts in cursors.items()},
+    }
+    try:
+        write_atomic(_cursor_file(), json.dumps(data))
+    except OSError:
+        pass
+
+
+def _catch_up(counts: HistoryCounts, profile: str) -> HistoryCounts:
+    for event in state.profile_history(profile, counts.rev):
+        counts.feed(event)
+    return counts
+
+
+def collect_profiles(
+    *, now: float, health: Optional[ToolHealth] = None
+) -> list[ProfileMetrics]:
+    """Metrics of every stored profile; reads history only for changed ones."""
+    snapshots = state.profile_snapshots()
+    if health is not None:
+        health.state_reads += len(snapshots)
+    cursors = _load_cursors()
+    changed = set(cursors) - set(snapshots)
+    result = []
+    for name in sorted(snapshots):
+        snapshot = snapshots[name]
+        counts = cursors.get(name)
+        if counts is None or counts.rev > snapshot.revision:
+            # New profile, or its state was reset: fold from the start.
+            counts = HistoryCounts()
+        if counts.rev != snapshot.revision:
+            cursors[name] = _catch_up(counts, name)
+            changed.add(name)
+        mem_sec = snapshot.effective_mem_sec
+        remaining_sec = 0
+        if snapshot.finish_at is not None:
+            remaining_sec = max(int(snapshot.finish_at - now), 0)
+        result.append(
+            ProfileMetrics(
+                profile=name,
+                remaining_sec=remaining_sec,
+                mem_sec=mem_sec,
+                overflow_ratio=max(remaining_sec - mem_sec, 0) / mem_sec,
+                intakes=counts.intakes,
+                expiries=counts.expiries_at(now),
+                state_writes=snapshot.revision,
+            )
+        )
+    if changed:
+        _save_cursors({name: cursors[name] for name in snapshots if name in cursors})
+    return result
+
+
+# ------------------------------
+# Exposition
+# ------------------------------
+# (family, type, unit, help, ProfileMetrics attribute)
+PROFILE_FAMILIES = (
+    (
+        "decafe_timer_remaining_seconds",
+        "gauge",
+        "seconds",
+        "Seconds until caffeine clears (0 when expired or cleared).",
+        "remaining_sec",
+    ),
+    (
+        "decafe_timer_mem_seconds",
+        "gauge",
+        "seconds",
+        "Bar scale (mem_sec).",
+        "mem_sec",
+    ),
+    (
+        "decafe_timer_overflow_ratio",
+        "gauge",
+        "ratio",
+        "Remaining time beyond the bar scale, as a fraction of mem_sec.",
+        "overflow_ratio",
+    ),
+    ("decafe_timer_intakes", "counter", "", "Recorded intakes.", "intakes"),
+    ("decafe_timer_expiries", "counter", "", "Timers that ran out.", "expiries"),
+    (
+        "decafe_timer_state_writes",
+        "counter",
+        "",
+        "State changes committed (the state revision).",
+        "state_writes",
+    ),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _header(lines: list[str], family: str, kind: str, unit: str, help_text: str):
+    lines.append(f"# TYPE {family} {kind}")
+    if unit:
+        lines.append(f"# UNIT {family} {unit}")
+    lines.append(f"# HELP {family} {help_text}")
+
+
+def _histogram(lines: list[str], family: str, help_text: str, hist: Histogram):
+    _header(lines, family, "histogram", "seconds", help_text)
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{family}_bucket{{le="{bound!r}"}} {cumulative}')
+    lines.append(f'{family}_bucket{{le="+Inf"}} {hist.count}')
+    lines.append(f"{family}_sum {_number(hist.sum)}")
+    lines.append(f"{family}_count {hist.count}")
+
+
+def format_openmetrics(profiles: list[ProfileMetrics], health: ToolHealth) -> str:
+    lines: list[str] = []
+    for family, kind, unit, help_text, attr in PROFILE_FAMILIES:
+        _header(lines, family, kind, unit, help_text)
+        sample = f"{family}_total" if kind == "counter" else family
+        for metrics in profiles:
+            value = _number(getattr(metrics, attr))
+            lines.append(f'{sample}{{profile="{_escape(metrics.profile)}"}} {value}')
+    _header(
+        lines,
+        "decafe_timer_state_reads",
+        "counter",
+        "",
+        "State reads by tool processes.",
+    )
+    lines.append(f"decafe_timer_state_reads_total {health.state_reads}")
+    _histogram(
+        lines,
+        "decafe_timer_render_seconds",
+        "Time to render one frame or status.",
+        health.render,
+    )
+    _histogram(
+        lines,
+        "decafe_timer_tick_drift_seconds",
+        "How late live-loop wake-ups were.",
+        health.tick_drift,
+    )
+    lines.append("# EOF")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def render_metrics(
+    *, now: Optional[float] = None, health: Optional[ToolHealth] = None
+) -> str:
+    """The full exposition: profiles, persisted health plus ``health``."""
+    if now is None:
+        now = time.time()
+    own = health if health is not None else ToolHealth()
+    profiles = collect_profiles(now=now, health=own)
+    totals = load_health()
+    totals.merge(own)
+    return format_openmetrics(profiles, totals)
+
+
+def run_metrics(metrics_file: Optional[str] = None):
+    _enable_health()
+    text = render_metrics()
+    if metrics_file is None:
+        sys.stdout.write(text)
+        return
+    try:
+        write_atomic(metrics_file, text)
+    except OSError as exc:
+        print(f"Cannot write {metrics_file}: {exc}")
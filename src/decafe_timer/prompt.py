@@ -0,0 +1,152 @@
+"""Pre-rendered prompt segments, rewritten on every state change.
+
+Each file holds lines ``START END TEXT``: ``TEXT`` is what
+``render_snapshot_line`` shows while ``START <= now < END`` (whole epoch
+seconds, as ``date +%s`` prints them; ``END`` 0 means open-ended). Windows
+follow ``render.next_change_at``, so a prompt and the CLI agree. A shell
+prompt picks its line by comparing against the current time, so it never
+starts Python:
+
+- ``timer_prompt_graph.txt``: the bar alone, one line per quantized level,
+  through expiry.
+- ``timer_prompt_line.txt``: time + bar, one line per second for the next
+  ``PROMPT_LINE_MINUTES`` minutes; past that no line matches and the prompt
+  should fall back to running ``decafe-timer``.
+
+Text is plain (no ANSI) in the profile's saved bar style. A commit that
+leaves what the files show unchanged (a layout setting, say) keeps them.
+
+This module is imported by every state commit, so it sticks to the modules
+the commit path has already loaded.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .core import EXPIRED_LABEL, NO_ACTIVE_TIMER_MESSAGE
+from .render import format_remaining, next_change_remaining, render_snapshot_line
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .state import StateSnapshot
+
+PROMPT_GRAPH_FILE = "timer_prompt_graph.txt"
+PROMPT_LINE_FILE = "timer_prompt_line.txt"
+PROMPT_LINE_MINUTES = 10
+OPEN_END = 0
+
+
+def _bar_segments(
+    snapshot: StateSnapshot, now: int, horizon_end: int | None
+) -> Iterator[tuple[int, int, str]]:
+    finish_at = snapshot.finish_at
+    assert finish_at is not None
+    mem_sec = snapshot.effective_mem_sec
+    bar_style = snapshot.effective_bar_style
+    # During epoch second T the CLI shows int(finish_at - t) = finish_at - T - 1.
+    remaining_sec = finish_at - now - 1
+    while remaining_sec > 0:
+        start = finish_at - remaining_sec - 1
+        if horizon_end is not None and start >= horizon_end:
+            return
+        bar = render_snapshot_line(
+            remaining_sec, mem_sec, graph_only=True, bar_style=bar_style
+        )
+        next_remaining_sec = next_change_remaining(
+            remaining_sec, mem_sec, graph_only=True, bar_style=bar_style
+        )
+        yield start, finish_at - next_remaining_sec - 1, bar
+        remaining_sec = next_remaining_sec
+
+
+def prompt_segments(
+    snapshot: StateSnapshot,
+    now: int,
+    *,
+    graph_only: bool,
+    horizon_sec: int | None = None,
+    bars: list[tuple[int, int, str]] | None = None,
+) -> Iterator[tuple[int, int, str]]:
+    """Yield ``(start, end, text)`` windows from ``now`` onwards.
+
+    ``bars`` may pass in the graph-only windows already computed for the
+    same snapshot and ``now``.
+    """
+    finish_at = snapshot.finish_at
+    if finish_at is None:
+        yield 0, OPEN_END, NO_ACTIVE_TIMER_MESSAGE
+        return
+    horizon_end = None if horizon_sec is None else now + horizon_sec
+    if bars is None:
+        bars = list(_bar_segments(snapshot, now, horizon_end))
+    for start, end, bar in bars:
+        if horizon_end is not None and start >= horizon_end:
+            break
+        if graph_only:
+            yield start, end, bar
+            continue
+        # The bar is fixed within the window; only the seconds counter moves.
+        if horizon_end is not None:
+            end = min(end, horizon_end)
+        for second in range(start, end):
+            remaining_sec = finish_at - second - 1
+            yield second, second + 1, f"{format_remaining(remaining_sec)} {bar}"
+    expires_at = max(finish_at - 1, now)
+    if horizon_end is None or expires_at < horizon_end:
+        yield expires_at, OPEN_END, EXPIRED_LABEL
+
+
+def _write_segments(path: str, segments: Iterator[tuple[int, int, str]]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("".join(f"{start} {end} {text}\n" for start, end, text in segments))
+    os.replace(tmp_path, path)
+
+
+def _shown_key(snapshot: StateSnapshot) -> tuple:
+    return (
+        snapshot.finish_at,
+        snapshot.effective_mem_sec,
+        snapshot.effective_bar_style,
+    )
+
+
+def write_prompt_cache(
+    snapshot: StateSnapshot,
+    data_dir: str,
+    *,
+    now: int,
+    previous: StateSnapshot | None = None,
+):
+    """Rewrite both prompt files for ``snapshot`` as of ``now``.
+
+    ``previous`` is the state the files were last written for; when it
+    shows the same as ``snapshot`` the files are left alone.
+    """
+    if (
+        previous is not None
+        and _shown_key(previous) == _shown_key(snapshot)
+        and os.path.exists(os.path.join(data_dir, PROMPT_LINE_FILE))
+    ):
+        return
+    os.makedirs(data_dir, exist_ok=True)
+    bars = None
+    if snapshot.finish_at is not None:
+        bars = list(_bar_segments(snapshot, now, None))
+    _write_segments(
+        os.path.join(data_dir, PROMPT_GRAPH_FILE),
+        prompt_segments(snapshot, now, graph_only=True, bars=bars),
+    )
+    _write_segments(
+        os.path.join(data_dir, PROMPT_LINE_FILE),
+        prompt_segments(
+            snapshot,
+            now,
+            graph_only=False,
+            horizon_sec=PROMPT_LINE_MINUTES * 60,
+            bars=bars,
+        ),
+    )
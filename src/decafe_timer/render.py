@@ -1,11 +1,15 @@
-import re
-from dataclasses import dataclass
-from typing import Callable
+# Kept free of dataclasses/typing/re/unicodedata imports: this module is on
+# the fast-start snapshot path (see ``main._run_fast_snapshot``).
+from __future__ import annotations
 
+import time
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 BAR_CHAR_WIDTH = 20
 BAR_CHAR_WIDTH_BLOCKS = BAR_CHAR_WIDTH * 2
-ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
 
 BAR_STYLE_BLOCKS = "blocks"
 BAR_STYLE_GREEK_CROSS = "greek-cross"
@@ -47,30 +51,46 @@ COUNTING_ROD_EMPTY_CHAR = COUNTING_ROD_LEVELS[0]
 COUNTING_ROD_FULL_CHAR = COUNTING_ROD_LEVELS[-1]
 
 
-@dataclass(frozen=True)
 class BarStyle:
-    name: str
-    render: Callable[[float, bool, dict[str, str]], str]
+    __slots__ = ("name", "render", "total_units")
+
+    def __init__(
+        self,
+        name: str,
+        render: Callable[[float, bool, dict[str, str]], str],
+        total_units: Callable[[], int],
+    ):
+        self.name = name
+        self.render = render
+        # Number of quantization steps of the bar (distinct bars - 1).
+        self.total_units = total_units
+
+
+_ANSI_ENABLED = {
+    "reset": ANSI_RESET,
+    "dim": ANSI_DIM,
+    "red": ANSI_RED,
+    "yellow": ANSI_YELLOW,
+    "green": ANSI_GREEN,
+    "blue": ANSI_BLUE,
+}
+_ANSI_DISABLED = {name: "" for name in _ANSI_ENABLED}
 
 
 def _ansi_table(enabled: bool) -> dict[str, str]:
-    if not enabled:
-        return {
-            "reset": "",
-            "dim": "",
-            "red": "",
-            "yellow": "",
-            "green": "",
-            "blue": "",
-        }
-    return {
-        "reset": ANSI_RESET,
-        "dim": ANSI_DIM,
-        "red": ANSI_RED,
-        "yellow": ANSI_YELLOW,
-        "green": ANSI_GREEN,
-        "blue": ANSI_BLUE,
-    }
+    return _ANSI_ENABLED if enabled else _ANSI_DISABLED
+
+
+# Rendered bars and their widths in terminal cells, keyed by (style,
+# quantized units, color index, overflow, ansi). Each style has at most
+# ``total_units() + 1`` distinct bars, so the table stays small and is shared
+# by every caller in the process (live loop, watch, daemon).
+_frame_cache: dict[tuple, tuple[str, int]] = {}
+
+
+def clear_frame_cache():
+    """Drop cached bars, e.g. after swapping the style glyphs."""
+    _frame_cache.clear()
 
 
 def format_remaining(remaining_sec: int) -> str:
@@ -80,21 +100,31 @@ def format_remaining(remaining_sec: int) -> str:
     return f"{h:02d}:{m:02d}:{s:02d}"
 
 
-def render_live_line(
+def format_timestamp(epoch_sec: int) -> str:
+    """Local wall-clock time for an epoch, as shown in "Clears at"."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch_sec))
+
+
+def render_live_frame(
     remaining_sec: int,
     bar_scale_sec: int,
     *,
     graph_only: bool = False,
     bar_style: str = BAR_STYLE_GREEK_CROSS,
     use_ansi: bool = False,
-) -> str:
-    return render_snapshot_line(
-        remaining_sec,
-        bar_scale_sec,
-        graph_only=graph_only,
-        bar_style=bar_style,
-        use_ansi=use_ansi,
-    )
+) -> tuple[str, str, int]:
+    """Return ``(prefix, bar, cells)`` for the live loop.
+
+    ``prefix + bar`` is the ``render_snapshot_line`` text and ``cells`` its
+    width in terminal cells; the bar and its width come from the frame table.
+    """
+    ratio, is_overflow = _bar_ratio(remaining_sec, bar_scale_sec)
+    bar, cells = _bar_frame_entry(ratio, is_overflow, bar_style, use_ansi)
+    if graph_only:
+        return "", bar, cells
+    # HH:MM:SS and the separator are ASCII, one cell per character.
+    prefix = f"{format_remaining(max(remaining_sec, 0))} "
+    return prefix, bar, len(prefix) + cells
 
 
 def render_snapshot_line(
@@ -105,41 +135,204 @@ def render_snapshot_line(
     bar_style: str = BAR_STYLE_GREEK_CROSS,
     use_ansi: bool = False,
 ) -> str:
-    ansi = _ansi_table(use_ansi)
-    remaining_str = format_remaining(max(remaining_sec, 0))
-    if bar_scale_sec <= 0:
-        ratio = 0.0
-        is_overflow = False
-    else:
-        ratio = max(0.0, min(remaining_sec / bar_scale_sec, 1.0))
-        is_overflow = remaining_sec > bar_scale_sec
-    style = BAR_STYLES.get(bar_style, BAR_STYLES[BAR_STYLE_GREEK_CROSS])
-    bar = style.render(ratio, is_overflow, ansi)
+    ratio, is_overflow = _bar_ratio(remaining_sec, bar_scale_sec)
+    bar = _bar_frame_entry(ratio, is_overflow, bar_style, use_ansi)[0]
     if graph_only:
         return bar
-    return f"{remaining_str} {bar}"
+    return f"{format_remaining(max(remaining_sec, 0))} {bar}"
 
 
-def _compute_level_segments(levels: list[str], segments: int, ratio: float):
+def bar_frame(
+    ratio: float,
+    is_overflow: bool,
+    *,
+    bar_style: str = BAR_STYLE_GREEK_CROSS,
+    use_ansi: bool = False,
+) -> str:
+    """Return the bar for ``ratio``, rendering it only on the first request.
+
+    Every ratio that quantizes to the same units and color draws the same
+    bar, so the first ratio seen for a key renders it for all of them.
+    """
+    return _bar_frame_entry(ratio, is_overflow, bar_style, use_ansi)[0]
+
+
+def _bar_frame_entry(
+    ratio: float, is_overflow: bool, bar_style: str, use_ansi: bool
+) -> tuple[str, int]:
+    style = BAR_STYLES.get(bar_style, BAR_STYLES[BAR_STYLE_GREEK_CROSS])
+    key = (style.name, *_bar_key(style, ratio, is_overflow, use_ansi), use_ansi)
+    entry = _frame_cache.get(key)
+    if entry is None:
+        bar = style.render(ratio, is_overflow, _ansi_table(use_ansi))
+        entry = _frame_cache[key] = (bar, visible_length(bar))
+    return entry
+
+
+def _quantize_ratio(ratio: float, total_units: int) -> int:
     ratio = max(0.0, min(ratio, 1.0))
+    filled_units = int(ratio * total_units + 0.5)
+    return max(0, min(filled_units, total_units))
+
+
+def _bar_ratio(remaining_sec: int, bar_scale_sec: int) -> tuple[float, bool]:
+    if bar_scale_sec <= 0:
+        return 0.0, False
+    ratio = max(0.0, min(remaining_sec / bar_scale_sec, 1.0))
+    return ratio, remaining_sec > bar_scale_sec
+
+
+def _bar_key(style: BarStyle, ratio: float, is_overflow: bool, use_ansi: bool):
+    units = _quantize_ratio(ratio, style.total_units())
+    color = _color_index_for_ratio(ratio) if use_ansi else None
+    return units, color, is_overflow
+
+
+def _frame_key(
+    remaining_sec: int,
+    bar_scale_sec: int,
+    *,
+    graph_only: bool,
+    bar_style: str,
+    use_ansi: bool,
+):
+    """Everything that determines the rendered text, as a comparable tuple."""
+    style = BAR_STYLES.get(bar_style, BAR_STYLES[BAR_STYLE_GREEK_CROSS])
+    ratio, is_overflow = _bar_ratio(remaining_sec, bar_scale_sec)
+    seconds = None if graph_only else max(remaining_sec, 0)
+    return *_bar_key(style, ratio, is_overflow, use_ansi), seconds
+
+
+def next_change_remaining(
+    remaining_sec: int,
+    bar_scale_sec: int,
+    *,
+    graph_only: bool = False,
+    bar_style: str = BAR_STYLE_GREEK_CROSS,
+    use_ansi: bool = False,
+) -> int:
+    """Return the next (smaller) remaining_sec whose rendering differs.
+
+    The bar level, color, and overflow suffix are all monotonic in the
+    remaining time. The boundary is first computed from the quantization
+    step, color threshold, and overflow edge and confirmed with two probes;
+    bisection is the fallback. Returns 0 when nothing changes before the
+    timer expires.
+    """
+    if remaining_sec <= 1:
+        return 0
+    if not graph_only:
+        return remaining_sec - 1
+    options = dict(graph_only=True, bar_style=bar_style, use_ansi=use_ansi)
+    current = _frame_key(remaining_sec, bar_scale_sec, **options)
+    hint = _boundary_hint(remaining_sec, bar_scale_sec, bar_style, use_ansi)
+    # Keys are monotonic, so key(hint + 1) == current means nothing changes
+    # between hint + 1 and remaining_sec.
+    if (
+        0 < hint < remaining_sec
+        and _frame_key(hint, bar_scale_sec, **options) != current
+        and _frame_key(hint + 1, bar_scale_sec, **options) == current
+    ):
+        return hint
+    if _frame_key(0, bar_scale_sec, **options) == current:
+        return 0
+    # Invariant: key(low) differs, key(high) matches.
+    low, high = 0, remaining_sec
+    while high - low > 1:
+        mid = (low + high) // 2
+        if _frame_key(mid, bar_scale_sec, **options) == current:
+            high = mid
+        else:
+            low = mid
+    return low
+
+
+def _boundary_hint(
+    remaining_sec: int, bar_scale_sec: int, bar_style: str, use_ansi: bool
+) -> int:
+    """Closed-form guess at the next bar change (0 when there is none)."""
+    if bar_scale_sec <= 0:
+        return 0
+    if remaining_sec > bar_scale_sec:
+        # Ratio is clamped at 1 while overflowing; only the suffix changes.
+        return bar_scale_sec
+    style = BAR_STYLES.get(bar_style, BAR_STYLES[BAR_STYLE_GREEK_CROSS])
+    total_units = style.total_units()
+    ratio = remaining_sec / bar_scale_sec
+    hint = 0
+    units = _quantize_ratio(ratio, total_units)
+    if units > 0:
+        # Units drop once ratio * total_units + 0.5 falls below ``units``.
+        hint = _ceil((units - 0.5) * bar_scale_sec / total_units) - 1
+    if use_ansi:
+        threshold = BAR_COLOR_THRESHOLDS[_color_index_for_ratio(ratio)][0]
+        if threshold > 0:
+            hint = max(hint, _ceil(threshold * bar_scale_sec) - 1)
+    return hint
+
+
+def _ceil(value: float) -> int:
+    return -int(-value // 1)
+
+
+def next_change_at(
+    finish_at: int,
+    bar_scale_sec: int,
+    *,
+    now: float,
+    graph_only: bool = False,
+    bar_style: str = BAR_STYLE_GREEK_CROSS,
+    use_ansi: bool = False,
+) -> int | None:
+    """Return the epoch second after which the rendered status next differs.
+
+    Uses the CLI's countdown (``int(finish_at - now)``): the new text is
+    shown from just after the returned epoch, so schedulers should add a
+    little slack (``ticks.WAKE_SLACK_SEC``). Expiry counts as a change.
+    Returns None once the timer has expired; only a state change can alter
+    the output then. ``graph_only=False`` covers the one-line and default
+    layouts, whose seconds counter changes every second.
+    """
+    remaining_sec = int(finish_at - now)
+    if remaining_sec <= 0:
+        return None
+    next_remaining_sec = next_change_remaining(
+        remaining_sec,
+        bar_scale_sec,
+        graph_only=graph_only,
+        bar_style=bar_style,
+        use_ansi=use_ansi,
+    )
+    return finish_at - next_remaining_sec - 1
+
+
+def _compute_level_segments(levels: list[str], segments: int, ratio: float):
     units_per_block = len(levels) - 1
     total_units = segments * units_per_block
-    filled_units = int(ratio * total_units + 0.5)
-    filled_units = max(0, min(filled_units, total_units))
+    filled_units = _quantize_ratio(ratio, total_units)
     full_blocks = filled_units // units_per_block
     remainder = filled_units % units_per_block
     empty_blocks = segments - full_blocks - (1 if remainder else 0)
     return full_blocks, remainder, empty_blocks
 
 
+BAR_COLOR_THRESHOLDS = (
+    (0.3, "red"),
+    (0.15, "yellow"),
+    (0.07, "green"),
+    (0.0, "blue"),
+)
+
+
+def _color_index_for_ratio(ratio: float) -> int:
+    for index, (threshold, _name) in enumerate(BAR_COLOR_THRESHOLDS):
+        if ratio >= threshold:
+            return index
+    return len(BAR_COLOR_THRESHOLDS) - 1
+
+
 def _bar_color_for_ratio(ratio: float, *, ansi: dict[str, str]) -> str:
-    if ratio >= 0.3:
-        return ansi["red"]
-    if ratio >= 0.15:
-        return ansi["yellow"]
-    if ratio >= 0.07:
-        return ansi["green"]
-    return ansi["blue"]
+    return ansi[BAR_COLOR_THRESHOLDS[_color_index_for_ratio(ratio)][1]]
 
 
 def _render_greek_cross_bar(
@@ -173,9 +366,7 @@ def _render_counting_rod_bar(
 
 
 def _render_blocks_bar(segments: int, ratio: float, *, ansi: dict[str, str]) -> str:
-    ratio = max(0.0, min(ratio, 1.0))
-    filled_segments = int(ratio * segments + 0.5)
-    filled_segments = max(0, min(filled_segments, segments))
+    filled_segments = _quantize_ratio(ratio, segments)
     empty_segments = segments - filled_segments
     color = _bar_color_for_ratio(ratio, ansi=ansi)
     return (
@@ -225,12 +416,77 @@ def _render_ansi_spaced(pieces, *, ansi: dict[str, str]):
     return "".join(output)
 
 
-def visible_length(text: str) -> int:
-    return len(ANSI_ESCAPE_PATTERN.sub("", text))
+def cell_width(char: str) -> int:
+    """Terminal cells taken by ``char``: 0 (combining), 1, or 2 (wide)."""
+    width = _cell_widths.get(char)
+    if width is None:
+        import unicodedata
+
+        if unicodedata.category(char) in ("Mn", "Me", "Cf"):
+            width = 0
+        elif unicodedata.east_asian_width(char) in ("W", "F"):
+            width = 2
+        else:
+            width = 1
+        _cell_widths[char] = width
+    return width
 
 
+def visible_length(text: str) -> int:
+    """Width of ``text`` in terminal cells, ignoring ANSI CSI sequences."""
+    widths = _cell_widths
+    total = 0
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == "\x1b" and index + 1 < length and text[index + 1] == "[":
+            index += 2
+            while index < length and not "@" <= text[index] <= "~":
+                index += 1
+            index += 1
+            continue
+        width = widths.get(char)
+        total += cell_width(char) if width is None else width
+        index += 1
+    return total
+
+
+def _greek_cross_units() -> int:
+    return BAR_CHAR_WIDTH * (len(GREEK_CROSS_LEVELS) - 1)
+
+
+def _counting_rod_units() -> int:
+    return BAR_CHAR_WIDTH * (len(COUNTING_ROD_LEVELS) - 1)
+
+
+def _blocks_units() -> int:
+    return BAR_CHAR_WIDTH_BLOCKS
+
+
+# Every glyph the renderers draw, with its cell width: the bar glyphs are all
+# East Asian width "N" (one cell, although astral code points take two UTF-16
+# units and four UTF-8 bytes). Other characters are measured on first use by
+# ``cell_width`` and added to the same table.
+GLYPH_WIDTHS = {
+    char: 1
+    for char in (
+        *GREEK_CROSS_LEVELS,
+        *COUNTING_ROD_LEVELS,
+        BAR_FILLED_CHAR,
+        BAR_EMPTY_CHAR,
+        *BAR_OVERFLOW_SUFFIX,
+        *"0123456789: ",
+    )
+}
+_cell_widths = dict(GLYPH_WIDTHS)
+
 BAR_STYLES = {
-    BAR_STYLE_GREEK_CROSS: BarStyle(BAR_STYLE_GREEK_CROSS, _render_greek_cross),
-    BAR_STYLE_COUNTING_ROD: BarStyle(BAR_STYLE_COUNTING_ROD, _render_counting_rod),
-    BAR_STYLE_BLOCKS: BarStyle(BAR_STYLE_BLOCKS, _render_blocks),
+    BAR_STYLE_GREEK_CROSS: BarStyle(
+        BAR_STYLE_GREEK_CROSS, _render_greek_cross, _greek_cross_units
+    ),
+    BAR_STYLE_COUNTING_ROD: BarStyle(
+        BAR_STYLE_COUNTING_ROD, _render_counting_rod, _counting_rod_units
+    ),
+    BAR_STYLE_BLOCKS: BarStyle(BAR_STYLE_BLOCKS, _render_blocks, _blocks_units),
 }
@@ -0,0 +1,246 @@
+"""``decafe-timer hooks``: run commands when timers expire or change color.
+
+One process follows every profile. ``ExpiryScheduler`` keeps a min-heap of
+upcoming deadlines, one entry per event: the bar crossing each threshold in
+``render.BAR_COLOR_THRESHOLDS`` (at ``finish_at - threshold * mem_sec``) and
+expiry (at ``finish_at``). Changing or clearing a timer pushes its new
+entries and bumps the profile's generation, which turns the old ones stale;
+stale entries are dropped when they reach the top, and the heap is rebuilt
+once they outnumber live ones. Rescheduling is therefore O(log n) and idle
+profiles cost nothing between events.
+
+The loop sleeps until the earliest deadline, waking early when a profile's
+files change: a ``filewatch.GroupsWatcher`` follows every profile's files on
+one inotify descriptor, and only the profiles whose files changed are re-read
+(with the SQLite backend all profiles share the database file). Every
+``RESCAN_INTERVAL_SEC`` the profile names are re-listed, without reading
+state, to follow added and removed profiles. Hooks run through the shell
+without waiting for them, with the event in the environment:
+
+- ``DECAFE_TIMER_EVENT``: ``expired`` or ``color``
+- ``DECAFE_TIMER_PROFILE``: the profile name
+- ``DECAFE_TIMER_FINISH_AT``: the deadline, epoch seconds
+- ``DECAFE_TIMER_COLOR``: the bar color from now on (``color`` events)
+"""
+
+import heapq
+import itertools
+import os
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from . import state
+from .core import TimerState
+from .filewatch import GroupsWatcher
+from .render import BAR_COLOR_THRESHOLDS
+
+EVENT_EXPIRED = "expired"
+EVENT_COLOR = "color"
+RESCAN_INTERVAL_SEC = 5.0
+# Rebuild the heap once stale entries outnumber live ones by this factor.
+STALE_FACTOR = 2
+
+
+@dataclass(frozen=True)
+class TimerEvent:
+    kind: str
+    profile: str
+    due_at: float
+    finish_at: int
+    color: Optional[str] = None
+
+    def environ(self) -> dict[str, str]:
+        env = {
+            "DECAFE_TIMER_EVENT": self.kind,
+            "DECAFE_TIMER_PROFILE": self.profile,
+            "DECAFE_TIMER_FINISH_AT": str(self.finish_at),
+        }
+        if self.color is not None:
+            env["DECAFE_TIMER_COLOR"] = self.color
+        return env
+
+
+def timer_events(profile: str, timer: TimerState) -> list[TimerEvent]:
+    """Every event of ``timer``, past or future, in time order."""
+    finish_at = timer.finish_at
+    if finish_at is None:
+        return []
+    events = [
+        TimerEvent(
+            EVENT_COLOR,
+            profile,
+            finish_at - threshold * timer.mem_sec,
+            finish_at,
+            BAR_COLOR_THRESHOLDS[index + 1][1],
+        )
+        for index, (threshold, _name) in enumerate(BAR_COLOR_THRESHOLDS[:-1])
+    ]
+    events.append(TimerEvent(EVENT_EXPIRED, profile, finish_at, finish_at))
+    return events
+
+
+class ExpiryScheduler:
+    """Deadlines of many timers in one heap; see the module docstring."""
+
+    def __init__(self):
+        # (due_at, tie-breaker, generation, event)
+        self._heap: list[tuple[float, int, int, TimerEvent]] = []
+        self._counter = itertools.count()
+        self._timers: dict[str, TimerState] = {}
+        self._generations: dict[str, int] = {}
+        self._pending: dict[str, int] = {}
+        self._live = 0
+
+    def __len__(self) -> int:
+        """Pending (not stale) events."""
+        return self._live
+
+    def set_timer(self, profile: str, timer: Optional[TimerState], *, now: float):
+        """Schedule ``timer``'s future events, replacing the profile's old ones."""
+        if timer is not None and timer.finish_at is None:
+            timer = None
+        if self._timers.get(profile) == timer:
+            return
+        generation = self._generations.get(profile, 0) + 1
+        self._generations[profile] = generation
+        self._live -= self._pending.pop(profile, 0)
+        if timer is None:
+            self._timers.pop(profile, None)
+        else:
+            self._timers[profile] = timer
+            pending = 0
+            for event in timer_events(profile, timer):
+                if event.due_at > now:
+                    heapq.heappush(
+                        self._heap,
+                        (event.due_at, next(self._counter), generation, event),
+                    )
+                    pending += 1
+            self._pending[profile] = pending
+            self._live += pending
+        if len(self._heap) > STALE_FACTOR * self._live + 64:
+            self._rebuild()
+
+    def sync(self, timers: dict[str, TimerState], *, now: float):
+        """Make the schedule match ``timers`` (all profiles); O(changes log n)."""
+        for profile in list(self._timers):
+            if profile not in timers:
+                self.set_timer(profile, None, now=now)
+        for profile, timer in timers.items():
+            self.set_timer(profile, timer, now=now)
+
+    def _is_current(self, entry) -> bool:
+        return entry[2] == self._generations.get(entry[3].profile)
+
+    def _rebuild(self):
+        self._heap = [entry for entry in self._heap if self._is_current(entry)]
+        heapq.heapify(self._heap)
+        self._live = len(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float) -> list[TimerEvent]:
+        """Remove and return the events due at or before ``now``, oldest first."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                event = entry[3]
+                self._pending[event.profile] -= 1
+                self._live -= 1
+                due.append(event)
+        return due
+
+
+class HookRunner:
+    """Start the configured shell commands for each event, without waiting."""
+
+    def __init__(self, commands: dict[str, list[str]]):
+        self.commands = commands
+        self._children: list[subprocess.Popen] = []
+
+    def run(self, event: TimerEvent):
+        self.reap()
+        env = {**os.environ, **event.environ()}
+        for command in self.commands.get(event.kind, ()):
+            try:
+                child = subprocess.Popen(
+                    command, shell=True, env=env, stdin=subprocess.DEVNULL
+                )
+            except OSError as exc:
+                print(f"Hook failed to start: {command}: {exc}")
+                continue
+            self._children.append(child)
+
+    def reap(self):
+        self._children = [child for child in self._children if child.poll() is None]
+
+    def wait(self):
+        for child in self._children:
+            child.wait()
+        self._children = []
+
+
+def follow_profiles(scheduler: ExpiryScheduler, watcher: GroupsWatcher, *, now: float):
+    """Watch and schedule added profiles, drop removed ones; reads only new ones."""
+    names = set(state.profile_names())
+    known = watcher.names()
+    for profile in known - names:
+        watcher.discard(profile)
+        scheduler.set_timer(profile, None, now=now)
+    added = names - known
+    for profile in added:
+        # Watched before the read so a change right after it is not missed.
+        watcher.add(profile, state.profile_watch_paths(profile))
+    reload_profiles(scheduler, added, now=now)
+
+
+def reload_profiles(scheduler: ExpiryScheduler, profiles: Iterable[str], *, now: float):
+    for profile in sorted(profiles):
+        snapshot = state.load_profile_snapshot(profile)
+        scheduler.set_timer(profile, TimerState.from_snapshot(snapshot), now=now)
+
+
+def run_hooks(
+    on_expire: Iterable[str] = (),
+    on_color: Iterable[str] = (),
+    *,
+    max_events: Optional[int] = None,
+):
+    """Follow every profile and run hooks until interrupted."""
+    runner = HookRunner(
+        {EVENT_EXPIRED: list(on_expire), EVENT_COLOR: list(on_color)}
+    )
+    scheduler = ExpiryScheduler()
+    fired = 0
+    try:
+        with GroupsWatcher() as watcher:
+            follow_profiles(scheduler, watcher, now=time.time())
+            next_scan = time.monotonic() + RESCAN_INTERVAL_SEC
+            while True:
+                for event in scheduler.pop_due(time.time()):
+                    runner.run(event)
+                    fired += 1
+                    if max_events is not None and fired >= max_events:
+                        return
+                delay = next_scan - time.monotonic()
+                due_at = scheduler.next_due()
+                if due_at is not None:
+                    delay = min(delay, due_at - time.time())
+                changed = watcher.wait(max(delay, 0.0))
+                if changed:
+                    reload_profiles(scheduler, changed, now=time.time())
+                if time.monotonic() >= next_scan:
+                    follow_profiles(scheduler, watcher, now=time.time())
+                    next_scan = time.monotonic() + RESCAN_INTERVAL_SEC
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.wait()
@@ -0,0 +1,205 @@
+"""SQLite state backend: many named profiles in one WAL-mode database.
+
+Selected with ``DECAFE_TIMER_BACKEND=sqlite``. Each profile is one row of
+``profiles`` (indexed on ``finish_at`` so "who is active now" is a range
+scan) and every change is also kept in ``events`` for ``iter_history``.
+Imported lazily by ``state._backend`` so the file backend never loads
+``sqlite3``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+
+from . import journal
+from .state import StateConflict, StateSnapshot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    finish_at INTEGER,
+    mem_sec INTEGER,
+    bar_style TEXT,
+    one_line INTEGER,
+    graph_only INTEGER,
+    last_saved_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS profiles_finish_at ON profiles (finish_at);
+CREATE TABLE IF NOT EXISTS events (
+    profile TEXT NOT NULL,
+    rev INTEGER NOT NULL,
+    at INTEGER,
+    event TEXT NOT NULL,
+    PRIMARY KEY (profile, rev)
+);
+"""
+PROFILE_COLUMNS = (
+    "revision",
+    "finish_at",
+    "mem_sec",
+    "bar_style",
+    "one_line",
+    "graph_only",
+    "last_saved_at",
+)
+BUSY_TIMEOUT_SEC = 5.0
+
+# One connection per database path for the life of the process.
+_connections: dict[str, sqlite3.Connection] = {}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = _connections.get(path)
+    if conn is not None:
+        return conn
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Autocommit mode: transactions are opened explicitly in commit().
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _connections[path] = conn
+    return conn
+
+
+def close_all():
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+
+def _row_payload(row) -> dict:
+    payload = {
+        key: value for key, value in zip(PROFILE_COLUMNS, row) if value is not None
+    }
+    for key in ("one_line", "graph_only"):
+        if key in payload:
+            payload[key] = bool(payload[key])
+    return payload
+
+
+class SqliteBackend:
+    """One profile of a database that several users may share.
+
+    ``BEGIN IMMEDIATE`` serializes writers across users, so the flock taken
+    by ``state.lock_state`` only has to cover this user's processes: it lives
+    at ``lock_file`` in the user's cache directory, never beside the shared
+    database where another user's 0600 lock file would be unreadable.
+    Derived files (prompt segments, the stats index) stay per-user in the
+    cache directory too; only the database is shared.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, profile: str, lock_file: str):
+        self.path = path
+        self.profile = profile
+        self.lock_file = lock_file
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    def read_payload(self) -> dict:
+        row = self.conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE name = ?",
+            (self.profile,),
+        ).fetchone()
+        if row is None:
+            return {}
+        return _row_payload(row)
+
+    def _revision(self) -> int:
+        row = self.conn.execute(
+            "SELECT revision FROM profiles WHERE name = ?", (self.profile,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def commit(self, event: dict, existing: StateSnapshot) -> StateSnapshot:
+        conn = self.conn
+        # IMMEDIATE takes the write lock up front, so the revision check and
+        # the update are atomic with respect to other writers.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = self._revision()
+            if current != existing.revision:
+                raise StateConflict(
+                    f"state revision is {current}, expected {existing.revision}"
+                )
+            payload = journal.replay(
+                existing.payload, [event], since=existing.revision
+            )
+            snapshot = StateSnapshot.from_payload(payload)
+            self._write(snapshot)
+            conn.execute(
+                "INSERT INTO events (profile, rev, at, event) VALUES (?, ?, ?, ?)",
+                (self.profile, event["rev"], event.get("at"), json.dumps(event)),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return snapshot
+
+    def _write(self, snapshot: StateSnapshot):
+        last_saved_at = snapshot.payload.get("last_saved_at")
+        values = (
+            snapshot.revision,
+            snapshot.finish_at,
+            snapshot.mem_sec,
+            snapshot.bar_style,
+            snapshot.one_line,
+            snapshot.graph_only,
+            last_saved_at if isinstance(last_saved_at, int) else None,
+        )
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO profiles (name, {', '.join(PROFILE_COLUMNS)}) "
+            f"VALUES (?{', ?' * len(PROFILE_COLUMNS)})",
+            (self.profile, *values),
+        )
+
+    def compact(self, snapshot: StateSnapshot) -> StateSnapshot:
+        # Nothing to fold; move the WAL into the main database instead.
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return snapshot
+
+    def iter_history(self, since: int = 0):
+        cursor = self.conn.execute(
+            "SELECT event FROM events WHERE profile = ? AND rev > ? ORDER BY rev",
+            (self.profile, since),
+        )
+        for (text,) in cursor:
+            try:
+                event = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                yield event
+
+    def lock_path(self) -> str:
+        return self.lock_file
+
+    def watch_paths(self) -> tuple[str, ...]:
+        return (self.path, f"{self.path}-wal")
+
+    def profile_names(self) -> list[str]:
+        rows = self.conn.execute("SELECT name FROM profiles ORDER BY name")
+        return [name for (name,) in rows]
+
+    def active_profiles(self, now: int) -> list[tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT name, finish_at FROM profiles WHERE finish_at > ? "
+            "ORDER BY finish_at",
+            (now,),
+        ).fetchall()
+
+    def profile_snapshots(self) -> dict[str, StateSnapshot]:
+        rows = self.conn.execute(
+            f"SELECT name, {', '.join(PROFILE_COLUMNS)} FROM profiles"
+        )
+        return {
+            row[0]: StateSnapshot.from_payload(_row_payload(row[1:])) for row in rows
+        }
@@ -0,0 +1,818 @@
+# Kept free of dataclasses/typing/pathlib imports: this module is on the
+# fast-start snapshot path (see ``main._run_fast_snapshot``).
+from __future__ import annotations
+
+import os
+import time
+
+from . import binstate, journal
+from .core import DEFAULT_MEM_SEC, TimerState
+from .render import (
+    BAR_STYLE_BLOCKS,
+    BAR_STYLE_COUNTING_ROD,
+    BAR_STYLE_GREEK_CROSS,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .filewatch import StateWatcher
+
+APP_NAME = "coffee_timer"
+APP_AUTHOR = "tos-kamiya"
+
+BROKEN_STATE_MESSAGE = "State file is invalid; ignoring it."
+
+# Storage backend and profile selection. The file backend keeps one directory
+# per profile; the SQLite backend keeps every profile in one database, which
+# may be shared between users (point DECAFE_TIMER_DB at a common path).
+BACKEND_ENV = "DECAFE_TIMER_BACKEND"
+PROFILE_ENV = "DECAFE_TIMER_PROFILE"
+DB_ENV = "DECAFE_TIMER_DB"
+BACKEND_FILE = "file"
+BACKEND_SQLITE = "sqlite"
+BACKEND_CHOICES = (BACKEND_FILE, BACKEND_SQLITE)
+DEFAULT_PROFILE = "default"
+
+# Version 3 keeps timer_state.json as a checkpoint and records changes in an
+# append-only journal (see journal.py). Version 2 stored timestamps as epoch
+# seconds; version 1 files (no "version" key) used naive local ISO strings.
+# All of them are still readable.
+STATE_VERSION = 3
+# Fold the journal into a new checkpoint once it grows past this size.
+JOURNAL_COMPACT_BYTES = 4 * 1024
+
+DEFAULT_BAR_STYLE = BAR_STYLE_GREEK_CROSS
+DEFAULT_ONE_LINE = False
+DEFAULT_GRAPH_ONLY = False
+BAR_STYLE_CHOICES = (
+    BAR_STYLE_GREEK_CROSS,
+    BAR_STYLE_COUNTING_ROD,
+    BAR_STYLE_BLOCKS,
+)
+
+
+def _cache_dir() -> str:
+    from appdirs import user_cache_dir
+
+    return user_cache_dir(APP_NAME, APP_AUTHOR)
+
+
+def cache_dir() -> str:
+    """The per-user cache directory: the default profile and tool files."""
+    return str(_cache_dir())
+
+
+_profile: str | None = None
+
+
+def use_profile(name: str | None):
+    """Select the profile for this process (None: environment or default)."""
+    global _profile
+    if name is not None:
+        name = name.strip()
+        if not name or name in (".", "..") or "/" in name or os.sep in name:
+            raise ValueError(f"Invalid profile name: {name!r}")
+    _profile = name
+
+
+def current_profile() -> str:
+    return _profile or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+
+
+def _profile_dir(profile: str) -> str:
+    if profile == DEFAULT_PROFILE:
+        return str(_cache_dir())
+    return os.path.join(_cache_dir(), "profiles", profile)
+
+
+def _data_dir() -> str:
+    return _profile_dir(current_profile())
+
+
+def _state_file() -> str:
+    return os.path.join(_data_dir(), "timer_state.json")
+
+
+def _journal_file() -> str:
+    return os.path.join(_data_dir(), "timer_journal.jsonl")
+
+
+def _history_file() -> str:
+    return os.path.join(_data_dir(), "timer_history.jsonl")
+
+
+def _binary_state_file() -> str:
+    return os.path.join(_data_dir(), "timer_state.bin")
+
+
+def _stats_index_file() -> str:
+    return os.path.join(_data_dir(), "timer_stats_index.json")
+
+
+def _stats_days_file() -> str:
+    return os.path.join(_data_dir(), "timer_stats_days.jsonl")
+
+
+def _sqlite_file() -> str:
+    return os.environ.get(DB_ENV) or os.path.join(_cache_dir(), "timer_state.sqlite3")
+
+
+# ------------------------------
+# Payload parsing
+# ------------------------------
+_broken_state_notice_shown = False
+
+
+def _warn_broken_state():
+    global _broken_state_notice_shown
+    if _broken_state_notice_shown:
+        return
+    print(BROKEN_STATE_MESSAGE)
+    _broken_state_notice_shown = True
+
+
+class BrokenState(ValueError):
+    """A state file that cannot be read or is not a state payload."""
+
+
+def _read_state_payload(data_dir: str | None = None, *, strict: bool = False):
+    """Return the current state: the checkpoint with the journal replayed.
+
+    For the current profile the binary sidecar is tried first; it is only
+    used while it matches the journal and checkpoint on disk. A broken
+    checkpoint reads as empty after a one-time warning, or raises
+    ``BrokenState`` when ``strict``.
+    """
+    use_sidecar = data_dir is None
+    data_dir = data_dir or _data_dir()
+    state_file = os.path.join(data_dir, "timer_state.json")
+    journal_file = os.path.join(data_dir, "timer_journal.jsonl")
+    if use_sidecar:
+        payload = binstate.read_payload(
+            os.path.join(data_dir, "timer_state.bin"),
+            state_file,
+            journal_file,
+            BAR_STYLE_CHOICES,
+        )
+        if payload is not None:
+            return payload
+    payload = _read_checkpoint(state_file, strict=strict)
+    return journal.replay(
+        payload,
+        journal.iter_events(journal_file),
+        since=_resolve_revision(payload),
+    )
+
+
+def _read_checkpoint(state_file: str, *, strict: bool = False):
+    if not os.path.exists(state_file):
+        return {}
+    # json (and the re it pulls in) is imported where used: snapshots served
+    # from the binary sidecar never parse JSON.
+    import json
+
+    try:
+        with open(state_file, encoding="utf-8") as f:
+            text = f.read()
+    except OSError as exc:
+        return _broken_checkpoint(state_file, exc.strerror or str(exc), strict)
+    except ValueError:
+        return _broken_checkpoint(state_file, "not UTF-8 text", strict)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return _broken_checkpoint(state_file, "invalid JSON", strict)
+    if not isinstance(data, dict):
+        return _broken_checkpoint(state_file, "not a state object", strict)
+    return data
+
+
+def _broken_checkpoint(state_file: str, reason: str, strict: bool) -> dict:
+    if strict:
+        raise BrokenState(f"{state_file}: {reason}")
+    _warn_broken_state()
+    return {}
+
+
+def parse_finish_at(value) -> int | None:
+    """Epoch seconds from a stored ``finish_at`` (None if absent or invalid)."""
+    return _parse_finish_at(value)
+
+
+def _parse_finish_at(value) -> int | None:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    # Legacy (version 1) ISO string.
+    from datetime import datetime
+
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _parse_mem_sec(value) -> int | None:
+    if value is None:
+        return None
+    try:
+        mem_sec = int(value)
+    except (TypeError, ValueError):
+        return None
+    if mem_sec <= 0:
+        return None
+    return mem_sec
+
+
+def _parse_bool(value) -> bool | None:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        if value in (0, 1):
+            return bool(int(value))
+        return None
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in {"true", "1", "yes", "y", "on"}:
+            return True
+        if lowered in {"false", "0", "no", "n", "off"}:
+            return False
+    return None
+
+
+def _parse_bar_style(value) -> str | None:
+    if value is None:
+        return None
+    if value in BAR_STYLE_CHOICES:
+        return value
+    return None
+
+
+def _resolve_mem_sec(payload: dict) -> int | None:
+    mem_sec = _parse_mem_sec(payload.get("mem_sec"))
+    if mem_sec is None:
+        mem_sec = _parse_mem_sec(payload.get("duration_sec"))
+    return mem_sec
+
+
+def _resolve_bar_style(payload: dict) -> str | None:
+    return _parse_bar_style(payload.get("bar_style"))
+
+
+def _resolve_one_line(payload: dict) -> bool | None:
+    return _parse_bool(payload.get("one_line"))
+
+
+def _resolve_graph_only(payload: dict) -> bool | None:
+    return _parse_bool(payload.get("graph_only"))
+
+
+def _resolve_revision(payload: dict) -> int:
+    value = payload.get("revision")
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return value
+    return 0
+
+
+def _write_state_payload(payload: dict):
+    import json
+
+    state_file = _state_file()
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(payload))
+    os.replace(tmp_path, state_file)
+
+
+# ------------------------------
+# Snapshot
+# ------------------------------
+class StateSnapshot:
+    """Parsed view of the state file, read once and passed around.
+
+    Treated as immutable; a plain class rather than a frozen dataclass so the
+    snapshot path does not pay for importing ``dataclasses``.
+    """
+
+    __slots__ = (
+        "payload",
+        "finish_at",
+        "mem_sec",
+        "bar_style",
+        "one_line",
+        "graph_only",
+        "revision",
+    )
+
+    def __init__(
+        self,
+        payload: dict | None = None,
+        finish_at: int | None = None,
+        mem_sec: int | None = None,
+        bar_style: str | None = None,
+        one_line: bool | None = None,
+        graph_only: bool | None = None,
+        revision: int = 0,
+    ):
+        self.payload = payload if payload is not None else {}
+        self.finish_at = finish_at
+        self.mem_sec = mem_sec
+        self.bar_style = bar_style
+        self.one_line = one_line
+        self.graph_only = graph_only
+        # Incremented by every write; see _commit.
+        self.revision = revision
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._fields())
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "StateSnapshot":
+        return cls(
+            payload=payload,
+            finish_at=_parse_finish_at(payload.get("finish_at")),
+            mem_sec=_resolve_mem_sec(payload),
+            bar_style=_resolve_bar_style(payload),
+            one_line=_resolve_one_line(payload),
+            graph_only=_resolve_graph_only(payload),
+            revision=_resolve_revision(payload),
+        )
+
+    @property
+    def effective_mem_sec(self) -> int:
+        return self.mem_sec or DEFAULT_MEM_SEC
+
+    @property
+    def effective_bar_style(self) -> str:
+        return self.bar_style or DEFAULT_BAR_STYLE
+
+    @property
+    def render_flags(self) -> tuple[bool, bool]:
+        return (
+            self.one_line if self.one_line is not None else DEFAULT_ONE_LINE,
+            self.graph_only if self.graph_only is not None else DEFAULT_GRAPH_ONLY,
+        )
+
+
+def load_snapshot() -> StateSnapshot:
+    """Read and parse the current profile's state once."""
+    return StateSnapshot.from_payload(_backend().read_payload())
+
+
+def load_snapshot_at(path: str) -> StateSnapshot:
+    """Read another state: a state directory (checkpoint + journal) or a file.
+
+    Raises ``BrokenState`` (naming ``path``) instead of printing the broken
+    state warning, and for a path that does not exist.
+    """
+    if os.path.isdir(path):
+        return StateSnapshot.from_payload(_read_state_payload(path, strict=True))
+    if not os.path.exists(path):
+        raise BrokenState(f"{path}: no such file or directory")
+    return StateSnapshot.from_payload(_read_checkpoint(path, strict=True))
+
+
+def watch_state() -> StateWatcher:
+    """Return a watcher that wakes up when another process rewrites the state."""
+    from .filewatch import StateWatcher
+
+    path, *also = _backend().watch_paths()
+    return StateWatcher(path, also=tuple(also))
+
+
+def active_profiles(now: int | None = None) -> list[tuple[str, int]]:
+    """Return ``(profile, finish_at)`` for every running timer, soonest first."""
+    return _backend().active_profiles(_now_epoch() if now is None else now)
+
+
+def profile_names() -> list[str]:
+    """Return the stored profiles' names without reading their state."""
+    return _backend().profile_names()
+
+
+def _with_profile(profile: str, func):
+    global _profile
+    previous = _profile
+    _profile = profile
+    try:
+        return func()
+    finally:
+        _profile = previous
+
+
+def load_profile_snapshot(profile: str) -> StateSnapshot:
+    """Read ``profile``'s snapshot without changing the selected profile."""
+    return _with_profile(profile, load_snapshot)
+
+
+def profile_history(profile: str, since: int = 0) -> list[dict]:
+    """``profile``'s events newer than ``since``, without changing the selection."""
+    return _with_profile(profile, lambda: list(iter_history(since)))
+
+
+def profile_watch_paths(profile: str) -> tuple[str, ...]:
+    """The files ``watch_state`` would follow for ``profile``."""
+    return _with_profile(profile, lambda: _backend().watch_paths())
+
+
+def profile_snapshots() -> dict[str, StateSnapshot]:
+    """Return every stored profile's snapshot by profile name."""
+    return _backend().profile_snapshots()
+
+
+def profile_timers() -> dict[str, TimerState]:
+    """Return every stored profile's timer, running or not, by profile name."""
+    return {
+        name: TimerState.from_snapshot(snapshot)
+        for name, snapshot in profile_snapshots().items()
+    }
+
+
+# ------------------------------
+# Concurrency
+# ------------------------------
+class StateConflict(RuntimeError):
+    """The state file changed after the snapshot being updated was read."""
+
+
+class StateLock:
+    """Exclusive advisory lock around a read-modify-write of the state file.
+
+    Uses ``fcntl.flock`` on a sidecar ``.lock`` file. Where ``fcntl`` is not
+    available, or the lock file cannot be opened or locked, the lock does
+    nothing and the revision check in ``_commit`` is the only guard against
+    lost updates.
+    """
+
+    def __init__(self, *, enabled: bool = True):
+        self.enabled = enabled
+        self._fd: int | None = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        path = _backend().lock_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return self
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError:
+            os.close(fd)
+            return self
+        self._fd = fd
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._fd is not None:
+            # Closing the descriptor releases the flock.
+            os.close(self._fd)
+            self._fd = None
+
+
+def lock_state(*, enabled: bool = True) -> StateLock:
+    """Serialize state updates across processes; use as a context manager."""
+    return StateLock(enabled=enabled)
+
+
+def _read_revision() -> int:
+    import json
+
+    try:
+        with open(_state_file(), encoding="utf-8") as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError):
+        data = None
+    revision = _resolve_revision(data) if isinstance(data, dict) else 0
+    return max(revision, journal.last_rev(_journal_file()))
+
+
+def _check_revision(existing: StateSnapshot):
+    current = _read_revision()
+    if current != existing.revision:
+        if current < existing.revision:
+            # Revisions only grow, so ``existing`` came from a sidecar ahead
+            # of the files (an event that never landed in the journal).
+            # Re-mirror the files so the caller's retry reads them.
+            _mirror_binary_state(_json_snapshot())
+        raise StateConflict(
+            f"state revision is {current}, expected {existing.revision}"
+        )
+
+
+def _json_snapshot() -> StateSnapshot:
+    """The current profile's state from the checkpoint and journal only."""
+    return StateSnapshot.from_payload(_read_state_payload(_data_dir()))
+
+
+def _commit(event: dict, existing: StateSnapshot) -> StateSnapshot:
+    """Record ``event`` as the successor of ``existing`` (compare-and-swap)."""
+    event = {"rev": existing.revision + 1, "at": _now_epoch(), **event}
+    snapshot = _backend().commit(event, existing)
+    if os.path.exists(_stats_index_file()):
+        from .stats import update_index
+
+        update_index([event])
+    _refresh_prompt_cache(snapshot, event["at"], existing)
+    return snapshot
+
+
+def _refresh_prompt_cache(
+    snapshot: StateSnapshot, now: int, previous: StateSnapshot | None = None
+):
+    from .prompt import write_prompt_cache
+
+    try:
+        write_prompt_cache(snapshot, _data_dir(), now=now, previous=previous)
+    except OSError:
+        # The change is already committed; a stale prompt file is harmless.
+        pass
+
+
+def _checkpoint_payload(snapshot: StateSnapshot) -> dict:
+    payload = {"version": STATE_VERSION, "revision": snapshot.revision}
+    if snapshot.finish_at is not None:
+        payload["finish_at"] = snapshot.finish_at
+    for key in ("mem_sec", "bar_style", "one_line", "graph_only"):
+        value = getattr(snapshot, key)
+        if value is not None:
+            payload[key] = value
+    last_saved_at = snapshot.payload.get("last_saved_at")
+    if isinstance(last_saved_at, int):
+        payload["last_saved_at"] = last_saved_at
+    return payload
+
+
+def _compact(snapshot: StateSnapshot) -> StateSnapshot:
+    # Checkpoint first: if we stop before the journal is archived, its events
+    # are at or below the checkpoint revision and replay skips them.
+    payload = _checkpoint_payload(snapshot)
+    _write_state_payload(payload)
+    journal.archive(_journal_file(), _history_file())
+    return StateSnapshot.from_payload(payload)
+
+
+def _mirror_binary_state(snapshot: StateSnapshot):
+    # Written after the journal/checkpoint: readers validate it against them.
+    binstate.write_snapshot(
+        _binary_state_file(),
+        snapshot,
+        _state_file(),
+        _journal_file(),
+        BAR_STYLE_CHOICES,
+    )
+
+
+def compact_journal() -> StateSnapshot:
+    """Fold the journal into a fresh checkpoint now."""
+    with lock_state():
+        return _backend().compact(load_snapshot())
+
+
+def iter_history(since: int = 0):
+    """Yield the recorded events newer than revision ``since``, oldest first.
+
+    Archived events are included; the default yields the whole history.
+    """
+    return _backend().iter_history(since)
+
+
+# ------------------------------
+# Backends
+# ------------------------------
+class FileBackend:
+    """``timer_state.json`` checkpoint plus journal, one directory per profile.
+
+    Non-default profiles live under ``<cache>/profiles/<name>/``. A backend
+    provides ``read_payload``, ``commit``, ``compact``, ``iter_history``,
+    ``lock_path``, ``watch_paths``, ``profile_names``, ``active_profiles`` and
+    ``profile_snapshots``;
+    see ``sqlite_backend.SqliteBackend`` for the other implementation.
+    """
+
+    name = BACKEND_FILE
+
+    def read_payload(self) -> dict:
+        return _read_state_payload()
+
+    def commit(self, event: dict, existing: StateSnapshot) -> StateSnapshot:
+        _check_revision(existing)
+        journal.append_event(_journal_file(), event)
+        if journal.last_rev(_journal_file()) != event["rev"]:
+            # The event is not readable back; never let the sidecar claim it.
+            _mirror_binary_state(_json_snapshot())
+            raise StateConflict(f"journal write of revision {event['rev']} was lost")
+        payload = journal.replay(existing.payload, [event], since=existing.revision)
+        try:
+            journal_size = os.path.getsize(_journal_file())
+        except OSError:
+            journal_size = 0
+        snapshot = StateSnapshot.from_payload(payload)
+        if journal_size >= JOURNAL_COMPACT_BYTES:
+            snapshot = _compact(snapshot)
+        _mirror_binary_state(snapshot)
+        return snapshot
+
+    def compact(self, snapshot: StateSnapshot) -> StateSnapshot:
+        snapshot = _compact(snapshot)
+        _mirror_binary_state(snapshot)
+        return snapshot
+
+    def iter_history(self, since: int = 0):
+        # The journal stays under JOURNAL_COMPACT_BYTES; the history file grows.
+        recent = list(journal.iter_events(_journal_file()))
+        archived = ()
+        if not recent or recent[0]["rev"] > since + 1:
+            # Some events after ``since`` were archived already.
+            archived = journal.iter_events(_history_file(), since=since)
+        last_rev = since
+        for events in (archived, recent):
+            for event in events:
+                # Skip duplicates left by an interrupted compaction.
+                if event["rev"] > last_rev:
+                    last_rev = event["rev"]
+                    yield event
+
+    def lock_path(self) -> str:
+        return f"{_state_file()}.lock"
+
+    def watch_paths(self) -> tuple[str, ...]:
+        return (_state_file(), _journal_file())
+
+    def profile_names(self) -> list[str]:
+        names = [DEFAULT_PROFILE]
+        try:
+            names += sorted(os.listdir(os.path.join(_cache_dir(), "profiles")))
+        except OSError:
+            pass
+        return names
+
+    def active_profiles(self, now: int) -> list[tuple[str, int]]:
+        active = []
+        for name in self.profile_names():
+            payload = _read_state_payload(_profile_dir(name))
+            finish_at = _parse_finish_at(payload.get("finish_at"))
+            if finish_at is not None and finish_at > now:
+                active.append((name, finish_at))
+        active.sort(key=lambda item: item[1])
+        return active
+
+    def profile_snapshots(self) -> dict[str, StateSnapshot]:
+        return {
+            name: StateSnapshot.from_payload(_read_state_payload(_profile_dir(name)))
+            for name in self.profile_names()
+        }
+
+
+_FILE_BACKEND = FileBackend()
+_unknown_backend_notice_shown = False
+
+
+def backend_name() -> str:
+    name = os.environ.get(BACKEND_ENV) or BACKEND_FILE
+    if name in BACKEND_CHOICES:
+        return name
+    global _unknown_backend_notice_shown
+    if not _unknown_backend_notice_shown:
+        print(f"Unknown {BACKEND_ENV} {name!r}; using the file backend.")
+        _unknown_backend_notice_shown = True
+    return BACKEND_FILE
+
+
+def _backend():
+    if backend_name() == BACKEND_SQLITE:
+        from .sqlite_backend import SqliteBackend
+
+        lock_file = os.path.join(_cache_dir(), "timer_state.sqlite3.lock")
+        return SqliteBackend(_sqlite_file(), current_profile(), lock_file)
+    return _FILE_BACKEND
+
+
+# ------------------------------
+# Persistence helpers
+# ------------------------------
+def _now_epoch() -> int:
+    return int(time.time())
+
+
+def save_state(
+    finish_at: int,
+    mem_sec: int,
+    *,
+    snapshot: StateSnapshot | None = None,
+    added_sec: int | None = None,
+) -> StateSnapshot:
+    """Record an intake: new finish time (epoch seconds) and display memory."""
+    existing = snapshot if snapshot is not None else load_snapshot()
+    event = {
+        "type": journal.EVENT_INTAKE,
+        "finish_at": int(finish_at),
+        "mem_sec": int(mem_sec),
+    }
+    if added_sec is not None:
+        event["added_sec"] = int(added_sec)
+    return _commit(event, existing)
+
+
+def load_state():
+    """Load finish time and display memory from cache."""
+    snapshot = load_snapshot()
+    return snapshot.finish_at, snapshot.effective_mem_sec
+
+
+def save_mem(
+    mem_sec: int, *, snapshot: StateSnapshot | None = None
+) -> StateSnapshot:
+    existing = snapshot if snapshot is not None else load_snapshot()
+    return _commit({"type": journal.EVENT_MEM, "mem_sec": int(mem_sec)}, existing)
+
+
+def load_mem_sec() -> int:
+    return load_snapshot().effective_mem_sec
+
+
+def load_bar_style() -> str:
+    return load_snapshot().effective_bar_style
+
+
+def load_render_flags() -> tuple[bool, bool]:
+    return load_snapshot().render_flags
+
+
+def save_render_config(
+    *,
+    bar_style: str,
+    one_line: bool,
+    graph_only: bool,
+    mem_sec: int | None,
+    snapshot: StateSnapshot | None = None,
+) -> StateSnapshot:
+    existing = snapshot if snapshot is not None else load_snapshot()
+    event = {
+        "type": journal.EVENT_CONFIG,
+        "bar_style": bar_style,
+        "one_line": bool(one_line),
+        "graph_only": bool(graph_only),
+    }
+    if mem_sec is not None:
+        event["mem_sec"] = int(mem_sec)
+    return _commit(event, existing)
+
+
+def clear_state(*, snapshot: StateSnapshot | None = None) -> StateSnapshot:
+    existing = snapshot if snapshot is not None else load_snapshot()
+    return _commit({"type": journal.EVENT_CLEAR}, existing)
+
+
+def load_timer() -> TimerState:
+    """Load the current profile's timer as a ``core.TimerState``."""
+    return TimerState.from_snapshot(load_snapshot())
+
+
+def save_timer(
+    timer: TimerState, *, snapshot: StateSnapshot | None = None
+) -> StateSnapshot:
+    """Persist ``timer`` as the events that turn the stored state into it.
+
+    Writes nothing when they already agree. Pass the ``snapshot`` ``timer``
+    was derived from to detect a concurrent writer (``StateConflict``).
+    """
+    existing = snapshot if snapshot is not None else load_snapshot()
+    if timer.finish_at is None:
+        if existing.finish_at is None:
+            return existing
+        return clear_state(snapshot=existing)
+    if timer.finish_at != existing.finish_at:
+        # Recorded for stats like an intake: time added on top of what was
+        # left, or from now when the stored timer had already run out.
+        start = max(existing.finish_at or 0, _now_epoch())
+        added_sec = timer.finish_at - start if timer.finish_at > start else None
+        return save_state(
+            timer.finish_at, timer.mem_sec, snapshot=existing, added_sec=added_sec
+        )
+    if timer.mem_sec != existing.effective_mem_sec:
+        return save_mem(timer.mem_sec, snapshot=existing)
+    return existing
@@ -0,0 +1,336 @@
+"""``decafe-timer stats``: intake analytics streamed over the event history.
+
+Events are folded in one chronological pass into per-day buckets (local
+time); weeks and months are built by merging consecutive days, so memory does
+not grow with the length of the history. An optional rollup index (created
+with ``stats --index``) persists the completed days plus the aggregator's
+carry state and is advanced on every journal append, so later runs only
+replay the events written since.
+"""
+
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional, TextIO
+
+from . import journal, state
+from .render import format_remaining
+
+STATS_PERIODS = ("day", "week", "month")
+STATS_FORMATS = ("text", "json")
+INDEX_VERSION = 1
+
+
+@dataclass
+class PeriodStats:
+    """Aggregates for one period; ``merge`` combines consecutive periods."""
+
+    period: str
+    intakes: int = 0
+    intake_sec: int = 0
+    overflow_sec: float = 0.0
+    longest_clear_sec: float = 0.0
+    # Bookkeeping so adjacent periods can be merged into a longer one.
+    leading_clear_sec: float = 0.0
+    trailing_clear_sec: float = 0.0
+    all_clear: bool = True
+
+    def merge(self, later: "PeriodStats"):
+        self.longest_clear_sec = max(
+            self.longest_clear_sec,
+            later.longest_clear_sec,
+            self.trailing_clear_sec + later.leading_clear_sec,
+        )
+        if self.all_clear:
+            self.leading_clear_sec += later.leading_clear_sec
+        if later.all_clear:
+            self.trailing_clear_sec += later.trailing_clear_sec
+        else:
+            self.trailing_clear_sec = later.trailing_clear_sec
+        self.all_clear = self.all_clear and later.all_clear
+        self.intakes += later.intakes
+        self.intake_sec += later.intake_sec
+        self.overflow_sec += later.overflow_sec
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> dict:
+        return {
+            "period": self.period,
+            "intakes": self.intakes,
+            "intake_sec": self.intake_sec,
+            "overflow_sec": int(self.overflow_sec),
+            "longest_clear_sec": int(self.longest_clear_sec),
+        }
+
+
+def _day_of(epoch: float) -> date:
+    return datetime.fromtimestamp(epoch).date()
+
+
+def _day_start(day: date) -> float:
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def period_key(day: str, by: str) -> str:
+    if by == "day":
+        return day
+    parsed = date.fromisoformat(day)
+    if by == "week":
+        year, week, _weekday = parsed.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{parsed.year}-{parsed.month:02d}"
+
+
+# ------------------------------
+# Aggregation
+# ------------------------------
+@dataclass
+class HistoryAggregator:
+    """Fold events into per-day ``PeriodStats``; serializable for the index."""
+
+    rev: int = 0
+    last_at: Optional[float] = None
+    finish_at: Optional[int] = None
+    mem_sec: int = state.DEFAULT_MEM_SEC
+    current: Optional[PeriodStats] = None
+    _day_end: float = field(default=0.0, repr=False)
+
+    def feed(self, event: dict) -> Iterator[PeriodStats]:
+        """Apply one event; yield the days it completed."""
+        at = event.get("at")
+        if event["rev"] <= self.rev or not isinstance(at, (int, float)):
+            return
+        yield from self.advance(at)
+        assert self.current is not None
+        kind = event.get("type")
+        mem_sec = state._parse_mem_sec(event.get("mem_sec"))
+        if kind == journal.EVENT_INTAKE:
+            finish_at = state._parse_finish_at(event.get("finish_at"))
+            added_sec = event.get("added_sec")
+            if not isinstance(added_sec, int) and finish_at is not None:
+                # Older events lack added_sec: derive it from the previous state.
+                base = max(self.finish_at or 0, int(at))
+                added_sec = max(finish_at - base, 0)
+            self.current.intakes += 1
+            self.current.intake_sec += added_sec or 0
+            self.finish_at = finish_at
+        elif kind == journal.EVENT_CLEAR:
+            self.finish_at = None
+        if mem_sec is not None:
+            self.mem_sec = mem_sec
+        self.rev = event["rev"]
+
+    def advance(self, until: float) -> Iterator[PeriodStats]:
+        """Account the time up to ``until``; yield the days it completed."""
+        if self.last_at is None or self.current is None:
+            self._start_day(_day_of(until))
+            self.last_at = until
+            return
+        while self.last_at < until:
+            segment_end = min(until, self._day_end)
+            self._account(self.last_at, segment_end)
+            self.last_at = segment_end
+            if segment_end >= self._day_end:
+                completed = self.current
+                self._start_day(_day_of(self._day_end))
+                yield completed
+
+    def finish(self, now: float) -> Iterator[PeriodStats]:
+        """Yield the remaining days up to ``now``, including the partial one."""
+        yield from self.advance(now)
+        if self.current is not None:
+            yield self.current
+
+    def _start_day(self, day: date):
+        self.current = PeriodStats(day.isoformat())
+        self._day_end = _day_start(day + timedelta(days=1))
+
+    def _account(self, start: float, end: float):
+        bucket = self.current
+        assert bucket is not None
+        finish_at = self.finish_at
+        if finish_at is not None:
+            overflow_end = min(end, finish_at - self.mem_sec)
+            if overflow_end > start:
+                bucket.overflow_sec += overflow_end - start
+        # A timer is active on [start, finish_at); the rest is a clear stretch.
+        active_end = start if finish_at is None else max(start, min(end, finish_at))
+        if active_end > start:
+            bucket.all_clear = False
+            bucket.trailing_clear_sec = 0.0
+        clear_sec = end - active_end
+        if clear_sec > 0:
+            if bucket.all_clear:
+                bucket.leading_clear_sec += clear_sec
+            bucket.trailing_clear_sec += clear_sec
+            bucket.longest_clear_sec = max(
+                bucket.longest_clear_sec, bucket.trailing_clear_sec
+            )
+
+    def as_dict(self) -> dict:
+        return {
+            "rev": self.rev,
+            "last_at": self.last_at,
+            "finish_at": self.finish_at,
+            "mem_sec": self.mem_sec,
+            "current": self.current.as_dict() if self.current else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HistoryAggregator":
+        aggregator = cls(
+            rev=data["rev"],
+            last_at=data["last_at"],
+            finish_at=data["finish_at"],
+            mem_sec=data["mem_sec"],
+        )
+        if data.get("current"):
+            aggregator.current = PeriodStats(**data["current"])
+            day = date.fromisoformat(aggregator.current.period)
+            aggregator._day_end = _day_start(day + timedelta(days=1))
+        return aggregator
+
+
+def rollup(days: Iterable[PeriodStats], by: str) -> Iterator[PeriodStats]:
+    """Merge consecutive day buckets into ``by`` periods, in order."""
+    pending: Optional[PeriodStats] = None
+    for day in days:
+        key = period_key(day.period, by)
+        if pending is not None and pending.period == key:
+            pending.merge(day)
+            continue
+        if pending is not None:
+            yield pending
+        pending = PeriodStats(**{**day.as_dict(), "period": key})
+    if pending is not None:
+        yield pending
+
+
+# ------------------------------
+# Rollup index
+# ------------------------------
+def _load_index() -> Optional[HistoryAggregator]:
+    try:
+        with open(state._stats_index_file(), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return HistoryAggregator.from_dict(data["aggregator"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_index(aggregator: HistoryAggregator, completed: list[PeriodStats]):
+    if completed:
+        with open(state._stats_days_file(), "a", encoding="utf-8") as f:
+            for day in completed:
+                f.write(json.dumps(day.as_dict()) + "\n")
+    index_file = state._stats_index_file()
+    tmp_path = f"{index_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "aggregator": aggregator.as_dict()}, f)
+    os.replace(tmp_path, index_file)
+
+
+def _iter_index_days() -> Iterator[PeriodStats]:
+    last = ""
+    try:
+        f = open(state._stats_days_file(), encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                day = PeriodStats(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            # Skip days re-appended after an interrupted index update.
+            if day.period > last:
+                last = day.period
+                yield day
+
+
+def update_index(events: Iterable[dict]) -> Optional[HistoryAggregator]:
+    """Advance an existing index past ``events``; None if there is no index."""
+    aggregator = _load_index()
+    if aggregator is None:
+        return None
+    completed = []
+    for event in events:
+        completed.extend(aggregator.feed(event))
+    _save_index(aggregator, completed)
+    return aggregator
+
+
+def build_index() -> HistoryAggregator:
+    """(Re)create the index from the full history."""
+    for path in (state._stats_index_file(), state._stats_days_file()):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    _save_index(HistoryAggregator(), [])
+    aggregator = update_index(state.iter_history())
+    assert aggregator is not None
+    return aggregator
+
+
+def iter_day_stats(*, now: Optional[float] = None) -> Iterator[PeriodStats]:
+    """Yield every day from the first event through ``now``, oldest first."""
+    now = time.time() if now is None else now
+    if os.path.exists(state._stats_index_file()):
+        with state.lock_state():
+            aggregator = _load_index()
+            if aggregator is not None:
+                aggregator = update_index(state.iter_history(aggregator.rev))
+        if aggregator is not None:
+            yield from _iter_index_days()
+            if aggregator.rev:
+                yield from aggregator.finish(now)
+            return
+    aggregator = HistoryAggregator()
+    for event in state.iter_history():
+        yield from aggregator.feed(event)
+    if aggregator.rev:
+        yield from aggregator.finish(now)
+
+
+# ------------------------------
+# Output
+# ------------------------------
+def _format_row(stats: PeriodStats) -> str:
+    return (
+        f"{stats.period:<10}  {stats.intakes:>7}  "
+        f"{format_remaining(stats.intake_sec):>9}  "
+        f"{format_remaining(int(stats.overflow_sec)):>9}  "
+        f"{format_remaining(int(stats.longest_clear_sec)):>13}"
+    )
+
+
+def run_stats(
+    *,
+    by: str = "day",
+    output_format: str = "text",
+    reindex: bool = False,
+    out: Optional[TextIO] = None,
+    now: Optional[float] = None,
+):
+    out = out or sys.stdout
+    if reindex:
+        with state.lock_state():
+            build_index()
+    if output_format == "text":
+        out.write(
+            f"{'period':<10}  {'intakes':>7}  {'intake':>9}  "
+            f"{'overflow':>9}  {'longest clear':>13}\n"
+        )
+    for stats in rollup(iter_day_stats(now=now), by):
+        if output_format == "json":
+            out.write(json.dumps(stats.summary()) + "\n")
+        else:
+            out.write(_format_row(stats) + "\n")
@@ -0,0 +1,241 @@
+"""Differential redraw of the live loop's single status line.
+
+``LineDiffer`` remembers the cells it last wrote (glyph, SGR state, column
+width) and turns the next frame into the shortest practical write: cursor
+moves (``CUF``) past unchanged cells, the changed cells with their colors,
+``EL`` when the line got shorter, and a final ``\\r``. Most ticks change only
+the last digit of the countdown, so this writes a few bytes instead of the
+whole line.
+
+Cells follow the terminal's view of the text: SGR sequences are folded into
+the cells they color, widths come from ``render.cell_width`` (East Asian wide
+and fullwidth glyphs take two columns), combining marks stay with their base.
+When the layout of cells shifts (a glyph of a different width, the overflow
+suffix appearing) everything from that point on is rewritten.
+
+A frame may be passed in parts; parts made of the same string (the bars
+from the frame table) are split once and reused. When only some parts changed
+and none of them changed its cell widths, only those parts are compared.
+
+Without cursor-movement support (not a TTY, ``TERM`` unset or ``dumb``) the
+differ emits full redraws: the line, padding over leftovers, ``\\r``.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .render import ANSI_RESET, cell_width
+
+# (SGR state, text, columns); the state is the sequences since the last reset.
+Cell = tuple[str, str, int]
+
+ESC = "\x1b"
+ERASE_TO_EOL = "\x1b[K"
+# Split parts kept for reuse; bars repeat, so this rarely fills up.
+PART_CACHE_SIZE = 256
+
+
+def supports_cursor_moves(stream) -> bool:
+    """Whether ``stream`` looks like a terminal that understands CUF/EL."""
+    isatty = getattr(stream, "isatty", None)
+    if isatty is None or not isatty():
+        return False
+    return os.environ.get("TERM", "") not in ("", "dumb")
+
+
+def split_cells(line: str) -> list[Cell]:
+    """Split rendered text into terminal cells."""
+    cells: list[Cell] = []
+    style = ""
+    index = 0
+    length = len(line)
+    while index < length:
+        char = line[index]
+        if char == ESC and index + 1 < length and line[index + 1] == "[":
+            end = index + 2
+            while end < length and not "@" <= line[end] <= "~":
+                end += 1
+            sequence = line[index : end + 1]
+            if sequence.endswith("m"):
+                params = sequence[2:-1]
+                style = "" if params in ("", "0") else style + sequence
+            index = end + 1
+            continue
+        width = cell_width(char)
+        if width == 0 and cells:
+            prev_style, prev_text, prev_width = cells[-1]
+            cells[-1] = (prev_style, prev_text + char, prev_width)
+        else:
+            cells.append((style, char, width))
+        index += 1
+    return cells
+
+
+def _columns(cells: list[Cell]) -> int:
+    return sum(cell[2] for cell in cells)
+
+
+def _starts(cells: list[Cell]) -> list[int]:
+    """Column of each cell, plus the line's width."""
+    starts = [0]
+    for cell in cells:
+        starts.append(starts[-1] + cell[2])
+    return starts
+
+
+def _cost(cells: list[Cell]) -> int:
+    return sum(len(cell[1].encode("utf-8")) for cell in cells)
+
+
+class LineDiffer:
+    """Render successive frames of one line; the cursor rests at column 0."""
+
+    def __init__(self, *, incremental: bool = True):
+        self.incremental = incremental
+        self._cells: list[Cell] = []
+        self._width = 0
+        self._parts: dict[str, list[Cell]] = {}
+        # The last frame's parts, the index of each part's first cell, and
+        # the column of every cell (None until a diff needs it).
+        self._shown: tuple[str, ...] = ()
+        self._offsets: list[int] = []
+        self._starts: list[int] | None = None
+
+    def _split(self, part: str) -> list[Cell]:
+        cells = self._parts.get(part)
+        if cells is None:
+            if len(self._parts) >= PART_CACHE_SIZE:
+                self._parts.clear()
+            cells = self._parts[part] = split_cells(part)
+        return cells
+
+    def update(self, *parts: str, width: int | None = None) -> str:
+        """Return what to write so the terminal shows ``"".join(parts)``.
+
+        Each part must start in the default SGR state (the bars do: they
+        begin with a reset when colored). ``width`` is the line's width in
+        cells when the caller already knows it (``render.render_live_frame``);
+        full redraws then never look at the characters.
+        """
+        if not self.incremental and width is not None:
+            pad = max(self._width - width, 0)
+            self._width = width
+            return "".join(parts) + " " * pad + "\r"
+        if self.incremental and self._cells and len(parts) == len(self._shown):
+            output = self._update_parts(parts)
+            if output is not None:
+                return output
+        if len(parts) == 1:
+            cells = self._split(parts[0])
+            offsets = [0]
+        else:
+            cells = []
+            offsets = []
+            for part in parts:
+                offsets.append(len(cells))
+                cells.extend(self._split(part))
+        columns = _columns(cells) if width is None else width
+        self._starts = None
+        if self.incremental and self._cells:
+            output = self._diff(self._cells, cells)
+        else:
+            pad = max(self._width - columns, 0)
+            output = "".join(parts) + " " * pad + "\r"
+        self._cells = cells
+        self._width = columns
+        self._shown = parts
+        self._offsets = offsets
+        return output
+
+    def _update_parts(self, parts: tuple[str, ...]) -> str | None:
+        """Diff only the changed parts; None if one changed its cell widths."""
+        old_cells = self._cells
+        ends = self._offsets[1:] + [len(old_cells)]
+        cells = None
+        changed = []
+        for index, part in enumerate(parts):
+            if part == self._shown[index]:
+                continue
+            start, end = self._offsets[index], ends[index]
+            new = self._split(part)
+            old = old_cells[start:end]
+            if len(new) != len(old) or any(
+                old_cell[2] != new_cell[2] for old_cell, new_cell in zip(old, new)
+            ):
+                return None
+            if cells is None:
+                cells = list(old_cells)
+            cells[start:end] = new
+            changed.extend(
+                start + offset
+                for offset, (old_cell, new_cell) in enumerate(zip(old, new))
+                if old_cell != new_cell
+            )
+        self._shown = parts
+        if cells is None:
+            return ""
+        if self._starts is None:
+            self._starts = _starts(old_cells)
+        self._cells = cells
+        return self._emit(cells, changed, self._starts)
+
+    def clear(self) -> str:
+        """Return what to write to blank the line."""
+        columns = self._width
+        self._cells = []
+        self._width = 0
+        self._shown = ()
+        if not columns:
+            return ""
+        if self.incremental:
+            return ERASE_TO_EOL
+        return " " * columns + "\r"
+
+    def _diff(self, old: list[Cell], new: list[Cell]) -> str:
+        # Cells share columns while their widths agree; past the first
+        # mismatch the layout has shifted and the rest is rewritten.
+        stable = 0
+        limit = min(len(old), len(new))
+        while stable < limit and old[stable][2] == new[stable][2]:
+            stable += 1
+        changed = [index for index in range(stable) if old[index] != new[index]]
+        changed.extend(range(stable, len(new)))
+        self._starts = starts = _starts(new)
+        return self._emit(new, changed, starts)
+
+    def _emit(self, new: list[Cell], changed: list[int], starts: list[int]) -> str:
+        runs: list[list[int]] = []
+        for index in changed:
+            if runs:
+                last = runs[-1]
+                gap = new[last[1] : index]
+                # Rewriting a short unchanged gap beats a cursor move.
+                if _cost(gap) <= len(f"{ESC}[{_columns(gap)}C"):
+                    last[1] = index + 1
+                    continue
+            runs.append([index, index + 1])
+
+        parts = []
+        cursor = 0
+        style = ""
+        for start, end in runs:
+            if starts[start] > cursor:
+                parts.append(f"{ESC}[{starts[start] - cursor}C")
+                cursor = starts[start]
+            for cell_style, text, width in new[start:end]:
+                if cell_style != style:
+                    parts.append(ANSI_RESET + cell_style)
+                    style = cell_style
+                parts.append(text)
+                cursor += width
+        if style:
+            parts.append(ANSI_RESET)
+        if self._width > starts[-1]:
+            if starts[-1] > cursor:
+                parts.append(f"{ESC}[{starts[-1] - cursor}C")
+            parts.append(ERASE_TO_EOL)
+        if not parts:
+            return ""
+        parts.append("\r")
+        return "".join(parts)
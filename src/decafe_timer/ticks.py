@@ -0,0 +1,87 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+# Wake slightly after a display boundary so the new value is already due.
+WAKE_SLACK_SEC = 0.01
+
+
+@dataclass
+class DriftStats:
+    """How late the scheduler woke up relative to its targets."""
+
+    count: int = 0
+    total_sec: float = 0.0
+    max_sec: float = 0.0
+    last_sec: float = 0.0
+    # Also called with each sample (e.g. a metrics histogram's ``observe``).
+    observer: Optional[Callable[[float], None]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def record(self, drift_sec: float):
+        self.count += 1
+        self.total_sec += drift_sec
+        self.max_sec = max(self.max_sec, drift_sec)
+        self.last_sec = drift_sec
+        if self.observer is not None:
+            self.observer(drift_sec)
+
+    @property
+    def mean_sec(self) -> float:
+        return self.total_sec / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "ticks": self.count,
+            "drift_mean_ms": round(self.mean_sec * 1000, 3),
+            "drift_max_ms": round(self.max_sec * 1000, 3),
+        }
+
+
+class TickScheduler:
+    """Count down to a wall-clock finish time on the monotonic clock.
+
+    ``finish_at`` (Unix epoch seconds) is converted once into a monotonic
+    deadline, so wall-clock adjustments do not make the countdown jump.
+    Delays are computed against absolute targets rather than ``sleep(1)``
+    after work, so time spent rendering does not accumulate as drift.
+    """
+
+    def __init__(
+        self,
+        finish_at: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._deadline = 0.0
+        self._target: Optional[float] = None
+        self.stats = DriftStats()
+        self.reanchor(finish_at)
+
+    def reanchor(self, finish_at: float):
+        """Re-derive the monotonic deadline, e.g. after the state changed."""
+        offset = finish_at - self._wall_clock()
+        self._deadline = self._clock() + offset
+        self._target = None
+
+    def remaining(self) -> float:
+        return self._deadline - self._clock()
+
+    def remaining_sec(self) -> int:
+        return int(self.remaining())
+
+    def delay_until(self, remaining_sec: int) -> float:
+        """Seconds to sleep until the countdown first shows ``remaining_sec``."""
+        self._target = self._deadline - (remaining_sec + 1) + WAKE_SLACK_SEC
+        return max(self._target - self._clock(), 0.0)
+
+    def mark_wake(self):
+        """Record drift for a wake-up caused by the scheduled timeout."""
+        if self._target is None:
+            return
+        self.stats.record(max(self._clock() - self._target, 0.0))
+        self._target = None
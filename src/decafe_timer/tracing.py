@@ -0,0 +1,276 @@
+"""Per-phase timings for one ``decafe-timer`` run.
+
+Enabled by ``DECAFE_TIMER_TRACE`` or ``--trace``. ``main()`` checks both
+once; when neither is set nothing in this module is imported or run. When
+tracing, ``Tracer.install`` wraps the functions of interest in place (module
+and class attributes that callers look up at call time) and ``finish``
+restores them, so the untraced code carries no instrumentation at all.
+Modules the run has not imported yet are not imported for tracing: a
+meta path hook wraps them when (if) the run imports them.
+
+Records are JSON lines written to stderr (``--trace`` or
+``DECAFE_TIMER_TRACE=1``) or appended to the file the variable names
+(``0``, ``false``, ``no``, ``off`` or empty leave tracing off):
+
+- ``{"event": "tick", ...}``: one per live-loop frame, with the render time
+  and how late the wake-up came (``drift_ms``).
+- ``{"event": "run", ...}``: at exit, ``perf_counter`` milliseconds per
+  phase (``import``, ``trace``, ``parse``, ``read``, ``render``, ``write``,
+  ``other``; ``trace`` is the tracer's own wrapping),
+  call counts, and state reads, writes and bytes (file sizes; with the SQLite
+  backend only row reads and writes are counted).
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import time
+
+from .main import trace_setting
+
+STDERR_TARGETS = ("1", "true", "yes", "on", "stderr", "-")
+PHASES = ("import", "trace", "parse", "read", "render", "write")
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class _PatchOnImport:
+    """Meta path finder that patches modules once the run imports them."""
+
+    def __init__(self, tracer: Tracer, pending: dict):
+        self.tracer = tracer
+        self.pending = pending  # module name -> patch(module)
+
+    def find_spec(self, name, path=None, target=None):
+        patch = self.pending.pop(name, None)
+        if patch is None:
+            return None
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        exec_module = getattr(loader, "exec_module", None)
+        if exec_module is None:
+            return spec
+
+        def exec_and_patch(module):
+            exec_module(module)
+            started = time.perf_counter()
+            patch(module)
+            self.tracer.phases["trace"] += time.perf_counter() - started
+
+        loader.exec_module = exec_and_patch
+        return spec
+
+
+class Tracer:
+    def __init__(self, target: str | None = None, *, import_sec: float = 0.0):
+        """``target`` None writes to stderr, anything else appends to that file."""
+        self.target = target
+        self.started = time.perf_counter()
+        self.phases = {phase: 0.0 for phase in PHASES}
+        self.phases["import"] = import_sec
+        self.calls: dict[str, int] = {}
+        self.io = {"reads": 0, "writes": 0, "read_bytes": 0, "write_bytes": 0}
+        self._tick: dict | None = None
+        self._undo: list[tuple[object, str, object]] = []
+        self._hook: _PatchOnImport | None = None
+
+    @classmethod
+    def from_environment(cls, *, import_sec: float = 0.0) -> Tracer:
+        value = trace_setting()
+        target = None if value is None or value.lower() in STDERR_TARGETS else value
+        return cls(target, import_sec=import_sec)
+
+    # ------------------------------
+    # Wrapping
+    # ------------------------------
+    def _patch(self, owner, name: str, wrapper):
+        original = getattr(owner, name)
+        self._undo.append((owner, name, original))
+        setattr(owner, name, functools.wraps(original)(wrapper(original)))
+
+    def _phase(self, owner, name: str, phase: str):
+        def wrapper(original):
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.phases[phase] += time.perf_counter() - started
+                    self.calls[name] = self.calls.get(name, 0) + 1
+
+            return timed
+
+        self._patch(owner, name, wrapper)
+
+    def _io(self, owner, name: str, kind: str, measure, *, append: bool = False):
+        """Count calls of ``owner.name`` as ``kind`` I/O of ``measure(...)`` bytes.
+
+        ``measure`` gets the call's result and arguments; for appends the
+        bytes are the growth across the call.
+        """
+
+        def wrapper(original):
+            def counted(*args, **kwargs):
+                before = measure(None, *args) if append else 0
+                result = original(*args, **kwargs)
+                self.io[f"{kind}s"] += 1
+                self.io[f"{kind}_bytes"] += max(measure(result, *args) - before, 0)
+                return result
+
+            return counted
+
+        self._patch(owner, name, wrapper)
+
+    def install(self):
+        started = time.perf_counter()
+        from . import binstate, journal, main, state
+
+        self._phase(main, "_parse_fast_args", "parse")
+        # main imported load_snapshot by name; both bindings are timed.
+        self._phase(main, "load_snapshot", "read")
+        self._phase(state, "load_snapshot", "read")
+        self._phase(main, "render_lines", "render")
+        self._phase(state, "_commit", "write")
+
+        def path_size(_result, path, *_args):
+            return _size(path)
+
+        def sidecar_size(result, *_args):
+            return binstate.LAYOUT.size if result is not None else 0
+
+        self._io(state, "_read_checkpoint", "read", path_size)
+        self._io(journal, "iter_events", "read", path_size)
+        self._io(journal, "last_rev", "read", path_size)
+        self._io(binstate, "read_payload", "read", sidecar_size)
+        self._io(
+            state,
+            "_write_state_payload",
+            "write",
+            lambda _result, *_args: _size(state._state_file()),
+        )
+        self._io(journal, "append_event", "write", path_size, append=True)
+        # The sidecar is a fixed-size record rewritten in place.
+        self._io(
+            binstate, "write_snapshot", "write", lambda *_args: binstate.LAYOUT.size
+        )
+
+        # Live loop: one "tick" record per frame.
+        def frame_wrapper(original):
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                result = original(*args, **kwargs)
+                elapsed = time.perf_counter() - started
+                self.phases["render"] += elapsed
+                tick = self._tick or {"event": "tick"}
+                self._tick = None
+                tick["render_ms"] = round(elapsed * 1000, 3)
+                self.write(tick)
+                return result
+
+            return timed
+
+        self._patch(main, "render_live_frame", frame_wrapper)
+
+        pending = {
+            f"{__package__}.cli": self._patch_cli,
+            f"{__package__}.prompt": self._patch_prompt,
+            f"{__package__}.ticks": self._patch_ticks,
+            f"{__package__}.sqlite_backend": self._patch_sqlite_backend,
+        }
+        for name in list(pending):
+            module = sys.modules.get(name)
+            if module is not None:
+                pending.pop(name)(module)
+        if pending:
+            self._hook = _PatchOnImport(self, pending)
+            sys.meta_path.insert(0, self._hook)
+        self.phases["trace"] += time.perf_counter() - started
+
+    def _patch_cli(self, cli):
+        self._phase(cli, "parse_cli_args", "parse")
+        self._phase(cli, "normalize_cli_request", "parse")
+
+    def _patch_prompt(self, prompt):
+        def path_size(_result, path, *_args):
+            return _size(path)
+
+        self._io(prompt, "_write_segments", "write", path_size)
+
+    def _patch_sqlite_backend(self, sqlite_backend):
+        # Row reads and writes; SQLite's own page I/O is not attributed.
+        backend = sqlite_backend.SqliteBackend
+        self._io(backend, "read_payload", "read", lambda *_args: 0)
+        self._io(backend, "_write", "write", lambda *_args: 0)
+
+    def _patch_ticks(self, ticks):
+        def wake_wrapper(original):
+            def timed(scheduler, *args, **kwargs):
+                count = scheduler.stats.count
+                result = original(scheduler, *args, **kwargs)
+                if scheduler.stats.count != count:
+                    drift_ms = round(scheduler.stats.last_sec * 1000, 3)
+                    self._tick = {"event": "tick", "drift_ms": drift_ms}
+                return result
+
+            return timed
+
+        self._patch(ticks.TickScheduler, "mark_wake", wake_wrapper)
+
+    def uninstall(self):
+        if self._hook is not None:
+            sys.meta_path.remove(self._hook)
+            self._hook = None
+        while self._undo:
+            owner, name, original = self._undo.pop()
+            setattr(owner, name, original)
+
+    # ------------------------------
+    # Output
+    # ------------------------------
+    def write(self, record: dict):
+        line = json.dumps(record) + "\n"
+        if self.target is None:
+            sys.stderr.write(line)
+            sys.stderr.flush()
+            return
+        try:
+            with open(self.target, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+    def report(self, argv: list[str]) -> dict:
+        total = time.perf_counter() - self.started
+        measured = sum(self.phases[phase] for phase in PHASES if phase != "import")
+        phases_ms = {
+            phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()
+        }
+        phases_ms["other"] = round(max(total - measured, 0.0) * 1000, 3)
+        return {
+            "event": "run",
+            "argv": argv,
+            "total_ms": round((total + self.phases["import"]) * 1000, 3),
+            "phases_ms": phases_ms,
+            "calls": self.calls,
+            "io": self.io,
+        }
+
+    def finish(self, argv: list[str]):
+        self.uninstall()
+        self.write(self.report(argv))
@@ -0,0 +1,112 @@
+"""``decafe-timer watch``: one line per change on stdout for status bars."""
+
+import json
+import sys
+import time
+from typing import Optional, TextIO
+
+from .core import EXPIRED_LABEL, NO_ACTIVE_TIMER_MESSAGE
+from .render import format_timestamp, next_change_remaining, render_snapshot_line
+from .state import StateSnapshot, load_snapshot, watch_state
+from .ticks import TickScheduler
+
+WATCH_FORMATS = ("text", "json")
+# Upper bound for a single wait when nothing is scheduled (cleared/expired).
+IDLE_WAIT_SEC = 3600.0
+
+
+def _frame(
+    snapshot: StateSnapshot,
+    remaining_sec: int,
+    *,
+    output_format: str,
+    graph_only: bool,
+    bar_style: str,
+    use_ansi: bool,
+) -> str:
+    finish_at = snapshot.finish_at
+    if finish_at is None:
+        text, css_class, tooltip = NO_ACTIVE_TIMER_MESSAGE, "cleared", ""
+    elif remaining_sec <= 0:
+        text, css_class, tooltip = EXPIRED_LABEL, "expired", ""
+    else:
+        text = render_snapshot_line(
+            remaining_sec,
+            snapshot.effective_mem_sec,
+            graph_only=graph_only,
+            bar_style=bar_style,
+            use_ansi=use_ansi,
+        )
+        css_class = "active"
+        tooltip = f"Clears at {format_timestamp(finish_at)}"
+    if output_format == "json":
+        return json.dumps(
+            {"text": text, "tooltip": tooltip, "class": css_class},
+            ensure_ascii=False,
+        )
+    return text
+
+
+def run_watch(
+    snapshot: StateSnapshot,
+    *,
+    output_format: str = "text",
+    graph_only: bool = False,
+    bar_style: str,
+    use_ansi: bool = False,
+    out: Optional[TextIO] = None,
+    max_frames: Optional[int] = None,
+):
+    """Print a frame whenever the rendered status changes.
+
+    The default layout is emitted in its one-line form, since status bars
+    consume a single line per frame.
+    """
+    out = out or sys.stdout
+    ticks = TickScheduler(snapshot.finish_at or time.time())
+    last_frame = None
+    frames = 0
+    reload = False
+    try:
+        with watch_state() as watcher:
+            while True:
+                if reload:
+                    snapshot = load_snapshot()
+                    if snapshot.finish_at is not None:
+                        ticks.reanchor(snapshot.finish_at)
+                else:
+                    ticks.mark_wake()
+
+                remaining_sec = (
+                    ticks.remaining_sec() if snapshot.finish_at is not None else 0
+                )
+                frame = _frame(
+                    snapshot,
+                    remaining_sec,
+                    output_format=output_format,
+                    graph_only=graph_only,
+                    bar_style=bar_style,
+                    use_ansi=use_ansi,
+                )
+                if frame != last_frame:
+                    out.write(frame + "\n")
+                    out.flush()
+                    last_frame = frame
+                    frames += 1
+                    if max_frames is not None and frames >= max_frames:
+                        return
+
+                if remaining_sec > 0:
+                    next_remaining_sec = next_change_remaining(
+                        remaining_sec,
+                        snapshot.effective_mem_sec,
+                        graph_only=graph_only,
+                        bar_style=bar_style,
+                        use_ansi=use_ansi,
+                    )
+                    delay = ticks.delay_until(next_remaining_sec)
+                else:
+                    delay = IDLE_WAIT_SEC
+                reload = watcher.wait(delay)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
@@ -0,0 +1,122 @@
+import importlib
+import io
+import json
+
+import pytest
+
+from decafe_timer import batch, state
+
+main_module = importlib.import_module("decafe_timer.main")
+
+NOW = 1_800_000_000
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path / "own")
+
+
+def _write_state(path, **payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": state.STATE_VERSION, **payload}))
+
+
+@pytest.fixture
+def team_dir(tmp_path):
+    team = tmp_path / "team"
+    _write_state(team / "alice" / "timer_state.json", finish_at=NOW + 1800, mem_sec=3600)
+    _write_state(team / "bob.json", finish_at=NOW - 10, mem_sec=3600)
+    _write_state(team / "carol" / "timer_state.json", mem_sec=3600)
+    (team / "not-a-timer").mkdir()
+    (team / "notes.txt").write_text("ignored")
+    return team
+
+
+def _rows(sources, **kwargs):
+    out = io.StringIO()
+    batch.run_batch(sources, output_format="json", out=out, now=NOW, **kwargs)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_batch_directory_rows(team_dir):
+    rows = _rows([str(team_dir)], bar_style="blocks")
+    assert [(row["name"], row["class"]) for row in rows] == [
+        ("alice", "active"),
+        ("bob", "expired"),
+        ("carol", "cleared"),
+    ]
+    assert rows[0]["text"].startswith("00:30:00 ")
+    assert rows[1]["text"] == "Expired"
+
+
+def test_batch_replays_journal(tmp_path):
+    profile_dir = tmp_path / "own"
+    state.save_state(NOW + 600, 3600)
+    (row,) = _rows([str(profile_dir)])
+    assert row["finish_at"] == NOW + 600
+
+
+def test_batch_text_is_aligned(team_dir):
+    out = io.StringIO()
+    batch.run_batch(
+        [str(team_dir / "bob.json"), str(team_dir / "alice")],
+        graph_only=True,
+        bar_style="blocks",
+        out=out,
+        now=NOW,
+    )
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "bob    Expired"
+    assert lines[1].startswith("alice  ")
+
+
+def test_batch_width_ignores_skipped_directories(team_dir):
+    (team_dir / "not-a-timer-with-a-long-name").mkdir()
+    out = io.StringIO()
+    batch.run_batch([str(team_dir)], out=out, now=NOW + 0.5)
+    lines = out.getvalue().splitlines()
+    assert [line.split()[0] for line in lines] == ["alice", "bob", "carol"]
+    # Same seconds as the CLI at that moment: int(finish_at - now).
+    assert lines[0].startswith("alice  00:29:59 ")
+    assert lines[2] == "carol  ---"
+
+
+def test_batch_reports_broken_and_missing_targets(team_dir, capsys):
+    (team_dir / "dave.json").write_text("{not json")
+    missing = team_dir / "erin.json"
+    rows = _rows([str(team_dir / "dave.json"), str(missing), str(team_dir / "alice")])
+    assert capsys.readouterr().out == ""
+    assert [(row["name"], row["class"]) for row in rows] == [
+        ("dave", "error"),
+        ("erin", "error"),
+        ("alice", "active"),
+    ]
+    assert rows[0]["error"] == f"{team_dir / 'dave.json'}: invalid JSON"
+    assert rows[1]["error"] == f"{missing}: no such file or directory"
+
+    out = io.StringIO()
+    batch.run_batch([str(missing), str(team_dir / "bob.json")], out=out, now=NOW)
+    assert out.getvalue().splitlines() == [
+        f"erin  ! {missing}: no such file or directory",
+        "bob   Expired",
+    ]
+
+
+def test_batch_reads_paths_from_stdin(team_dir):
+    paths = io.StringIO(f"{team_dir / 'alice'}\n\n{team_dir / 'bob.json'}\n")
+    targets = batch.collect_targets(["-"], stdin=paths)
+    assert [name for name, _path in targets] == ["alice", "bob"]
+
+
+def test_batch_many_files_keep_order(tmp_path):
+    team = tmp_path / "many"
+    for index in range(300):
+        _write_state(team / f"u{index:03d}.json", finish_at=NOW + index + 1)
+    rows = _rows([str(team)], workers=4)
+    assert [row["finish_at"] for row in rows] == [NOW + i + 1 for i in range(300)]
+
+
+def test_status_batch_cli(team_dir, capsys):
+    main_module.main(["status", "--batch", str(team_dir), "--color", "never"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines] == ["alice", "bob", "carol"]
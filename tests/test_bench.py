@@ -0,0 +1,49 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from decafe_timer import bench
+
+# Refresh with: python -m decafe_timer.bench --save-baseline tests/bench_baseline.json
+# (keep the per-case max_regression entries).
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+
+def _result(name, p50_us):
+    return bench.BenchResult(
+        name=name, ops_per_sec=1e6 / p50_us, p50_us=p50_us, p99_us=p50_us, samples=1
+    )
+
+
+def test_measure_reports_per_op_percentiles():
+    calls = []
+    result = bench.measure("noop", lambda: calls.append(1), samples=10, number=5)
+    assert len(calls) == 1 + 10 * 5
+    assert result.samples == 10
+    assert 0 < result.p50_us <= result.p99_us
+    assert result.ops_per_sec > 0
+
+
+def test_compare_to_baseline_flags_only_regressions():
+    baseline = bench.results_to_json([_result("fast", 10.0), _result("slow", 10.0)])
+    baseline["results"]["slow"]["max_regression"] = 1.0
+    results = [_result("fast", 13.0), _result("slow", 19.0), _result("new", 99.0)]
+    failures = bench.compare_to_baseline(results, baseline, max_regression=0.25)
+    assert len(failures) == 1
+    assert failures[0].startswith("fast:")
+
+
+@pytest.mark.bench
+def test_hot_paths_within_baseline():
+    names = list(bench.CASE_NAMES)
+    if importlib.util.find_spec("appdirs") is None:
+        names.remove("cli_cold_start")
+    results = bench.run_benchmarks(names)
+    for result in results:
+        print(bench.format_result(result))
+    baseline_path = os.environ.get("DECAFE_TIMER_BENCH_BASELINE", BASELINE_PATH)
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    assert bench.compare_to_baseline(results, baseline) == []
@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+from decafe_timer import binstate, state
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    yield tmp_path
+    binstate.close_maps()
+
+
+def _sidecar_payload():
+    return binstate.read_payload(
+        state._binary_state_file(),
+        state._state_file(),
+        state._journal_file(),
+        state.BAR_STYLE_CHOICES,
+    )
+
+
+def test_sidecar_mirrors_committed_state(tmp_path):
+    snapshot = state.save_state(int(time.time()) + 600, 3600)
+    snapshot = state.save_render_config(
+        bar_style="counting-rod",
+        one_line=False,
+        graph_only=True,
+        mem_sec=None,
+        snapshot=snapshot,
+    )
+    assert (tmp_path / "timer_state.bin").stat().st_size == binstate.LAYOUT.size
+    assert _sidecar_payload() == state._read_state_payload(str(tmp_path))
+    assert state.load_snapshot() == snapshot
+
+
+def test_sidecar_tracks_compaction(monkeypatch):
+    monkeypatch.setattr(state, "JOURNAL_COMPACT_BYTES", 256)
+    snapshot = state.load_snapshot()
+    for minutes in range(1, 10):
+        snapshot = state.save_mem(minutes * 60, snapshot=snapshot)
+    payload = _sidecar_payload()
+    assert payload is not None
+    assert payload["revision"] == 9
+    assert state.load_snapshot() == snapshot
+
+
+def test_stale_sidecar_falls_back_to_json():
+    snapshot = state.save_state(int(time.time()) + 600, 3600)
+    assert _sidecar_payload() is not None
+    # A writer that does not update the sidecar appends to the journal.
+    with open(state._journal_file(), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"rev": 2, "at": 0, "type": "clear"}) + "\n")
+    assert _sidecar_payload() is None
+    reloaded = state.load_snapshot()
+    assert reloaded.finish_at is None
+    assert reloaded.revision == snapshot.revision + 1
+
+
+def test_sidecar_ahead_of_journal_falls_back_to_json(capsys):
+    from decafe_timer.main import main
+
+    snapshot = state.save_state(int(time.time()) + 600, 3600)
+    # A sidecar claiming a revision the journal never got (the stamp still
+    # matches the files, so readers use it).
+    ahead = state.StateSnapshot.from_payload({**snapshot.payload, "revision": 2})
+    state._mirror_binary_state(ahead)
+    assert state.load_snapshot().revision == 2
+    with pytest.raises(state.StateConflict):
+        state.save_mem(7200, snapshot=state.load_snapshot())
+    assert state.load_snapshot() == snapshot
+
+    state._mirror_binary_state(ahead)
+    main(["mem", "2h"])
+    assert "keeps changing" not in capsys.readouterr().out
+    reloaded = state.load_snapshot()
+    assert reloaded.revision == 2
+    assert reloaded.mem_sec == 7200
+
+
+def test_reader_skips_record_mid_write():
+    state.save_mem(3600)
+    with open(state._binary_state_file(), "r+b") as f:
+        f.seek(binstate.SEQ_OFFSET)
+        seq = binstate.SEQ.unpack(f.read(binstate.SEQ.size))[0]
+        f.seek(binstate.SEQ_OFFSET)
+        f.write(binstate.SEQ.pack(seq + 1))
+    assert _sidecar_payload() is None
+    assert state.load_snapshot().mem_sec == 3600
@@ -1,4 +1,10 @@
-from decafe_timer.cli import normalize_cli_request, parse_cli_args
+import pytest
+
+from decafe_timer.cli import (
+    COMMAND_CONFLICT_MESSAGE,
+    normalize_cli_request,
+    parse_cli_args,
+)
 
 
 def _request_from(argv):
@@ -9,7 +15,7 @@ def _request_from(argv):
 def test_run_clear_conflict():
     request, error = _request_from(["run", "clear"])
     assert error is not None
-    assert "Cannot combine run, intake, mem, config, and clear." in error
+    assert COMMAND_CONFLICT_MESSAGE in error
     assert request.run is True
     assert request.clear is False
     assert request.config is False
@@ -111,7 +117,7 @@ def test_mem_set():
 def test_mem_run_conflict():
     request, error = _request_from(["run", "mem"])
     assert error is not None
-    assert "Cannot combine run, intake, mem, config, and clear." in error
+    assert COMMAND_CONFLICT_MESSAGE in error
     assert request.run is True
     assert request.config is False
 
@@ -119,7 +125,7 @@ def test_mem_run_conflict():
 def test_intake_mem_conflict():
     request, error = _request_from(["intake", "mem"])
     assert error is not None
-    assert "Cannot combine run, intake, mem, config, and clear." in error
+    assert COMMAND_CONFLICT_MESSAGE in error
 
 
 def test_config_show():
@@ -139,4 +145,106 @@ def test_config_with_duration_rejected():
 def test_config_run_conflict():
     request, error = _request_from(["run", "config"])
     assert error is not None
-    assert "Cannot combine run, intake, mem, config, and clear." in error
+    assert COMMAND_CONFLICT_MESSAGE in error
+
+
+def test_daemon_command():
+    request, error = _request_from(["daemon"])
+    assert error is None
+    assert request.daemon is True
+    assert request.run is False
+
+
+def test_daemon_rejects_duration_and_other_commands():
+    _request, error = _request_from(["daemon", "3h"])
+    assert error == "daemon does not accept a duration."
+    _request, error = _request_from(["daemon", "run"])
+    assert error is not None
+
+
+def test_watch_command_with_format():
+    request, error = _request_from(["watch", "--format", "json"])
+    assert error is None
+    assert request.watch is True
+    assert request.daemon is False
+
+
+def test_watch_rejects_duration():
+    _request, error = _request_from(["watch", "10m"])
+    assert error == "watch does not accept a duration."
+
+
+def test_stats_command_with_period():
+    request, error = _request_from(["stats", "--by", "week", "--format", "json"])
+    assert error is None
+    assert request.stats is True
+    assert request.watch is False
+
+
+def test_stats_rejects_duration():
+    _request, error = _request_from(["stats", "1h"])
+    assert error == "stats does not accept a duration."
+
+
+def test_profiles_command_with_profile_option():
+    args = parse_cli_args(["profiles", "--profile", "alice"])
+    request, error = normalize_cli_request(args)
+    assert error is None
+    assert request.profiles is True
+    assert args.profile == "alice"
+
+
+def test_batch_requires_status():
+    _request, error = _request_from(["--batch", "dir"])
+    assert error == "--batch requires the status command."
+    request, error = _request_from(["status", "--batch", "a", "b"])
+    assert error is None
+    assert request.status is True
+
+
+def test_hooks_command_collects_commands():
+    request, error = _request_from(
+        ["hooks", "--on-expire", "notify-send done", "--on-expire", "true"]
+    )
+    assert error is None
+    assert request.hooks is True
+    args = parse_cli_args(["hooks", "--on-color", "true"])
+    assert args.on_color == ["true"]
+
+
+def test_hooks_needs_commands_and_commands_need_hooks():
+    _request, error = _request_from(["hooks"])
+    assert error == "hooks requires --on-expire or --on-color."
+    _request, error = _request_from(["--on-expire", "true"])
+    assert error == "--on-expire and --on-color require the hooks command."
+
+
+def test_metrics_command_and_metrics_file():
+    request, error = _request_from(["metrics", "--metrics-file", "out.prom"])
+    assert error is None
+    assert request.metrics is True
+    _request, error = _request_from(["daemon", "--metrics-file", "out.prom"])
+    assert error is None
+    _request, error = _request_from(["--metrics-file", "out.prom"])
+    assert error == "--metrics-file requires the metrics or daemon command."
+    _request, error = _request_from(["metrics", "3h"])
+    assert error == "metrics does not accept a duration."
+
+
+def test_dashboard_command():
+    request, error = _request_from(["dashboard", "--graph-only"])
+    assert error is None
+    assert request.dashboard is True
+    _request, error = _request_from(["dashboard", "3h"])
+    assert error == "dashboard does not accept a duration."
+    _request, error = _request_from(["dashboard", "metrics"])
+    assert error == COMMAND_CONFLICT_MESSAGE
+
+
+@pytest.mark.parametrize(
+    "argv", [["watch", "stats"], ["profiles", "status"], ["hooks", "next-change"]]
+)
+def test_conflict_message_names_the_commands(argv):
+    _request, error = _request_from(argv)
+    assert error == COMMAND_CONFLICT_MESSAGE
+    assert all(command in error for command in argv)
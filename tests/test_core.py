@@ -0,0 +1,90 @@
+import pickle
+import time
+
+import pytest
+
+from decafe_timer import core, state
+from decafe_timer.render import render_snapshot_line
+
+NOW = 1_800_000_000
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    yield tmp_path
+
+
+def test_values_are_immutable_and_hashable():
+    timer = core.TimerState(NOW + 60, 3600)
+    with pytest.raises(AttributeError):
+        timer.finish_at = NOW
+    with pytest.raises(AttributeError):
+        timer.extra = 1
+    assert timer == core.TimerState(NOW + 60, 3600)
+    assert len({timer, core.TimerState(NOW + 60, 3600)}) == 1
+    assert pickle.loads(pickle.dumps(timer)) == timer
+    with pytest.raises(ValueError):
+        core.TimerState(NOW, 0)
+    with pytest.raises(ValueError):
+        core.RenderOptions("wide")
+
+
+def test_intake_extends_or_restarts():
+    running = core.TimerState(NOW + 600, 3600)
+    assert core.intake(running, 900, now=NOW).finish_at == NOW + 1500
+    expired = core.TimerState(NOW - 5, 3600)
+    assert core.intake(expired, 900, now=NOW).finish_at == NOW + 900
+    assert core.intake(core.clear(running), 60, now=NOW).finish_at == NOW + 60
+    assert running.finish_at == NOW + 600
+    with pytest.raises(ValueError):
+        core.intake(running, 0, now=NOW)
+
+
+def test_remaining_at():
+    timer = core.TimerState(NOW + 600)
+    assert core.remaining_at(timer, NOW + 0.5) == 599
+    assert core.remaining_at(timer, NOW + 700) == 0
+    assert core.remaining_at(core.clear(timer), NOW) is None
+
+
+@pytest.mark.parametrize(
+    "layout", [core.LAYOUT_DEFAULT, core.LAYOUT_ONE_LINE, core.LAYOUT_GRAPH_ONLY]
+)
+def test_render_lines(layout):
+    timer = core.TimerState(NOW + 1800, 3600)
+    lines = core.render_lines(timer, core.RenderOptions(layout), now=NOW)
+    assert lines[-1] == render_snapshot_line(
+        1800, 3600, graph_only=layout != core.LAYOUT_ONE_LINE
+    )
+    assert len(lines) == (3 if layout == core.LAYOUT_DEFAULT else 1)
+    expired = core.render_lines(timer, core.RenderOptions(layout), now=NOW + 1800)
+    assert expired == [core.EXPIRED_LABEL, core.expired_message(timer)]
+
+
+def test_next_change_follows_layout():
+    timer = core.TimerState(NOW + 1800, 3600)
+    per_second = core.next_change_at(timer, core.RenderOptions(), now=NOW)
+    graph = core.RenderOptions(core.LAYOUT_GRAPH_ONLY)
+    assert per_second == NOW
+    assert core.next_change_at(timer, graph, now=NOW) > NOW
+    assert core.next_change_at(core.clear(timer), graph, now=NOW) is None
+
+
+def test_save_timer_round_trip():
+    now = int(time.time())
+    timer = core.intake(state.load_timer(), 600, now=now)
+    state.save_timer(timer)
+    assert state.load_timer() == timer
+    assert list(state.iter_history())[-1]["added_sec"] == 600
+
+    timer = core.set_mem(timer, 7200)
+    state.save_timer(timer)
+    assert state.load_timer() == timer
+
+    revision = state.load_snapshot().revision
+    state.save_timer(timer)
+    assert state.load_snapshot().revision == revision
+
+    state.save_timer(core.clear(timer))
+    assert state.load_timer().finish_at is None
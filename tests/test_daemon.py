@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import decafe_timer
+from decafe_timer import client, state
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(__import__("socket"), "AF_UNIX"), reason="needs Unix sockets"
+)
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    from decafe_timer.daemon import StatusDaemon
+
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    server = StatusDaemon(str(tmp_path / "daemon.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while server.server is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield server
+    server.stop()
+    thread.join(5)
+
+
+def _query(server, **request):
+    return client.query(request, path=server.path, timeout=2)
+
+
+def test_daemon_reports_no_timer(daemon):
+    assert _query(daemon, color="never") == "---\n"
+
+
+def test_daemon_picks_up_state_changes(daemon):
+    state.save_state(int(time.time()) + 600, 3600)
+    deadline = time.monotonic() + 5
+    reply = _query(daemon, layout="one-line", color="never")
+    while reply == "---\n" and time.monotonic() < deadline:
+        time.sleep(0.02)
+        reply = _query(daemon, layout="one-line", color="never")
+    assert reply.startswith("00:09:5")
+
+
+def test_daemon_rejects_invalid_request(daemon):
+    assert _query(daemon, layout="sideways") == ""
+
+
+def test_daemon_serves_metrics(daemon):
+    _query(daemon, color="never")
+    reply = _query(daemon, metrics=True)
+    assert reply.endswith("# EOF\n")
+    assert "decafe_timer_render_seconds_count 1\n" in reply
+
+
+def test_client_does_not_import_cli_modules(tmp_path):
+    code = (
+        "import sys\n"
+        "from decafe_timer import client\n"
+        "client.query({}, path=sys.argv[1])\n"
+        "heavy = {'argparse', 'appdirs', 'decafe_timer.render', 'decafe_timer.main'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path / "missing.sock")],
+        env={**os.environ, "PYTHONPATH": src_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
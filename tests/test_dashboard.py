@@ -0,0 +1,213 @@
+import asyncio
+import io
+import re
+import shutil
+import time
+
+import pytest
+
+from decafe_timer import state
+from decafe_timer.dashboard import Dashboard
+
+NOW = int(time.time())
+CSI = re.compile(r"\x1b\[(\d*)([ABCJK])|(\r|\n)|(.)", re.S)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    monkeypatch.setenv("TERM", "xterm")
+
+
+class Terminal(io.StringIO):
+    """A stream that claims to be a TTY, plus a tiny screen to replay it.
+
+    With a ``height`` the screen scrolls like a terminal: a newline on the
+    bottom line pushes the top line off, and cursor moves stop at the edges.
+    """
+
+    def __init__(self, height=None):
+        super().__init__()
+        self.height = height
+
+    def isatty(self):
+        return True
+
+    def screen(self) -> list[str]:
+        lines = [[]]
+        row = column = top = 0
+        bottom = None
+        for match in CSI.finditer(self.getvalue()):
+            count, command, control, char = match.groups()
+            count = int(count or 1)
+            if self.height is not None:
+                bottom = top + self.height - 1
+            if command == "A":
+                row = max(row - count, top)
+            elif command == "B":
+                row = row + count if bottom is None else min(row + count, bottom)
+            elif command == "C":
+                column += count
+            elif command == "K":
+                del lines[row][column:]
+            elif command == "J":
+                del lines[row][column:]
+                del lines[row + 1 :]
+            elif control == "\r":
+                column = 0
+            elif control == "\n":
+                if row == bottom:
+                    top += 1
+                row, column = row + 1, 0
+            else:
+                while len(lines) <= row:
+                    lines.append([])
+                line = lines[row]
+                line.extend(" " * (column + 1 - len(line)))
+                line[column] = char
+                column += 1
+            while len(lines) <= row:
+                lines.append([])
+        if self.height is not None:
+            lines = lines[top : top + self.height]
+        return ["".join(line) for line in lines if line]
+
+
+def _save(profile, finish_at, mem_sec=3600):
+    state.use_profile(profile)
+    try:
+        return state.save_state(finish_at, mem_sec)
+    finally:
+        state.use_profile(None)
+
+
+def test_rows_are_aligned_and_only_changes_are_written():
+    _save("default", NOW + 600)
+    _save("green-tea", NOW + 7200)
+    stream = Terminal()
+    dashboard = Dashboard(stream=stream)
+    stream.write(dashboard.sync_profiles(NOW + 0.5))
+    default, tea = (dashboard.rows[name] for name in ("default", "green-tea"))
+    assert stream.screen() == [
+        "default    " + "".join(dashboard._frame(default, NOW + 0.5)),
+        "green-tea  " + "".join(dashboard._frame(tea, NOW + 0.5)),
+    ]
+    assert stream.screen()[0].startswith("default    00:09:59 ")
+    assert dashboard.next_wake() == pytest.approx(NOW + 1.01)
+
+    update = dashboard.render_due(NOW + 1.01)
+    # Only the last digit of each countdown changes.
+    assert update == "\x1b[2A\x1b[18C8\r\x1b[2B\x1b[1A\x1b[18C8\r\x1b[1B"
+    stream.write(update)
+    assert [line[:19] for line in stream.screen()] == [
+        "default    00:09:58",
+        "green-tea  01:59:58",
+    ]
+    assert dashboard.render_due(NOW + 1.5) == ""
+
+
+def test_rows_beyond_the_screen_are_summarized(monkeypatch):
+    monkeypatch.setenv("LINES", "4")
+    _save("default", NOW + 540)
+    for index in range(6):
+        _save(f"p{index}", NOW + 600 + index * 60)
+    stream = Terminal(height=4)
+    dashboard = Dashboard(stream=stream)
+    stream.write(dashboard.sync_profiles(NOW + 0.5))
+    for second in range(1, 4):
+        stream.write(dashboard.render_due(NOW + second + 0.5))
+    # Three lines above the cursor: two rows and the summary.
+    screen = stream.screen()
+    assert [line[:17] for line in screen] == [
+        "default  00:08:56",
+        "p0       00:09:56",
+        "(+5 more profiles",
+    ]
+
+    monkeypatch.setenv("LINES", "10")
+    stream.height = 10
+    stream.write(dashboard.redraw(NOW + 4.5))
+    assert [line[:17] for line in stream.screen()] == [
+        "default  00:08:55",
+        "p0       00:09:55",
+        "p1       00:10:55",
+        "p2       00:11:55",
+        "p3       00:12:55",
+        "p4       00:13:55",
+        "p5       00:14:55",
+    ]
+
+
+def test_graph_only_rows_wake_only_when_their_bar_changes():
+    _save("default", NOW + 1800)
+    dashboard = Dashboard(graph_only=True, stream=io.StringIO())
+    dashboard.sync_profiles(NOW)
+    wake = dashboard.next_wake()
+    assert wake > NOW + 10
+    assert dashboard.render_due(wake - 1) == ""
+    assert dashboard.render_due(wake).startswith("default  ")
+
+
+def test_reload_rereads_only_changed_profiles(monkeypatch):
+    _save("default", NOW + 600)
+    _save("tea", NOW + 600)
+    dashboard = Dashboard(stream=io.StringIO())
+    dashboard.sync_profiles(NOW)
+    snapshot = _save("tea", NOW + 900)
+    changed = dashboard.watcher.changed()
+    assert changed and changed <= set(state.profile_watch_paths("tea"))
+
+    loaded = []
+    load = state.load_profile_snapshot
+    monkeypatch.setattr(
+        state,
+        "load_profile_snapshot",
+        lambda profile: loaded.append(profile) or load(profile),
+    )
+    assert dashboard.reload(changed, NOW).startswith("tea      00:15:00")
+    assert loaded == ["tea"]
+    assert snapshot.revision == 2
+
+
+def test_removed_profiles_stop_being_watched(tmp_path):
+    _save("tea", NOW + 600)
+    dashboard = Dashboard(stream=io.StringIO())
+    dashboard.sync_profiles(NOW)
+    paths = set(state.profile_watch_paths("tea"))
+    shutil.rmtree(tmp_path / "profiles" / "tea")
+    dashboard.sync_profiles(NOW)
+    assert "tea" not in dashboard.rows
+    assert not paths & set(dashboard._watched)
+    assert not paths & set(dashboard.watcher._signatures)
+
+    _save("tea", NOW + 900)
+    dashboard.sync_profiles(NOW)
+    dashboard.watcher.changed()
+    assert all(dashboard._watched[path] == ["tea"] for path in paths)
+    _save("tea", NOW + 1200)
+    assert dashboard.reload(dashboard.watcher.changed(), NOW).startswith(
+        "tea      00:20:00"
+    )
+
+
+def test_run_reloads_on_state_changes():
+    _save("default", NOW + 600)
+    stream = io.StringIO()
+    dashboard = Dashboard(stream=stream)
+
+    async def scenario():
+        task = asyncio.create_task(dashboard.run())
+        await asyncio.sleep(0.05)
+        assert stream.getvalue().startswith("default  00:")
+        _save("default", NOW + 3600)
+        deadline = time.monotonic() + 5
+        while "default  00:59:" not in stream.getvalue():
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.02)
+        dashboard.stop()
+        await asyncio.wait_for(task, 5)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        dashboard.close()
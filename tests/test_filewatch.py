@@ -0,0 +1,76 @@
+import threading
+import time
+
+from decafe_timer.filewatch import StateWatcher
+
+
+def _replace(path, text):
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
+
+
+def test_wait_times_out_without_changes(tmp_path):
+    with StateWatcher(tmp_path / "state.json", poll_interval=0.01) as watcher:
+        assert watcher.wait(0.05) is False
+
+
+def test_wait_wakes_on_replace(tmp_path):
+    path = tmp_path / "state.json"
+    with StateWatcher(path, poll_interval=0.01) as watcher:
+        timer = threading.Timer(0.05, _replace, args=(path, "{}"))
+        timer.start()
+        started = time.monotonic()
+        assert watcher.wait(5) is True
+        assert time.monotonic() - started < 1
+        timer.join()
+
+
+def test_unrelated_files_are_ignored(tmp_path):
+    with StateWatcher(tmp_path / "state.json", poll_interval=0.01) as watcher:
+        (tmp_path / "other.json").write_text("{}")
+        assert watcher.wait(0.05) is False
+
+
+def test_stat_fallback_detects_replace(tmp_path, monkeypatch):
+    from decafe_timer import filewatch
+
+    monkeypatch.setattr(filewatch, "_load_inotify", lambda: None)
+    path = tmp_path / "state.json"
+    with StateWatcher(path, poll_interval=0.01) as watcher:
+        assert not watcher.uses_inotify
+        _replace(path, "{}")
+        assert watcher.wait(1) is True
+        assert watcher.wait(0.05) is False
+
+
+def test_wait_wakes_on_sibling_append(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    with StateWatcher(tmp_path / "state.json", also=(journal,)) as watcher:
+        with open(journal, "a") as f:
+            f.write("{}\n")
+        assert watcher.wait(1) is True
+
+
+def test_paths_watcher_reports_which_files_changed(tmp_path):
+    from decafe_timer.filewatch import PathsWatcher
+
+    first = tmp_path / "a" / "state.json"
+    second = tmp_path / "b" / "state.json"
+    with PathsWatcher([first, second]) as watcher:
+        assert watcher.changed() == set()
+        _replace(second, "{}")
+        (tmp_path / "a" / "other.json").write_text("{}")
+        assert watcher.changed() == {str(second)}
+        assert watcher.changed() == set()
+
+
+def test_paths_watcher_stat_fallback(tmp_path, monkeypatch):
+    from decafe_timer import filewatch
+
+    monkeypatch.setattr(filewatch, "_load_inotify", lambda: None)
+    path = tmp_path / "state.json"
+    with filewatch.PathsWatcher([path]) as watcher:
+        assert watcher.fileno() is None
+        _replace(path, "{}")
+        assert watcher.changed() == {str(path)}
@@ -0,0 +1,188 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import decafe_timer
+from decafe_timer import state
+
+# ``decafe_timer.main`` is also the entry-point function, so go via sys.modules.
+main_module = importlib.import_module("decafe_timer.main")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [],
+        ["--layout", "one-line"],
+        ["--layout=graph-only", "--color", "never"],
+        ["--bar-style", "blocks", "--one-line"],
+    ],
+)
+def test_fast_args_accept_snapshot_options(argv):
+    assert main_module._parse_fast_args(argv) is not None
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["run"],
+        ["+5h"],
+        ["--layout"],
+        ["--layout", "sideways"],
+        ["--format", "json"],
+        ["--version"],
+    ],
+)
+def test_fast_args_defer_to_argparse(argv):
+    assert main_module._parse_fast_args(argv) is None
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--color", "never"],
+        ["--layout", "one-line", "--color", "never"],
+        ["--graph-only", "--bar-style", "counting-rod", "--color=always"],
+    ],
+)
+def test_fast_snapshot_matches_full_cli(argv, capsys, monkeypatch):
+    state.save_state(int(time.time()) + 1800, 3600)
+    main_module.main(argv)
+    fast = capsys.readouterr().out
+    monkeypatch.setattr(main_module, "_run_fast_snapshot", lambda argv: False)
+    main_module.main(argv)
+    assert capsys.readouterr().out == fast
+    assert fast
+
+
+# Import time the fast snapshot may add on top of a bare interpreter start.
+# The snapshot's own modules cost ~2 ms today; argparse alone is ~5 ms.
+IMPORT_BUDGET_MS = 8
+FAST_SNAPSHOT_CODE = (
+    "import sys\n"
+    "from decafe_timer import state\n"
+    "state._cache_dir = lambda: sys.argv[1]\n"
+    "import decafe_timer\n"
+    "decafe_timer.main(sys.argv[2:])\n"
+    "heavy = {'argparse', 'dataclasses', 'typing', 'pathlib', 'hashlib',\n"
+    "         'random', 'inspect', 'datetime', 're', 'json',\n"
+    "         'decafe_timer.cli', 'decafe_timer.duration',\n"
+    "         'decafe_timer.ticks', 'decafe_timer.filewatch',\n"
+    "         'decafe_timer.tracing'}\n"
+    "print(sorted(heavy & set(sys.modules)))\n"
+)
+FAST_SNAPSHOT_ARGS = ["--layout", "one-line", "--color", "never"]
+
+
+def _fast_snapshot_env(tmp_path) -> dict:
+    """Environment for snapshot subprocesses, with a timer saved in ``tmp_path``."""
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    # Bytecode is written so timed runs measure imports, not compiles.
+    env = {**os.environ, "PYTHONPATH": src_dir}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    # Start a timer first so the snapshot is served from the binary sidecar.
+    subprocess.run(
+        [sys.executable, "-c", FAST_SNAPSHOT_CODE, str(tmp_path), "+15m"],
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return env
+
+
+def _import_time_us(args, env):
+    """Return the summed ``-X importtime`` self time of a run, best of three."""
+    runs = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total = 0
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[0][12:].strip().isdigit():
+                total += int(fields[0][12:])
+        runs.append(total)
+    return min(runs)
+
+
+def test_fast_snapshot_imports_no_heavy_modules(tmp_path):
+    env = _fast_snapshot_env(tmp_path)
+    result = subprocess.run(
+        [sys.executable, "-c", FAST_SNAPSHOT_CODE, str(tmp_path), *FAST_SNAPSHOT_ARGS],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+@pytest.mark.bench
+def test_fast_snapshot_stays_within_import_budget(tmp_path):
+    env = _fast_snapshot_env(tmp_path)
+    snapshot = ["-c", FAST_SNAPSHOT_CODE, str(tmp_path), *FAST_SNAPSHOT_ARGS]
+    added_us = _import_time_us(snapshot, env) - _import_time_us(["-c", "pass"], env)
+    assert added_us < IMPORT_BUDGET_MS * 1000
+
+
+def test_concurrent_intakes_are_not_lost(tmp_path):
+    pytest.importorskip("fcntl")
+    processes = 100
+    code = (
+        "import sys\n"
+        "from decafe_timer import state\n"
+        "state._cache_dir = lambda: sys.argv[1]\n"
+        "import decafe_timer\n"
+        "decafe_timer.main(['+15m'])\n"
+    )
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    env = {**os.environ, "PYTHONPATH": src_dir}
+    started = time.time()
+    children = [
+        subprocess.Popen(
+            [sys.executable, "-c", code, str(tmp_path)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(processes)
+    ]
+    assert all(child.wait(60) == 0 for child in children)
+    finished = time.time()
+
+    snapshot = state.load_snapshot()
+    assert snapshot.revision == processes
+    assert int(started) + processes * 900 <= snapshot.finish_at
+    assert snapshot.finish_at <= finished + processes * 900
+
+
+def test_next_change_command(capsys):
+    finish_at = int(time.time()) + 3000
+    state.save_state(finish_at, 3600)
+    main_module.main(["next-change", "--layout", "graph-only", "--format", "json"])
+    result = json.loads(capsys.readouterr().out)
+    remaining_sec = int(finish_at - time.time())
+    assert finish_at - remaining_sec - 1 < result["next_change_at"] < finish_at
+    assert 0 <= result["delay_sec"] <= remaining_sec
+
+    main_module.main(["next-change", "--layout", "one-line"])
+    change_at = int(capsys.readouterr().out)
+    assert 0 <= change_at - time.time() <= 1
+
+    state.clear_state()
+    main_module.main(["next-change"])
+    assert capsys.readouterr().out == "---\n"
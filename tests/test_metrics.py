@@ -0,0 +1,136 @@
+import os
+
+import pytest
+
+from decafe_timer import journal, metrics, state
+from decafe_timer.metrics import Histogram, HistoryCounts, ToolHealth
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(state, "_now_epoch", lambda: now[0])
+    return now
+
+
+def _samples(text: str) -> dict[str, str]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+def test_history_counts_intakes_and_expiries(clock):
+    snapshot = state.save_state(NOW + 60, 3600, added_sec=60)
+    clock[0] = NOW + 120  # the first timer has run out
+    snapshot = state.save_state(NOW + 7320, 3600, added_sec=7200, snapshot=snapshot)
+    clock[0] = NOW + 130
+    state.clear_state(snapshot=snapshot)
+    (default,) = metrics.collect_profiles(now=NOW + 140)
+    assert default.intakes == 2
+    assert default.expiries == 1
+    assert default.state_writes == 3
+    assert default.remaining_sec == 0
+
+    counts = HistoryCounts()
+    counts.feed({"rev": 1, "at": NOW, "type": "intake", "finish_at": NOW + 10})
+    assert counts.expiries_at(NOW + 5) == 0
+    assert counts.expiries_at(NOW + 10) == 1
+
+
+def test_collection_reads_history_only_after_changes(clock, monkeypatch):
+    snapshot = state.save_state(NOW + 9000, 3600, added_sec=9000)
+    (first,) = metrics.collect_profiles(now=NOW)
+    assert first.overflow_ratio == pytest.approx((9000 - 3600) / 3600)
+
+    iter_history = state.iter_history
+
+    def no_history(*_args):
+        raise AssertionError("history read without a state change")
+
+    monkeypatch.setattr(state, "iter_history", no_history)
+    assert metrics.collect_profiles(now=NOW) == [first]
+
+    monkeypatch.setattr(state, "iter_history", iter_history)
+    state.save_state(NOW + 9600, 3600, added_sec=600, snapshot=snapshot)
+    (second,) = metrics.collect_profiles(now=NOW)
+    assert second.intakes == 2
+
+
+def test_collection_reads_only_events_after_the_cursor(clock, monkeypatch):
+    snapshot = state.save_state(NOW + 600, 3600, added_sec=600)
+    snapshot = state.compact_journal()
+    metrics.collect_profiles(now=NOW)
+
+    state.save_state(NOW + 1200, 3600, added_sec=600, snapshot=snapshot)
+    read = []
+    iter_events = journal.iter_events
+    monkeypatch.setattr(
+        journal,
+        "iter_events",
+        lambda path, **kwargs: read.append(os.path.basename(path))
+        or iter_events(path, **kwargs),
+    )
+    (profile,) = metrics.collect_profiles(now=NOW)
+    assert profile.intakes == 2
+    assert "timer_history.jsonl" not in read
+
+
+def test_profiles_are_labelled_and_escaped(clock):
+    state.use_profile('tea "green"')
+    try:
+        state.save_state(NOW + 600, 3600)
+    finally:
+        state.use_profile(None)
+    text = metrics.render_metrics(now=NOW)
+    samples = _samples(text)
+    assert samples['decafe_timer_remaining_seconds{profile="tea \\"green\\""}'] == "600"
+    assert samples['decafe_timer_intakes_total{profile="default"}'] == "0"
+    assert "# TYPE decafe_timer_intakes counter" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    health = ToolHealth()
+    for value in (0.000005, 0.00002, 0.00002, 1.0):
+        health.render.observe(value)
+    lines = metrics.format_openmetrics([], health).splitlines()
+    buckets = [line for line in lines if line.startswith("decafe_timer_render_seconds")]
+    assert buckets[:2] == [
+        'decafe_timer_render_seconds_bucket{le="1e-05"} 1',
+        'decafe_timer_render_seconds_bucket{le="2.5e-05"} 3',
+    ]
+    assert 'decafe_timer_render_seconds_bucket{le="+Inf"} 4' in buckets
+    assert "decafe_timer_render_seconds_count 4" in buckets
+
+
+def test_live_health_is_recorded_once_metrics_are_enabled(tmp_path, capsys):
+    health = ToolHealth(state_reads=2)
+    health.tick_drift.observe(0.003)
+    metrics.record_health(health)
+    assert not os.path.exists(metrics._health_file())
+
+    out = tmp_path / "textfile" / "decafe.prom"
+    metrics.run_metrics(str(out))
+    metrics.record_health(health)
+    metrics.record_health(health)
+    loaded = metrics.load_health()
+    assert loaded.state_reads == 4
+    assert loaded.tick_drift.count == 2
+    assert out.read_text().endswith("# EOF\n")
+    assert os.listdir(out.parent) == ["decafe.prom"]
+    assert capsys.readouterr().out == ""
+
+
+def test_histogram_discards_foreign_buckets():
+    loaded = Histogram.from_dict((1.0, 2.0), {"counts": [1], "sum": 1.0, "count": 1})
+    assert loaded == Histogram((1.0, 2.0))
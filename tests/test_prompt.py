@@ -0,0 +1,141 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+import decafe_timer
+from decafe_timer import prompt, state
+from decafe_timer.render import render_snapshot_line
+
+NOW = 1_800_000_000
+# The reader documented in the README.
+SHELL_READER = """
+now=$1
+while read -r start end text; do
+  if [ "$now" -ge "$start" ] && { [ "$end" -eq 0 ] || [ "$now" -lt "$end" ]; }; then
+    printf '%s\\n' "$text"
+    break
+  fi
+done < "$2"
+"""
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    yield tmp_path
+
+
+def _snapshot(remaining_sec, mem_sec=3600):
+    return state.StateSnapshot(finish_at=NOW + remaining_sec, mem_sec=mem_sec)
+
+
+@pytest.mark.parametrize("graph_only", [True, False])
+def test_segments_match_rendering(graph_only):
+    snapshot = _snapshot(5400)
+    segments = list(
+        prompt.prompt_segments(snapshot, NOW, graph_only=graph_only, horizon_sec=900)
+    )
+    assert segments[0][0] == NOW
+    for (start, end, text), following in zip(segments, segments[1:]):
+        assert end == following[0]
+        for epoch in (start, end - 1):
+            # A prompt reading epoch second T shows what the CLI shows
+            # during it, i.e. int(finish_at - t) for T < t < T + 1.
+            expected = render_snapshot_line(
+                snapshot.finish_at - epoch - 1, 3600, graph_only=graph_only
+            )
+            assert text == expected
+
+
+def test_graph_segments_run_to_expiry():
+    snapshot = _snapshot(600)
+    segments = list(prompt.prompt_segments(snapshot, NOW, graph_only=True))
+    assert segments[-1] == (NOW + 599, prompt.OPEN_END, "Expired")
+    assert segments[-2][1] == NOW + 599
+
+
+def test_line_segments_stop_at_horizon():
+    segments = list(
+        prompt.prompt_segments(_snapshot(5400), NOW, graph_only=False, horizon_sec=60)
+    )
+    assert len(segments) == 60
+    assert segments[-1][1] == NOW + 60
+
+
+def test_cleared_state_is_open_ended():
+    segments = list(
+        prompt.prompt_segments(state.StateSnapshot(), NOW, graph_only=True)
+    )
+    assert segments == [(0, prompt.OPEN_END, "---")]
+
+
+def test_files_follow_state_changes(tmp_path):
+    snapshot = state.save_state(int(time.time()) + 1200, 3600)
+    graph_file = tmp_path / prompt.PROMPT_GRAPH_FILE
+    line_file = tmp_path / prompt.PROMPT_LINE_FILE
+    assert graph_file.read_text().splitlines()[-1].endswith(" 0 Expired")
+    assert len(line_file.read_text().splitlines()) == prompt.PROMPT_LINE_MINUTES * 60
+
+    state.clear_state(snapshot=snapshot)
+    assert graph_file.read_text() == "0 0 ---\n"
+
+
+def test_commits_that_show_the_same_keep_the_files(tmp_path):
+    snapshot = state.save_state(int(time.time()) + 1200, 3600)
+    line_file = tmp_path / prompt.PROMPT_LINE_FILE
+    written = line_file.stat().st_mtime_ns
+    snapshot = state.save_render_config(
+        bar_style=None, one_line=True, graph_only=None, mem_sec=None, snapshot=snapshot
+    )
+    assert line_file.stat().st_mtime_ns == written
+    state.save_mem(7200, snapshot=snapshot)
+    assert line_file.stat().st_mtime_ns != written
+
+
+def test_commits_do_not_import_the_cli_modules(tmp_path):
+    code = (
+        "import sys, time\n"
+        "from decafe_timer import state\n"
+        "state._cache_dir = lambda: sys.argv[1]\n"
+        "state.save_state(int(time.time()) + 600, 3600)\n"
+        "heavy = {'dataclasses', 'decafe_timer.main', 'decafe_timer.watch',\n"
+        "         'decafe_timer.ticks'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path)],
+        env={**os.environ, "PYTHONPATH": src_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n"
+    assert (tmp_path / prompt.PROMPT_LINE_FILE).exists()
+
+
+def test_shell_reader_picks_current_line(tmp_path):
+    sh = shutil.which("sh")
+    if sh is None:
+        pytest.skip("no POSIX shell")
+    path = tmp_path / "prompt.txt"
+    snapshot = _snapshot(1800)
+    path.write_text(
+        "".join(
+            f"{start} {end} {text}\n"
+            for start, end, text in prompt.prompt_segments(
+                snapshot, NOW, graph_only=False, horizon_sec=120
+            )
+        )
+    )
+    result = subprocess.run(
+        [sh, "-c", SHELL_READER, "sh", str(NOW + 75), str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == render_snapshot_line(1800 - 76, 3600) + "\n"
@@ -26,10 +26,12 @@ def _ascii_render_symbols():
         render.COUNTING_ROD_LEVELS = ["-", "=", "#", "%", "@"]
         render.COUNTING_ROD_EMPTY_CHAR = render.COUNTING_ROD_LEVELS[0]
         render.COUNTING_ROD_FULL_CHAR = render.COUNTING_ROD_LEVELS[-1]
+        render.clear_frame_cache()
         yield
     finally:
         for key, value in originals.items():
             setattr(render, key, value)
+        render.clear_frame_cache()
 
 
 @pytest.fixture(autouse=True)
@@ -88,3 +90,113 @@ def test_bar_color_for_ratio_thresholds():
     assert render._bar_color_for_ratio(0.2, ansi=ansi) == render.ANSI_YELLOW
     assert render._bar_color_for_ratio(0.1, ansi=ansi) == render.ANSI_GREEN
     assert render._bar_color_for_ratio(0.01, ansi=ansi) == render.ANSI_BLUE
+
+
+def test_next_change_remaining_counts_seconds_with_time():
+    assert render.next_change_remaining(100, 3600, graph_only=False) == 99
+    assert render.next_change_remaining(1, 3600, graph_only=False) == 0
+
+
+@pytest.mark.parametrize(
+    "bar_style",
+    [
+        render.BAR_STYLE_GREEK_CROSS,
+        render.BAR_STYLE_COUNTING_ROD,
+        render.BAR_STYLE_BLOCKS,
+    ],
+)
+@pytest.mark.parametrize("use_ansi", [False, True])
+def test_next_change_remaining_graph_only_matches_brute_force(bar_style, use_ansi):
+    scale = 600
+
+    def draw(sec):
+        return render.render_snapshot_line(
+            sec, scale, graph_only=True, bar_style=bar_style, use_ansi=use_ansi
+        )
+
+    remaining = 700
+    while remaining > 1:
+        expected = remaining - 1
+        while expected > 0 and draw(expected) == draw(remaining):
+            expected -= 1
+        got = render.next_change_remaining(
+            remaining, scale, graph_only=True, bar_style=bar_style, use_ansi=use_ansi
+        )
+        assert got == expected
+        remaining = max(got, 1)
+
+
+@pytest.mark.parametrize("graph_only", [False, True])
+@pytest.mark.parametrize("use_ansi", [False, True])
+def test_next_change_at_is_the_epoch_boundary(graph_only, use_ansi):
+    finish_at = 1_800_000_000
+    scale = 900
+
+    def draw(now):
+        return render.render_snapshot_line(
+            int(finish_at - now),
+            scale,
+            graph_only=graph_only,
+            use_ansi=use_ansi,
+        )
+
+    now = finish_at - 1200.4
+    while True:
+        change_at = render.next_change_at(
+            finish_at, scale, now=now, graph_only=graph_only, use_ansi=use_ansi
+        )
+        if change_at is None:
+            break
+        assert change_at >= now - 1
+        if change_at - 0.001 > now:
+            assert draw(change_at - 0.001) == draw(now)
+        assert draw(change_at + 0.001) != draw(now) or change_at == finish_at - 1
+        now = change_at + 0.5
+    assert now > finish_at - 1
+
+
+@pytest.mark.parametrize(
+    "bar_style",
+    [
+        render.BAR_STYLE_GREEK_CROSS,
+        render.BAR_STYLE_COUNTING_ROD,
+        render.BAR_STYLE_BLOCKS,
+    ],
+)
+@pytest.mark.parametrize("use_ansi", [False, True])
+def test_bar_frame_matches_uncached_render(bar_style, use_ansi):
+    scale = 600
+    style = render.BAR_STYLES[bar_style]
+    ansi = render._ansi_table(use_ansi)
+    for remaining in range(0, 700):
+        ratio, is_overflow = render._bar_ratio(remaining, scale)
+        cached = render.bar_frame(
+            ratio, is_overflow, bar_style=bar_style, use_ansi=use_ansi
+        )
+        assert cached == style.render(ratio, is_overflow, ansi)
+
+
+def test_bar_frame_table_is_bounded_by_distinct_bars():
+    for remaining in range(0, 3601):
+        render.render_snapshot_line(
+            remaining, 3600, graph_only=True, bar_style=render.BAR_STYLE_BLOCKS
+        )
+    assert len(render._frame_cache) == render.BAR_CHAR_WIDTH_BLOCKS + 1
+
+
+def test_visible_length_counts_cells():
+    assert render.visible_length("\x1b[31m日本\x1b[0m á") == 6
+    assert render.cell_width("\U0001f7a7") == 1
+
+
+@pytest.mark.parametrize("graph_only", [False, True])
+def test_live_frame_carries_width(graph_only):
+    for remaining in (7200, 3600, 1800, 5, 0):
+        prefix, bar, width = render.render_live_frame(
+            remaining, 3600, graph_only=graph_only, use_ansi=True
+        )
+        line = render.render_snapshot_line(
+            remaining, 3600, graph_only=graph_only, use_ansi=True
+        )
+        assert prefix + bar == line
+        assert width == render.visible_length(line)
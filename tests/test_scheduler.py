@@ -0,0 +1,169 @@
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+from decafe_timer import scheduler, state
+from decafe_timer.core import TimerState
+from decafe_timer.filewatch import GroupsWatcher
+
+NOW = 1_800_000_000
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path / "cache")
+    yield tmp_path
+
+
+def _kinds(events):
+    return [(event.profile, event.kind, event.color) for event in events]
+
+
+def test_events_follow_color_thresholds():
+    events = scheduler.timer_events("a", TimerState(NOW + 1000, 1000))
+    assert [event.due_at for event in events] == [
+        NOW + 700,
+        NOW + 850,
+        NOW + 930,
+        NOW + 1000,
+    ]
+    assert _kinds(events) == [
+        ("a", "color", "yellow"),
+        ("a", "color", "green"),
+        ("a", "color", "blue"),
+        ("a", "expired", None),
+    ]
+
+
+def test_only_future_events_are_scheduled():
+    sched = scheduler.ExpiryScheduler()
+    sched.set_timer("a", TimerState(NOW + 100, 1000), now=NOW)
+    assert len(sched) == 2
+    assert sched.next_due() == NOW + 30
+    assert _kinds(sched.pop_due(NOW + 100)) == [
+        ("a", "color", "blue"),
+        ("a", "expired", None),
+    ]
+    assert sched.next_due() is None
+
+
+def test_reschedule_replaces_old_deadlines():
+    sched = scheduler.ExpiryScheduler()
+    sched.set_timer("a", TimerState(NOW + 60, 1000), now=NOW)
+    sched.set_timer("b", TimerState(NOW + 90, 1000), now=NOW)
+    # intake on "a", clear on "b"
+    sched.sync({"a": TimerState(NOW + 600, 1000)}, now=NOW)
+    assert _kinds(sched.pop_due(NOW + 200)) == []
+    assert _kinds(sched.pop_due(NOW + 600)) == [
+        ("a", "color", "yellow"),
+        ("a", "color", "green"),
+        ("a", "color", "blue"),
+        ("a", "expired", None),
+    ]
+    assert len(sched) == 0
+
+
+def test_unchanged_sync_does_not_refire():
+    sched = scheduler.ExpiryScheduler()
+    timers = {"a": TimerState(NOW + 10, 1000)}
+    sched.sync(timers, now=NOW)
+    assert len(sched.pop_due(NOW + 10)) == 1
+    sched.sync(timers, now=NOW + 20)
+    assert sched.pop_due(NOW + 30) == []
+
+
+def test_many_timers_pop_in_order():
+    sched = scheduler.ExpiryScheduler()
+    for index in range(5000):
+        sched.set_timer(f"p{index}", TimerState(NOW + 10 + index % 997, 10), now=NOW)
+    for index in range(0, 5000, 2):
+        sched.set_timer(f"p{index}", None, now=NOW)
+    assert len(sched) == 2500 * 4
+    assert len(sched._heap) <= scheduler.STALE_FACTOR * len(sched) + 64
+    due = [event.due_at for event in sched.pop_due(NOW + 2000)]
+    assert due == sorted(due)
+    assert len(due) == 2500 * 4
+
+
+def test_profile_timers_cover_all_profiles():
+    state.save_state(NOW + 600, 3600)
+    state.use_profile("tea")
+    try:
+        state.save_state(NOW + 300, 1800)
+    finally:
+        state.use_profile(None)
+    assert state.profile_timers() == {
+        "default": TimerState(NOW + 600, 3600),
+        "tea": TimerState(NOW + 300, 1800),
+    }
+
+
+def test_run_hooks_fires_command(tmp_path, monkeypatch):
+    out = tmp_path / "fired.txt"
+    state.save_state(int(time.time()) + 1, 3600)
+    command = (
+        f"{sys.executable} -c \"import os; open({str(out)!r}, 'a').write("
+        "os.environ['DECAFE_TIMER_EVENT'] + ' ' + os.environ['DECAFE_TIMER_PROFILE'])\""
+    )
+    scheduler.run_hooks(on_expire=[command], max_events=1)
+    assert out.read_text() == "expired default"
+
+
+def _save(profile, finish_at, mem_sec=3600):
+    state.use_profile(profile)
+    try:
+        return state.save_state(finish_at, mem_sec)
+    finally:
+        state.use_profile(None)
+
+
+def test_only_changed_profiles_are_reread(tmp_path, monkeypatch):
+    for index in range(5):
+        _save(f"p{index}", NOW + 600, mem_sec=600)
+    sched = scheduler.ExpiryScheduler()
+    loaded = []
+    load = state.load_profile_snapshot
+    monkeypatch.setattr(
+        state,
+        "load_profile_snapshot",
+        lambda profile: loaded.append(profile) or load(profile),
+    )
+    with GroupsWatcher() as watcher:
+        scheduler.follow_profiles(sched, watcher, now=NOW)
+        assert sorted(loaded) == ["default", "p0", "p1", "p2", "p3", "p4"]
+        assert len(sched) == 5 * 4
+
+        _save("p3", NOW + 900, mem_sec=600)
+        changed = watcher.changed()
+        assert changed == {"p3"}
+        loaded.clear()
+        scheduler.reload_profiles(sched, changed, now=NOW)
+        scheduler.follow_profiles(sched, watcher, now=NOW)
+        assert loaded == ["p3"]
+
+        shutil.rmtree(tmp_path / "cache" / "profiles" / "p4")
+        scheduler.follow_profiles(sched, watcher, now=NOW)
+        assert "p4" not in watcher.names()
+        assert len(sched) == 4 * 4
+
+
+def test_run_hooks_sees_other_profiles_without_rescanning(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "RESCAN_INTERVAL_SEC", 60.0)
+    out = tmp_path / "fired.txt"
+    state.save_state(int(time.time()) + 3600, 3600)
+    command = (
+        f"{sys.executable} -c \"import os; open({str(out)!r}, 'a').write("
+        "os.environ['DECAFE_TIMER_PROFILE'])\""
+    )
+    # "tea" exists from the start; its timer is set once run_hooks waits.
+    _save("tea", int(time.time()) - 10)
+    timer = threading.Timer(0.3, lambda: _save("tea", int(time.time()) + 1))
+    timer.start()
+    try:
+        scheduler.run_hooks(on_expire=[command], max_events=1)
+    finally:
+        timer.cancel()
+    assert out.read_text() == "tea"
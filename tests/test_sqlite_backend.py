@@ -0,0 +1,111 @@
+import importlib
+import json
+import time
+
+import pytest
+
+from decafe_timer import sqlite_backend, state
+from decafe_timer.core import TimerState
+
+main_module = importlib.import_module("decafe_timer.main")
+
+
+@pytest.fixture(autouse=True)
+def _sqlite_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    monkeypatch.setattr(state, "_profile", None)
+    monkeypatch.setenv(state.BACKEND_ENV, state.BACKEND_SQLITE)
+    monkeypatch.setenv(state.DB_ENV, str(tmp_path / "shared" / "timers.sqlite3"))
+    monkeypatch.delenv(state.PROFILE_ENV, raising=False)
+    yield tmp_path
+    sqlite_backend.close_all()
+
+
+def test_round_trip_and_history():
+    finish_at = int(time.time()) + 1800
+    snapshot = state.save_state(finish_at, 3600, added_sec=1800)
+    state.save_render_config(
+        bar_style="blocks",
+        one_line=True,
+        graph_only=False,
+        mem_sec=None,
+        snapshot=snapshot,
+    )
+    loaded = state.load_snapshot()
+    assert loaded.finish_at == finish_at
+    assert loaded.mem_sec == 3600
+    assert loaded.bar_style == "blocks"
+    assert loaded.render_flags == (True, False)
+    assert loaded.revision == 2
+    assert [event["type"] for event in state.iter_history()] == ["intake", "config"]
+    assert not (state._cache_dir() / "timer_state.json").exists()
+
+
+def test_database_uses_wal_and_finish_at_index():
+    state.save_mem(3600)
+    conn = sqlite_backend.connect(state._sqlite_file())
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(
+        str(row)
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT name FROM profiles WHERE finish_at > 0"
+        )
+    )
+    assert "profiles_finish_at" in plan
+
+
+def test_profiles_are_independent():
+    now = int(time.time())
+    state.use_profile("alice")
+    state.save_state(now + 600, 3600)
+    state.use_profile("bob")
+    assert state.load_snapshot().finish_at is None
+    state.save_state(now + 300, 7200)
+    state.use_profile("carol")
+    snapshot = state.save_state(now + 900, 3600)
+    state.clear_state(snapshot=snapshot)
+
+    assert state.active_profiles(now) == [("bob", now + 300), ("alice", now + 600)]
+    assert state.profile_timers() == {
+        "alice": TimerState(now + 600, 3600),
+        "bob": TimerState(now + 300, 7200),
+        "carol": TimerState(None, 3600),
+    }
+    state.use_profile("alice")
+    assert state.load_snapshot().revision == 1
+
+
+def test_stale_snapshot_conflicts():
+    stale = state.load_snapshot()
+    state.save_mem(3600)
+    with pytest.raises(state.StateConflict):
+        state.save_mem(7200, snapshot=stale)
+    assert state.load_snapshot().mem_sec == 3600
+
+
+def test_cli_profile_option_and_listing(capsys):
+    main_module.main(["--profile", "alice", "+10m"])
+    main_module.main(["--profile", "bob", "+5m"])
+    capsys.readouterr()
+    main_module.main(["profiles", "--format", "json"])
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["profile"] for row in rows] == ["bob", "alice"]
+    assert 0 < rows[0]["remaining_sec"] <= 300
+
+
+def test_invalid_profile_name(capsys):
+    main_module.main(["--profile", "../x"])
+    assert "Invalid profile name" in capsys.readouterr().out
+
+
+def test_shared_database_keeps_lock_and_side_files_per_user(tmp_path):
+    main_module.main(["--profile", "bob", "+10m"])
+    shared = tmp_path / "shared"
+    # Only the database itself lives beside the shared path.
+    assert {path.name for path in shared.iterdir()} <= {
+        "timers.sqlite3",
+        "timers.sqlite3-shm",
+        "timers.sqlite3-wal",
+    }
+    assert (tmp_path / "timer_state.sqlite3.lock").exists()
+    assert (tmp_path / "profiles" / "bob" / "timer_prompt_line.txt").exists()
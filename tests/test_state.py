@@ -0,0 +1,204 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from decafe_timer import journal, state
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    yield tmp_path
+
+
+def _count_reads(monkeypatch):
+    calls = []
+    original = state._read_state_payload
+
+    def counting():
+        calls.append(1)
+        return original()
+
+    monkeypatch.setattr(state, "_read_state_payload", counting)
+    return calls
+
+
+def test_snapshot_defaults_when_missing():
+    snapshot = state.load_snapshot()
+    assert snapshot.finish_at is None
+    assert snapshot.effective_mem_sec == state.DEFAULT_MEM_SEC
+    assert snapshot.effective_bar_style == state.DEFAULT_BAR_STYLE
+    assert snapshot.render_flags == (False, False)
+
+
+def test_save_helpers_reuse_snapshot(monkeypatch):
+    calls = _count_reads(monkeypatch)
+    snapshot = state.load_snapshot()
+    finish_at = int(time.time()) + 600
+    snapshot = state.save_render_config(
+        bar_style="blocks",
+        one_line=True,
+        graph_only=False,
+        mem_sec=None,
+        snapshot=snapshot,
+    )
+    snapshot = state.save_state(finish_at, 600, snapshot=snapshot)
+    snapshot = state.save_mem(1200, snapshot=snapshot)
+    assert len(calls) == 1
+
+    reloaded = state.load_snapshot()
+    assert reloaded.finish_at == finish_at
+    assert reloaded.mem_sec == 1200
+    assert reloaded.bar_style == "blocks"
+    assert reloaded.render_flags == (True, False)
+    assert reloaded == snapshot
+
+
+def test_clear_state_keeps_settings():
+    snapshot = state.save_state(int(time.time()) + 300, 600)
+    snapshot = state.clear_state(snapshot=snapshot)
+    assert snapshot.finish_at is None
+    assert state.load_snapshot().mem_sec == 600
+
+
+def _journal_lines(cache_dir):
+    text = (cache_dir / "timer_journal.jsonl").read_text()
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_save_state_appends_journal_event(_isolated_cache_dir):
+    finish_at = int(time.time()) + 600
+    state.save_state(finish_at, 600, added_sec=600)
+    (event,) = _journal_lines(_isolated_cache_dir)
+    assert event["type"] == "intake"
+    assert event["rev"] == 1
+    assert event["finish_at"] == finish_at
+    assert event["added_sec"] == 600
+    assert isinstance(event["at"], int)
+    assert not (_isolated_cache_dir / "timer_state.json").exists()
+
+
+def test_legacy_iso_state_is_read_and_upgraded(_isolated_cache_dir):
+    finish_at = datetime.now().replace(microsecond=0) + timedelta(minutes=10)
+    (_isolated_cache_dir / "timer_state.json").write_text(
+        json.dumps(
+            {
+                "finish_at": finish_at.isoformat(),
+                "mem_sec": 600,
+                "last_saved_at": datetime.now().isoformat(),
+            }
+        )
+    )
+    snapshot = state.load_snapshot()
+    assert snapshot.finish_at == int(finish_at.timestamp())
+
+    state.save_mem(1200, snapshot=snapshot)
+    state.compact_journal()
+    payload = json.loads((_isolated_cache_dir / "timer_state.json").read_text())
+    assert payload["version"] == state.STATE_VERSION
+    assert payload["finish_at"] == int(finish_at.timestamp())
+    assert payload["mem_sec"] == 1200
+
+
+def test_compaction_bounds_journal_and_keeps_history(
+    _isolated_cache_dir, monkeypatch
+):
+    monkeypatch.setattr(state, "JOURNAL_COMPACT_BYTES", 512)
+    finish_at = int(time.time())
+    snapshot = state.load_snapshot()
+    for _ in range(50):
+        finish_at += 900
+        snapshot = state.save_state(finish_at, 3600, snapshot=snapshot)
+    snapshot = state.clear_state(snapshot=snapshot)
+
+    assert len(_journal_lines(_isolated_cache_dir)) < 10
+    reloaded = state.load_snapshot()
+    assert reloaded == snapshot
+    assert reloaded.finish_at is None
+    assert reloaded.revision == 51
+    events = list(state.iter_history())
+    assert [event["rev"] for event in events] == list(range(1, 52))
+    assert events[-1]["type"] == "clear"
+
+
+def test_history_since_seeks_past_archived_events(_isolated_cache_dir, monkeypatch):
+    monkeypatch.setattr(state, "JOURNAL_COMPACT_BYTES", 512)
+    monkeypatch.setattr(journal, "SEEK_BLOCK", 64)
+    finish_at = int(time.time())
+    snapshot = state.load_snapshot()
+    for _ in range(60):
+        finish_at += 900
+        snapshot = state.save_state(finish_at, 3600, snapshot=snapshot)
+    parsed = []
+    parse_event = journal._parse_event
+    monkeypatch.setattr(
+        journal, "_parse_event", lambda line: parsed.append(1) or parse_event(line)
+    )
+    assert [event["rev"] for event in state.iter_history(40)] == list(range(41, 61))
+    assert len(parsed) < 40
+
+    history_file = _isolated_cache_dir / "timer_history.jsonl"
+    # An interrupted compaction archives part of the history twice.
+    lines = history_file.read_text().splitlines(keepends=True)
+    history_file.write_text("".join(lines + lines[20:]))
+    for since in (0, 1, 19, 20, 35, len(lines), 60):
+        events = list(state.iter_history(since))
+        assert [event["rev"] for event in events] == list(range(since + 1, 61))
+
+
+def test_torn_journal_line_is_ignored(_isolated_cache_dir):
+    snapshot = state.save_state(int(time.time()) + 600, 600)
+    with open(_isolated_cache_dir / "timer_journal.jsonl", "a") as f:
+        f.write('{"rev": 2, "type": "cle')
+    assert state.load_snapshot() == snapshot
+
+
+def test_append_after_torn_journal_line_is_kept(_isolated_cache_dir):
+    snapshot = state.save_state(int(time.time()) + 600, 600)
+    journal_file = _isolated_cache_dir / "timer_journal.jsonl"
+    with open(journal_file, "a") as f:
+        f.write('{"rev": 2, "type": "cle')
+    saved = state.save_mem(7200, snapshot=state.load_snapshot())
+    assert saved.revision == 2
+    reloaded = state.StateSnapshot.from_payload(
+        state._read_state_payload(str(_isolated_cache_dir))
+    )
+    assert reloaded == saved
+    assert reloaded.mem_sec == 7200
+    assert journal_file.read_text().count("\n") == 2
+
+
+def test_unopenable_lock_file_does_not_block_saves(_isolated_cache_dir):
+    # A directory in its place makes os.open fail like a foreign 0600 file.
+    (_isolated_cache_dir / "timer_state.json.lock").mkdir()
+    with state.lock_state():
+        snapshot = state.save_state(int(time.time()) + 600, 3600)
+    assert state.load_snapshot() == snapshot
+
+
+def test_save_rejects_stale_snapshot():
+    stale = state.load_snapshot()
+    state.save_state(int(time.time()) + 600, 3600)
+    with pytest.raises(state.StateConflict):
+        state.save_state(int(time.time()) + 1200, 3600, snapshot=stale)
+
+
+def test_file_backend_profiles_use_separate_directories(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_profile", None)
+    now = int(time.time())
+    state.save_state(now + 600, 3600)
+    state.use_profile("night-shift")
+    assert state.load_snapshot().finish_at is None
+    state.save_state(now + 300, 3600)
+    assert (tmp_path / "profiles" / "night-shift" / "timer_journal.jsonl").exists()
+
+    assert state.active_profiles(now) == [
+        ("night-shift", now + 300),
+        ("default", now + 600),
+    ]
+    assert state.active_profiles(now + 400) == [("default", now + 600)]
+    assert [event["rev"] for event in state.profile_history("default")] == [1]
+    assert state.profile_history("default", since=1) == []
+    assert state.current_profile() == "night-shift"
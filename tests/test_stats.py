@@ -0,0 +1,114 @@
+import io
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from decafe_timer import state, stats
+
+HOUR = 3600
+# Monday 2026-01-05, local midnight.
+DAY0 = int(datetime(2026, 1, 5).timestamp())
+NOW = DAY0 + 36 * HOUR
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    yield tmp_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [DAY0]
+    monkeypatch.setattr(state, "_now_epoch", lambda: now[0])
+    return now
+
+
+def _record_intakes(clock):
+    # 08:00 +2h (no overflow), 09:00 +3h (remaining 4h > 3h memory until 10:00).
+    clock[0] = DAY0 + 8 * HOUR
+    snapshot = state.save_state(DAY0 + 10 * HOUR, 3 * HOUR, added_sec=2 * HOUR)
+    clock[0] = DAY0 + 9 * HOUR
+    state.save_state(DAY0 + 13 * HOUR, 3 * HOUR, snapshot=snapshot, added_sec=3 * HOUR)
+
+
+def _summaries(by):
+    out = io.StringIO()
+    stats.run_stats(by=by, output_format="json", out=out, now=NOW)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_stats_by_day(clock):
+    _record_intakes(clock)
+    assert _summaries("day") == [
+        {
+            "period": "2026-01-05",
+            "intakes": 2,
+            "intake_sec": 5 * HOUR,
+            "overflow_sec": HOUR,
+            "longest_clear_sec": 11 * HOUR,
+        },
+        {
+            "period": "2026-01-06",
+            "intakes": 0,
+            "intake_sec": 0,
+            "overflow_sec": 0,
+            "longest_clear_sec": 12 * HOUR,
+        },
+    ]
+
+
+def test_stats_merge_clear_streak_across_days(clock):
+    _record_intakes(clock)
+    (week,) = _summaries("week")
+    assert week["period"] == "2026-W02"
+    assert week["intakes"] == 2
+    assert week["longest_clear_sec"] == 23 * HOUR
+    (month,) = _summaries("month")
+    assert month["period"] == "2026-01"
+
+
+def test_stats_clear_ends_active_time(clock):
+    clock[0] = DAY0 + 8 * HOUR
+    snapshot = state.save_state(DAY0 + 20 * HOUR, 3 * HOUR, added_sec=12 * HOUR)
+    clock[0] = DAY0 + 10 * HOUR
+    state.clear_state(snapshot=snapshot)
+    day = _summaries("day")[0]
+    assert day["overflow_sec"] == 2 * HOUR
+    assert day["longest_clear_sec"] == 14 * HOUR
+
+
+def test_stats_text_table(clock):
+    _record_intakes(clock)
+    out = io.StringIO()
+    stats.run_stats(by="day", out=out, now=NOW)
+    lines = out.getvalue().splitlines()
+    assert lines[0].split() == ["period", "intakes", "intake", "overflow", "longest", "clear"]
+    assert lines[1].split() == ["2026-01-05", "2", "05:00:00", "01:00:00", "11:00:00"]
+
+
+def test_stats_empty_history():
+    assert _summaries("day") == []
+
+
+def test_index_is_updated_on_append(clock):
+    clock[0] = DAY0 + 8 * HOUR
+    snapshot = state.save_state(DAY0 + 10 * HOUR, 3 * HOUR, added_sec=2 * HOUR)
+    stats.run_stats(reindex=True, out=io.StringIO(), now=NOW)
+    assert os.path.exists(state._stats_index_file())
+
+    clock[0] = DAY0 + 9 * HOUR
+    snapshot = state.save_state(
+        DAY0 + 13 * HOUR, 3 * HOUR, snapshot=snapshot, added_sec=3 * HOUR
+    )
+    clock[0] = DAY0 + 30 * HOUR
+    state.clear_state(snapshot=snapshot)
+    aggregator = stats._load_index()
+    assert aggregator.rev == 3
+    assert [day.period for day in stats._iter_index_days()] == ["2026-01-05"]
+
+    indexed = _summaries("day")
+    os.unlink(state._stats_index_file())
+    assert _summaries("day") == indexed
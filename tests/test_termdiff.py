@@ -0,0 +1,157 @@
+import io
+import re
+
+import pytest
+
+from decafe_timer import render, termdiff
+from decafe_timer.render import render_snapshot_line
+
+TOKEN = re.compile(r"\x1b\[([0-9;]*)([A-Za-z])|(.)", re.S)
+
+
+class Screen:
+    """Just enough of a terminal to replay what LineDiffer writes."""
+
+    def __init__(self):
+        self.cells = {}
+        self.cursor = 0
+        self.style = ""
+
+    def feed(self, data):
+        for match in TOKEN.finditer(data):
+            params, command, char = match.groups()
+            if char == "\r":
+                self.cursor = 0
+            elif char is not None:
+                width = render.cell_width(char)
+                if width == 0:
+                    style, text = self.cells[self.cursor - 1]
+                    self.cells[self.cursor - 1] = (style, text + char)
+                    continue
+                self.cells[self.cursor] = (self.style, char)
+                if width == 2:
+                    self.cells[self.cursor + 1] = (self.style, "")
+                self.cursor += width
+            elif command == "m":
+                reset = params in ("", "0")
+                self.style = "" if reset else self.style + match.group(0)
+            elif command == "C":
+                self.cursor += int(params or 1)
+            elif command == "K":
+                for column in [c for c in self.cells if c >= self.cursor]:
+                    del self.cells[column]
+
+    def visible(self):
+        # Trailing blanks look the same as erased cells.
+        cells = dict(self.cells)
+        while cells and cells[max(cells)] == ("", " "):
+            del cells[max(cells)]
+        return cells
+
+
+def _shown(line):
+    screen = Screen()
+    screen.feed(line + "\r")
+    return screen.visible()
+
+
+def _frames(use_ansi, graph_only=False, bar_style="greek-cross"):
+    for remaining in list(range(3700, 3590, -1)) + list(range(400, 0, -37)):
+        yield render_snapshot_line(
+            remaining,
+            3600,
+            graph_only=graph_only,
+            bar_style=bar_style,
+            use_ansi=use_ansi,
+        )
+
+
+@pytest.mark.parametrize("use_ansi", [False, True])
+@pytest.mark.parametrize("bar_style", ["greek-cross", "blocks"])
+@pytest.mark.parametrize("incremental", [False, True])
+def test_replayed_output_matches_each_frame(use_ansi, bar_style, incremental):
+    differ = termdiff.LineDiffer(incremental=incremental)
+    screen = Screen()
+    for line in _frames(use_ansi, bar_style=bar_style):
+        screen.feed(differ.update(line))
+        assert screen.visible() == _shown(line)
+        assert screen.cursor == 0
+    screen.feed(differ.clear())
+    assert screen.visible() == {}
+
+
+def test_wide_glyphs_and_shifted_layout():
+    differ = termdiff.LineDiffer()
+    screen = Screen()
+    for line in ["ab日本z", "ab日xyz", "áb", "abc", "\x1b[31mab\x1b[0mc"]:
+        screen.feed(differ.update(line))
+        assert screen.visible() == _shown(line)
+
+
+def test_one_second_tick_rewrites_one_cell():
+    differ = termdiff.LineDiffer()
+    differ.update(render_snapshot_line(1799, 3600, use_ansi=True))
+    output = differ.update(render_snapshot_line(1798, 3600, use_ansi=True))
+    assert output == "\x1b[7C8\r"
+    assert differ.update(render_snapshot_line(1798, 3600, use_ansi=True)) == ""
+
+
+def test_parts_diff_only_changed_parts():
+    differ = termdiff.LineDiffer()
+    screen = Screen()
+    frames = [
+        ("p1  ", "01:00:00 ", "\x1b[0m\x1b[32m###\x1b[0m"),
+        ("p1  ", "00:59:59 ", "\x1b[0m\x1b[32m###\x1b[0m"),
+        ("p1  ", "00:59:59 ", "\x1b[0m\x1b[33m##\x1b[0m."),
+        ("p1  ", "0:59 ", "\x1b[0m\x1b[33m日\x1b[0m"),
+        ("p1  ", "0:58 ", "\x1b[0m\x1b[33m日\x1b[0m"),
+    ]
+    outputs = []
+    for parts in frames:
+        outputs.append(differ.update(*parts))
+        screen.feed(outputs[-1])
+        assert screen.visible() == _shown("".join(parts))
+    assert outputs[1] == "\x1b[5C0:59:59\r"
+    assert outputs[4] == "\x1b[7C8\r"
+
+
+def test_split_cells_tracks_sgr_and_width():
+    cells = termdiff.split_cells("\x1b[0m\x1b[32m日\x1b[0m é")
+    assert cells == [("\x1b[32m", "日", 2), ("", " ", 1), ("", "é", 1)]
+
+
+def test_cursor_moves_need_a_terminal(monkeypatch):
+    monkeypatch.setenv("TERM", "xterm-256color")
+    assert not termdiff.supports_cursor_moves(io.StringIO())
+
+    class Tty(io.StringIO):
+        def isatty(self):
+            return True
+
+    assert termdiff.supports_cursor_moves(Tty())
+    monkeypatch.setenv("TERM", "dumb")
+    assert not termdiff.supports_cursor_moves(Tty())
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_parts_with_known_width(incremental):
+    differ = termdiff.LineDiffer(incremental=incremental)
+    screen = Screen()
+    for remaining in (3700, 3601, 3600, 3599, 1000):
+        prefix, bar, width = render.render_live_frame(remaining, 3600, use_ansi=True)
+        screen.feed(differ.update(prefix, bar, width=width))
+        assert screen.visible() == _shown(prefix + bar)
+    screen.feed(differ.clear())
+    assert screen.visible() == {}
+
+
+def test_glyph_table_covers_every_rendered_glyph():
+    for bar_style in render.BAR_STYLES:
+        for remaining in range(0, 130):
+            for use_ansi in (False, True):
+                line = render.render_snapshot_line(
+                    remaining, 100, bar_style=bar_style, use_ansi=use_ansi
+                )
+                glyphs = {text for _style, text, _width in termdiff.split_cells(line)}
+                assert glyphs <= set(render.GLYPH_WIDTHS)
+
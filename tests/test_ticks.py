@@ -0,0 +1,54 @@
+from decafe_timer.ticks import WAKE_SLACK_SEC, TickScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.mono = 1000.0
+        self.wall = 50_000.0
+
+    def monotonic(self):
+        return self.mono
+
+    def now(self):
+        return self.wall
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.wall += seconds
+
+
+def _scheduler(clock, remaining):
+    return TickScheduler(
+        clock.wall + remaining,
+        clock=clock.monotonic,
+        wall_clock=clock.now,
+    )
+
+
+def test_delay_aligns_to_second_boundary():
+    clock = FakeClock()
+    ticks = _scheduler(clock, 10.4)
+    assert ticks.remaining_sec() == 10
+    delay = ticks.delay_until(9)
+    assert abs(delay - (0.4 + WAKE_SLACK_SEC)) < 1e-9
+    clock.advance(delay)
+    assert ticks.remaining_sec() == 9
+
+
+def test_wall_clock_jump_does_not_shift_countdown():
+    clock = FakeClock()
+    ticks = _scheduler(clock, 60)
+    clock.wall += 3600
+    clock.advance(5)
+    assert ticks.remaining_sec() == 55
+
+
+def test_drift_stats_record_late_wakeups():
+    clock = FakeClock()
+    ticks = _scheduler(clock, 30)
+    delay = ticks.delay_until(29)
+    clock.advance(delay + 0.25)
+    ticks.mark_wake()
+    ticks.mark_wake()
+    assert ticks.stats.count == 1
+    assert abs(ticks.stats.max_sec - 0.25) < 1e-9
@@ -0,0 +1,151 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import decafe_timer
+from decafe_timer import binstate, journal, state, tracing
+from decafe_timer.ticks import TickScheduler
+
+main_module = importlib.import_module("decafe_timer.main")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+    monkeypatch.delenv(main_module.TRACE_ENV, raising=False)
+
+
+def _records(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_trace_flag_reports_phases_and_io(capsys):
+    state.save_state(int(time.time()) + 1800, 3600)
+    main_module.main(["--trace", "--one-line"])
+    captured = capsys.readouterr()
+    (record,) = _records(captured.err)
+    assert captured.out.strip()
+    assert record["event"] == "run"
+    assert record["argv"] == ["--trace", "--one-line"]
+    assert set(record["phases_ms"]) == {
+        "import",
+        "trace",
+        "parse",
+        "read",
+        "render",
+        "write",
+        "other",
+    }
+    assert record["calls"]["load_snapshot"] == 1
+    assert record["calls"]["render_lines"] == 1
+    assert record["io"]["reads"] >= 1
+    assert record["io"]["read_bytes"] > 0
+    assert record["io"]["writes"] == 0
+
+
+def test_trace_env_appends_to_file(tmp_path, monkeypatch, capsys):
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(main_module.TRACE_ENV, str(trace_file))
+    main_module.main(["+1h"])
+    main_module.main(["clear"])
+    assert capsys.readouterr().err == ""
+    intake, clear = _records(trace_file.read_text())
+    assert intake["argv"] == ["+1h"]
+    assert intake["calls"]["_commit"] == 1
+    assert intake["io"]["writes"] >= 1
+    assert intake["io"]["write_bytes"] > 0
+    assert clear["calls"]["_commit"] == 1
+
+
+@pytest.mark.parametrize("value", ["", "0", "false", "No", "OFF"])
+def test_trace_env_off_values_disable_tracing(tmp_path, monkeypatch, capsys, value):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(main_module.TRACE_ENV, value)
+    main_module.main(["--one-line"])
+    assert capsys.readouterr().err == ""
+    assert main_module.trace_setting() is None
+    assert not (tmp_path / value).is_file()
+
+
+def test_sidecar_write_bytes_are_counted(tmp_path, capsys):
+    main_module.main(["--trace", "+1h"])
+    (record,) = _records(capsys.readouterr().err)
+    files = ("timer_journal.jsonl", "timer_prompt_graph.txt", "timer_prompt_line.txt")
+    file_bytes = sum((tmp_path / name).stat().st_size for name in files)
+    assert record["calls"]["_commit"] == 1
+    assert record["io"]["write_bytes"] == file_bytes + binstate.LAYOUT.size
+
+
+def test_trace_restores_wrapped_functions(monkeypatch, capsys):
+    originals = (
+        state.load_snapshot,
+        state._commit,
+        journal.append_event,
+        main_module.render_live_frame,
+        TickScheduler.mark_wake,
+    )
+    monkeypatch.setenv(main_module.TRACE_ENV, "1")
+    main_module.main(["+1h"])
+    assert (
+        state.load_snapshot,
+        state._commit,
+        journal.append_event,
+        main_module.render_live_frame,
+        TickScheduler.mark_wake,
+    ) == originals
+    assert _records(capsys.readouterr().err)[0]["event"] == "run"
+
+
+def test_live_frames_emit_tick_records(capsys):
+    now = [100.0]
+    tracer = tracing.Tracer()
+    tracer.install()
+    try:
+        scheduler = TickScheduler(
+            10_000, clock=lambda: now[0], wall_clock=lambda: 0.0
+        )
+        scheduler.delay_until(9_998)
+        now[0] += 1.5
+        scheduler.mark_wake()
+        main_module.render_live_frame(9_998, 10_000, use_ansi=False)
+        main_module.render_live_frame(9_997, 10_000, use_ansi=False)
+    finally:
+        tracer.uninstall()
+    first, second = _records(capsys.readouterr().err)
+    assert first["event"] == second["event"] == "tick"
+    assert first["drift_ms"] == pytest.approx(490.0)
+    assert "drift_ms" not in second
+    assert second["render_ms"] >= 0
+
+
+def test_tracing_imports_nothing_the_run_does_not(tmp_path):
+    code = (
+        "import json, sys\n"
+        "from decafe_timer import state\n"
+        "state._cache_dir = lambda: sys.argv[1]\n"
+        "import decafe_timer\n"
+        "decafe_timer.main(['--trace', '--layout', 'one-line', '--color', 'never'])\n"
+        "lazy = {'argparse', 'dataclasses', 'typing', 'decafe_timer.cli',\n"
+        "        'decafe_timer.prompt', 'decafe_timer.ticks'}\n"
+        "print(sorted(lazy & set(sys.modules)))\n"
+        "sys.modules['decafe_timer.main'].main(['--trace', '+1h'])\n"
+    )
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path)],
+        env={**os.environ, "PYTHONPATH": src_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[1] == "[]"
+    snapshot, intake = _records(result.stderr)
+    assert snapshot["phases_ms"]["trace"] < snapshot["total_ms"]
+    # Modules imported after install are wrapped as they load.
+    assert intake["calls"]["parse_cli_args"] == 1
+    assert intake["io"]["write_bytes"] > 0
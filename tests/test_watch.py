@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import decafe_timer
+from decafe_timer import state
+from decafe_timer.watch import run_watch
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "_cache_dir", lambda: tmp_path)
+
+
+def test_watch_emits_cleared_frame():
+    out = io.StringIO()
+    run_watch(
+        state.load_snapshot(),
+        bar_style=state.DEFAULT_BAR_STYLE,
+        out=out,
+        max_frames=1,
+    )
+    assert out.getvalue() == "---\n"
+
+
+def test_watch_json_frames_change_each_second():
+    snapshot = state.save_state(int(time.time()) + 3, 3600)
+    out = io.StringIO()
+    run_watch(
+        snapshot,
+        output_format="json",
+        bar_style=state.DEFAULT_BAR_STYLE,
+        out=out,
+        max_frames=2,
+    )
+    frames = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [frame["class"] for frame in frames] == ["active", "active"]
+    assert frames[0]["text"].startswith("00:00:02 ")
+    assert frames[1]["text"].startswith("00:00:01 ")
+
+
+def test_watch_does_not_import_main():
+    code = "import sys, decafe_timer.watch; print('decafe_timer.main' in sys.modules)"
+    src_dir = os.path.dirname(os.path.dirname(decafe_timer.__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": src_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "False\n"